@@ -0,0 +1,137 @@
+"""
+cluster.py — Lançador multi-processo do bot
+Divide os shards em CLUSTERS processos (main.py com SHARD_IDS próprios) e
+reinicia os que caírem. A coordenação entre eles (IPC e liderança dos jobs
+únicos) é feita pelo PostgreSQL — ver utils/cluster.py.
+
+Variáveis: BOT_TOKEN, DATABASE_URL, CLUSTERS (padrão: nº de CPUs),
+SHARD_COUNT (padrão: recomendado pelo Discord).
+"""
+
+import asyncio
+import logging
+import os
+import signal
+import sys
+import time
+
+import aiohttp
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="[%(asctime)s] %(levelname)s — %(message)s",
+    datefmt="%Y-%m-%d %H:%M:%S",
+    handlers=[logging.StreamHandler(sys.stdout)],
+)
+log = logging.getLogger("multibot.launcher")
+
+_MAIN           = os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py")
+_ESPERA_MAX     = 300   # backoff máximo entre reinícios de um worker (s)
+_ESTAVEL_SECS   = 600   # worker vivo por mais que isso zera o backoff
+_IDENTIFY_SECS  = 5     # o Discord aceita um IDENTIFY a cada 5s (max_concurrency 1)
+
+
+async def _shards_recomendados(token: str) -> int:
+    async with aiohttp.ClientSession() as session:
+        async with session.get(
+            "https://discord.com/api/v10/gateway/bot",
+            headers={"Authorization": f"Bot {token}"},
+        ) as resp:
+            resp.raise_for_status()
+            dados = await resp.json()
+    return dados["shards"]
+
+
+def dividir_shards(shard_count: int, clusters: int) -> list[list[int]]:
+    """Faixas contíguas de shards, o mais equilibradas possível."""
+    clusters = max(1, min(clusters, shard_count))
+    base, resto = divmod(shard_count, clusters)
+    faixas, inicio = [], 0
+    for i in range(clusters):
+        tamanho = base + (1 if i < resto else 0)
+        faixas.append(list(range(inicio, inicio + tamanho)))
+        inicio += tamanho
+    return faixas
+
+
+class Worker:
+    def __init__(self, cluster_id: int, total: int, shard_ids: list[int], shard_count: int):
+        self.cluster_id  = cluster_id
+        self.total       = total
+        self.shard_ids   = shard_ids
+        self.shard_count = shard_count
+        self.proc: asyncio.subprocess.Process | None = None
+        self.espera = 5
+
+    def _env(self) -> dict[str, str]:
+        env = dict(os.environ)
+        env.update(
+            SHARDED="1",
+            SHARD_COUNT=str(self.shard_count),
+            SHARD_IDS=",".join(map(str, self.shard_ids)),
+            CLUSTER_ID=str(self.cluster_id),
+            CLUSTER_COUNT=str(self.total),
+        )
+        return env
+
+    async def supervisionar(self, parando: asyncio.Event, atraso: float = 0):
+        # Escalonado: os shards dos clusters anteriores identificam primeiro
+        try:
+            await asyncio.wait_for(parando.wait(), timeout=atraso)
+            return
+        except asyncio.TimeoutError:
+            pass
+        while not parando.is_set():
+            log.info(f"[CLUSTER {self.cluster_id}] Iniciando shards {self.shard_ids[0]}–{self.shard_ids[-1]}")
+            inicio = time.monotonic()
+            self.proc = await asyncio.create_subprocess_exec(
+                sys.executable, _MAIN, *sys.argv[1:], env=self._env()   # repassa --force-sync
+            )
+            codigo = await self.proc.wait()
+            if parando.is_set():
+                return
+            if time.monotonic() - inicio > _ESTAVEL_SECS:
+                self.espera = 5
+            log.warning(f"[CLUSTER {self.cluster_id}] Saiu com código {codigo}; reiniciando em {self.espera}s")
+            try:
+                await asyncio.wait_for(parando.wait(), timeout=self.espera)
+            except asyncio.TimeoutError:
+                pass
+            self.espera = min(self.espera * 2, _ESPERA_MAX)
+
+    def encerrar(self):
+        if self.proc and self.proc.returncode is None:
+            self.proc.send_signal(signal.SIGINT)
+
+
+async def main():
+    token = os.environ.get("BOT_TOKEN")
+    if not token:
+        log.critical("Variável BOT_TOKEN não definida!")
+        sys.exit(1)
+
+    shard_count = int(os.environ.get("SHARD_COUNT") or await _shards_recomendados(token))
+    clusters    = int(os.environ.get("CLUSTERS") or os.cpu_count() or 1)
+    faixas      = dividir_shards(shard_count, clusters)
+    log.info(f"[LAUNCHER] {shard_count} shard(s) em {len(faixas)} cluster(s).")
+
+    parando = asyncio.Event()
+    workers = [Worker(i, len(faixas), faixa, shard_count) for i, faixa in enumerate(faixas)]
+
+    def _parar():
+        parando.set()
+        for w in workers:
+            w.encerrar()
+
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, _parar)
+
+    await asyncio.gather(*(
+        w.supervisionar(parando, atraso=w.shard_ids[0] * _IDENTIFY_SECS) for w in workers
+    ))
+    log.info("[LAUNCHER] Todos os clusters encerrados.")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
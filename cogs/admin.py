@@ -10,14 +10,25 @@ import platform
 import sys
 import time
 
+import logging
+
 import discord
 import psutil
 from discord import app_commands
 from discord.ext import commands
 
+from db import indices
+from db import pool as db_pool
+from db.database import get_db_mode, get_pool
+from utils import metrics
+
+log = logging.getLogger("multibot.admin")
+
 OWNER_ID = 695037018127990814
 START_TIME = time.time()
 
+psutil.cpu_percent(interval=None)   # primeira leitura só inicializa o contador
+
 
 def is_owner(inter: discord.Interaction) -> bool:
     return inter.user.id == OWNER_ID
@@ -36,26 +47,36 @@ async def admin_servidores(inter: discord.Interaction):
     if not is_owner(inter):
         return await inter.response.send_message("❌ Sem permissão.", ephemeral=True)
 
-    guilds = sorted(inter.client.guilds, key=lambda g: g.member_count, reverse=True)
+    # No cluster cada processo só conhece os próprios servidores: junta as respostas
+    await inter.response.defer(ephemeral=True)
+    cluster = inter.client.cluster
+    respostas = await cluster.pedir("servidores", {"limite": _IPC_SERVIDORES if cluster.ativo else None})
+    total  = sum(r["total"] for r in respostas)
+    guilds = sorted((g for r in respostas for g in r["servidores"]), key=lambda g: g[2], reverse=True)
     linhas = [
-        f"`{i+1}.` **{g.name}** — ID `{g.id}` — {g.member_count} membros"
-        for i, g in enumerate(guilds)
+        f"`{i+1}.` **{nome}** — ID `{gid}` — {membros} membros"
+        for i, (nome, gid, membros) in enumerate(guilds)
     ]
+    rodape = f"Total: {total} servidores"
+    if len(guilds) < total:
+        rodape += f" · mostrando os {_IPC_SERVIDORES} maiores de cada cluster"
 
     # Divide em páginas de 20 servidores se necessário
     chunks = [linhas[i:i+20] for i in range(0, len(linhas), 20)]
     embeds = []
     for idx, chunk in enumerate(chunks):
         embed = discord.Embed(
-            title=f"📋 Servidores ({len(guilds)}) — Página {idx+1}/{len(chunks)}",
+            title=f"📋 Servidores ({total}) — Página {idx+1}/{len(chunks)}",
             description="\n".join(chunk),
             color=0x5865F2,
             timestamp=datetime.datetime.utcnow(),
         )
-        embed.set_footer(text=f"Total: {len(guilds)} servidores")
+        embed.set_footer(text=rodape)
         embeds.append(embed)
 
-    await inter.response.send_message(embeds=embeds[:1], ephemeral=True)
+    if not embeds:
+        return await inter.followup.send("❌ Nenhum servidor encontrado.", ephemeral=True)
+    await inter.followup.send(embeds=embeds[:1], ephemeral=True)
     for extra in embeds[1:]:
         await inter.followup.send(embed=extra, ephemeral=True)
 
@@ -72,7 +93,7 @@ async def admin_stats(inter: discord.Interaction):
 
     proc = psutil.Process(os.getpid())
     mem_mb = proc.memory_info().rss / 1024 / 1024
-    cpu = psutil.cpu_percent(interval=0.5)
+    cpu = psutil.cpu_percent(interval=None)   # desde a última chamada, sem bloquear o loop
 
     latency = round(inter.client.latency * 1000)
     total_members = sum(g.member_count for g in inter.client.guilds)
@@ -87,6 +108,139 @@ async def admin_stats(inter: discord.Interaction):
     embed.add_field(name="🐍 Python", value=f"`{platform.python_version()}`", inline=True)
     embed.add_field(name="📦 discord.py", value=f"`{discord.__version__}`", inline=True)
 
+    http = getattr(inter.client, "http_client", None)
+    if http and http.metricas:
+        linhas = [
+            f"`{host}` — {st.requisicoes} req · média {st.media_ms:.0f}ms · p95 {st.p95_ms:.0f}ms · {st.erros} erro(s)"
+            for host, st in http.resumo()[:5]
+        ]
+        embed.add_field(name="🌍 HTTP externo", value="\n".join(linhas), inline=False)
+
+    cluster = getattr(inter.client, "cluster", None)
+    if cluster and cluster.ativo:
+        await inter.response.defer(ephemeral=True)
+        respostas = await cluster.pedir("stats")
+        linhas = [
+            f"`C{r['cluster']}` — shards {r['shards']} · {r['servidores']} servidor(es) · "
+            f"{r['latencia_ms']}ms · {r['mem_mb']:.0f} MB"
+            for r in respostas
+        ]
+        faltando = cluster.total - len(respostas)
+        if faltando:
+            linhas.append(f"⚠️ {faltando} cluster(s) sem resposta")
+        embed.add_field(
+            name=f"🛰️ Clusters ({sum(r['servidores'] for r in respostas)} servidores · "
+                 f"{sum(r['membros'] for r in respostas)} membros)",
+            value="\n".join(linhas) or "—",
+            inline=False,
+        )
+
+    if hasattr(inter.client, "shards_resumo"):
+        saude = inter.client.shard_saude
+        linhas = []
+        for sid, lat, n in inter.client.shards_resumo()[:15]:
+            st = saude.get(sid)
+            reconexoes = f"{st.desconexoes} queda(s) · {st.retomadas} retomada(s)" if st else "sem eventos"
+            ms = f"{lat * 1000:.0f}ms" if lat == lat else "—"   # NaN antes do primeiro heartbeat
+            linhas.append(f"`#{sid}` — {ms} · {n} servidor(es) · {reconexoes}")
+        embed.add_field(name=f"🧩 Shards ({inter.client.shard_count or 1})", value="\n".join(linhas) or "—",
+                        inline=False)
+
+    if inter.response.is_done():
+        return await inter.followup.send(embed=embed, ephemeral=True)
+    await inter.response.send_message(embed=embed, ephemeral=True)
+
+
+# ── /admin metricas ────────────────────────────────────────────────────────────
+@admin_group.command(name="metricas", description="Métricas de runtime (comandos, listeners, loop, pool, caches).")
+async def admin_metricas(inter: discord.Interaction):
+    if not is_owner(inter):
+        return await inter.response.send_message("❌ Sem permissão.", ephemeral=True)
+
+    embed = discord.Embed(title="📈 Métricas de Runtime", color=0x3498DB, timestamp=datetime.datetime.utcnow())
+
+    def _top(hist: metrics.Histogram, n: int = 8) -> str:
+        series = sorted(hist.series.items(), key=lambda kv: kv[1].n, reverse=True)[:n]
+        return "\n".join(
+            f"`{labels[0]}` — {s.n}x · média {s.soma / s.n * 1000:.0f}ms · "
+            f"p95 {hist.quantil(labels, 0.95) * 1000:.0f}ms"
+            for labels, s in series
+        ) or "—"
+
+    erros = sum(v for (cmd, status), v in metrics.comandos.valores.items() if status == "erro")
+    embed.add_field(name=f"⌨️ Comandos ({metrics.comandos.total():.0f} · {erros:.0f} erro(s))",
+                    value=_top(metrics.comando_duracao), inline=False)
+    embed.add_field(name="🎧 Listeners", value=_top(metrics.listener_duracao, 6), inline=False)
+
+    lag = metrics.loop_lag.coletar().get((), 0.0)
+    lag_max = metrics.loop_lag_max.coletar().get((), 0.0)
+    embed.add_field(name="🔁 Event loop", value=f"lag `{lag * 1000:.1f}ms` · máx `{lag_max * 1000:.0f}ms`", inline=True)
+    embed.add_field(name="📡 Gateway",
+                    value=f"`{metrics.gateway_taxa.taxa():.1f}` eventos/s · total `{metrics.gateway_eventos.total():.0f}`",
+                    inline=True)
+    try:
+        pool = get_pool()
+        espera_p95 = db_pool.espera_hist.quantil((), 0.95) * 1000
+        embed.add_field(name=f"🗄️ Pool DB ({get_db_mode()})",
+                        value=f"`{pool.em_uso}/{pool.limite}` em uso (teto `{pool.get_max_size()}`)\n"
+                              f"espera p95 `{espera_p95:.0f}ms` · timeouts `{db_pool.timeouts.total():.0f}`",
+                        inline=True)
+    except RuntimeError:
+        pass
+
+    caches = metrics.cache_acerto.coletar()
+    if caches:
+        embed.add_field(
+            name="🧠 Caches",
+            value="\n".join(f"`{nome}` — {taxa * 100:.0f}% de acerto" for (nome,), taxa in caches.items()),
+            inline=False,
+        )
+
+    watchdog = getattr(inter.client, "watchdog", None)
+    if watchdog and watchdog.historico:
+        agora = time.monotonic()
+        embed.add_field(
+            name=f"🐢 Travamentos recentes ({len(watchdog.historico)})",
+            value="\n".join(
+                f"`{t.duracao * 1000:.0f}ms` em `{t.origem}` — há {int(agora - t.inicio)}s"
+                for t in list(watchdog.historico)[-5:][::-1]
+            ),
+            inline=False,
+        )
+    await inter.response.send_message(embed=embed, ephemeral=True)
+
+
+# ── /admin db-indices ──────────────────────────────────────────────────────────
+@admin_group.command(name="db-indices", description="Uso dos índices das queries quentes (pg_stat_user_indexes).")
+async def admin_db_indices(inter: discord.Interaction):
+    if not is_owner(inter):
+        return await inter.response.send_message("❌ Sem permissão.", ephemeral=True)
+
+    rows = {r["indice"]: r for r in await indices.relatorio()}
+    gerenciados = {i.nome for i in indices.INDICES}
+
+    linhas = []
+    for i in indices.INDICES:
+        r = rows.get(i.nome)
+        if r is None:
+            linhas.append(f"⏳ `{i.nome}` — ainda não criado · {i.uso}")
+        elif not r["valido"]:
+            linhas.append(f"⚠️ `{i.nome}` — inválido (será refeito no próximo início)")
+        else:
+            marca = "✅" if r["idx_scan"] else "💤"
+            linhas.append(f"{marca} `{i.nome}` — {r['idx_scan']} scan(s) · "
+                          f"{r['bytes'] / 1024:.0f} KB · {i.uso}")
+
+    outros = [
+        f"{'✅' if r['idx_scan'] else '💤'} `{r['tabela']}.{nome}` — {r['idx_scan']} scan(s) · {r['bytes'] / 1024:.0f} KB"
+        for nome, r in rows.items() if nome not in gerenciados
+    ]
+
+    embed = discord.Embed(title="🗂️ Índices do banco", color=0x3498DB, timestamp=datetime.datetime.utcnow())
+    embed.description = "**Conjunto gerenciado**\n" + "\n".join(linhas)
+    if outros:
+        embed.description += "\n\n**Demais índices das mesmas tabelas**\n" + "\n".join(outros[:20])
+    embed.set_footer(text="💤 = sem uso desde o último reset das estatísticas")
     await inter.response.send_message(embed=embed, ephemeral=True)
 
 
@@ -115,6 +269,144 @@ async def admin_sair(inter: discord.Interaction, guild_id: str):
     )
 
 
+# ── Broadcast (job em segundo plano) ───────────────────────────────────────────
+# Workers paralelos limitados por um token bucket global; o progresso fica em
+# broadcast_entregas para o job continuar de onde parou após um reinício.
+
+BROADCAST_WORKERS = 8
+BROADCAST_TAXA    = 20.0   # envios/s — bem abaixo do limite global de 50 req/s do Discord
+_IPC_SERVIDORES   = 40     # servidores por cluster no /admin servidores (limite do NOTIFY)
+
+_canal_preferido: dict[int, int] = {}   # guild_id → canal usado no último broadcast bem-sucedido
+
+
+class _TokenBucket:
+    def __init__(self, taxa: float, capacidade: int):
+        self.taxa       = taxa
+        self.capacidade = capacidade
+        self._tokens    = float(capacidade)
+        self._ultimo    = time.monotonic()
+        self._lock      = asyncio.Lock()
+
+    async def adquirir(self):
+        async with self._lock:
+            while True:
+                agora = time.monotonic()
+                self._tokens = min(self.capacidade, self._tokens + (agora - self._ultimo) * self.taxa)
+                self._ultimo = agora
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.taxa)
+
+
+def _escolher_canal(guild: discord.Guild) -> discord.TextChannel | None:
+    me = guild.me
+    cid = _canal_preferido.get(guild.id)
+    ch = guild.get_channel(cid) if cid else None
+    if isinstance(ch, discord.TextChannel) and ch.permissions_for(me).send_messages:
+        return ch
+    candidatos = [guild.system_channel, guild.public_updates_channel, *guild.text_channels]
+    for ch in candidatos:
+        if isinstance(ch, discord.TextChannel) and ch.permissions_for(me).send_messages:
+            _canal_preferido[guild.id] = ch.id
+            return ch
+    _canal_preferido.pop(guild.id, None)
+    return None
+
+
+class BroadcastJob:
+    """Parte de um broadcast que cabe a este processo (os servidores dos seus shards)."""
+
+    def __init__(self, bot: commands.Bot, job_id: int, mensagem: str, guild_ids: list[int]):
+        self.bot       = bot
+        self.id        = job_id
+        self.mensagem  = mensagem
+        self.pendentes = guild_ids
+        self.enviados  = 0   # nesta sessão; o total do job (todos os clusters) fica no banco
+        self.falhas    = 0
+        self.inicio    = time.monotonic()
+        self.feitos_sessao = 0
+        # O limite global do Discord é por token: a taxa é dividida entre os clusters
+        self._bucket   = _TokenBucket(BROADCAST_TAXA / bot.cluster.total, BROADCAST_WORKERS)
+        self._fila: asyncio.Queue[int] = asyncio.Queue()
+        self.task: asyncio.Task | None = None
+        self.cancelado = False
+
+    def iniciar(self):
+        self.task = asyncio.create_task(self._executar())
+
+    def _embed(self) -> discord.Embed:
+        embed = discord.Embed(
+            title="📢 Aviso do desenvolvedor",
+            description=self.mensagem,
+            color=0xE74C3C,
+            timestamp=datetime.datetime.utcnow(),
+        )
+        embed.set_footer(text="Logos Bot")
+        return embed
+
+    async def _marcar(self, guild_id: int, channel_id: int | None, ok: bool):
+        """Grava a entrega antes do próximo envio: um reinício reenvia no máximo as que estavam em voo."""
+        # Entrega e contadores numa só query; incremental porque vários clusters gravam no mesmo job
+        await get_pool().execute("""
+            WITH e AS (
+                INSERT INTO broadcast_entregas (job_id, guild_id, channel_id, ok)
+                VALUES ($1, $2, $3, $4) ON CONFLICT DO NOTHING
+                RETURNING ok
+            )
+            UPDATE broadcast_jobs SET
+                enviados = enviados + (SELECT COUNT(*) FROM e WHERE ok),
+                falhas   = falhas   + (SELECT COUNT(*) FROM e WHERE NOT ok)
+            WHERE id=$1
+        """, self.id, guild_id, channel_id, ok)
+
+    async def _worker(self):
+        embed = self._embed()
+        while not self.cancelado:
+            try:
+                guild_id = self._fila.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            guild = self.bot.get_guild(guild_id)
+            canal = _escolher_canal(guild) if guild else None
+            ok = False
+            if canal:
+                await self._bucket.adquirir()
+                try:
+                    await canal.send(embed=embed)
+                    ok = True
+                except discord.HTTPException:
+                    _canal_preferido.pop(guild_id, None)
+            if ok:
+                self.enviados += 1
+            else:
+                self.falhas += 1
+            self.feitos_sessao += 1
+            await self._marcar(guild_id, canal.id if canal else None, ok)
+
+    async def _executar(self):
+        for gid in self.pendentes:
+            self._fila.put_nowait(gid)
+        # Desligamento (CancelledError) deixa o job como 'rodando' para retomar
+        await asyncio.gather(*(self._worker() for _ in range(BROADCAST_WORKERS)))
+        status = "cancelado" if self.cancelado else "concluido"
+        # O job só termina quando todos os clusters concluíram a sua parte
+        async with get_pool().acquire() as conn:
+            async with conn.transaction():
+                await conn.execute(
+                    "INSERT INTO broadcast_clusters (job_id, cluster_id) VALUES ($1, $2) ON CONFLICT DO NOTHING",
+                    self.id, self.bot.cluster.id,
+                )
+                await conn.execute("""
+                    UPDATE broadcast_jobs SET status=$2, concluido_em=NOW()
+                    WHERE id=$1 AND status='rodando'
+                      AND (SELECT COUNT(*) FROM broadcast_clusters WHERE job_id=$1) >= clusters
+                """, self.id, status)
+        log.info(f"[BROADCAST] Job #{self.id} ({status}): {self.enviados} enviado(s), "
+                 f"{self.falhas} falha(s) neste cluster")
+
+
 # ── /admin broadcast ───────────────────────────────────────────────────────────
 @admin_group.command(name="broadcast", description="Envia uma mensagem para todos os servidores.")
 @app_commands.describe(mensagem="Mensagem a ser enviada em todos os servidores")
@@ -122,42 +414,80 @@ async def admin_broadcast(inter: discord.Interaction, mensagem: str):
     if not is_owner(inter):
         return await inter.response.send_message("❌ Sem permissão.", ephemeral=True)
 
-    await inter.response.defer(ephemeral=True)
-
-    enviados, falhas = 0, 0
-    for guild in inter.client.guilds:
-        canal = None
-
-        # Tenta achar um canal de texto adequado
-        for ch in guild.text_channels:
-            if ch.permissions_for(guild.me).send_messages:
-                canal = ch
-                break
-
-        if canal:
-            try:
-                embed = discord.Embed(
-                    title="📢 Aviso do desenvolvedor",
-                    description=mensagem,
-                    color=0xE74C3C,
-                    timestamp=datetime.datetime.utcnow(),
-                )
-                embed.set_footer(text="Logos Bot")
-                await canal.send(embed=embed)
-                enviados += 1
-            except Exception:
-                falhas += 1
-        else:
-            falhas += 1
+    async with get_pool().acquire() as conn:
+        em_andamento = await conn.fetchval("SELECT id FROM broadcast_jobs WHERE status='rodando' LIMIT 1")
+    if em_andamento:
+        return await inter.response.send_message(
+            f"❌ Já existe um broadcast em andamento (job `#{em_andamento}`). Use `/admin broadcast-status`.",
+            ephemeral=True,
+        )
 
-        await asyncio.sleep(0.5)  # evita rate limit
+    await inter.response.defer(ephemeral=True)
+    cluster = inter.client.cluster
+    respostas = await cluster.pedir("servidores", {"limite": 0})
+    total = sum(r["total"] for r in respostas)
+    async with get_pool().acquire() as conn:
+        job_id = await conn.fetchval(
+            "INSERT INTO broadcast_jobs (mensagem, total, clusters) VALUES ($1, $2, $3) RETURNING id",
+            mensagem, total, cluster.total,
+        )
+    # Cada cluster envia para os servidores dos seus shards
+    await cluster.publicar("broadcast", {"job_id": job_id})
 
     await inter.followup.send(
-        f"✅ Broadcast concluído!\n📨 Enviado: `{enviados}` servidores\n❌ Falhou: `{falhas}` servidores",
+        f"✅ Broadcast `#{job_id}` iniciado para `{total}` servidores.\n"
+        f"📊 Acompanhe com `/admin broadcast-status`.",
         ephemeral=True,
     )
 
 
+# ── /admin broadcast-status ────────────────────────────────────────────────────
+@admin_group.command(name="broadcast-status", description="Mostra o progresso do último broadcast.")
+@app_commands.describe(cancelar="Cancela o broadcast em andamento")
+async def admin_broadcast_status(inter: discord.Interaction, cancelar: bool = False):
+    if not is_owner(inter):
+        return await inter.response.send_message("❌ Sem permissão.", ephemeral=True)
+
+    cog = inter.client.cogs.get("Admin")
+    job = cog.broadcast
+
+    async with get_pool().acquire() as conn:
+        if cancelar:
+            cancelado = await conn.fetchval(
+                "UPDATE broadcast_jobs SET status='cancelado', concluido_em=NOW() "
+                "WHERE status='rodando' RETURNING id"
+            )
+            if cancelado:
+                await inter.client.cluster.publicar("broadcast_cancelar", {"job_id": cancelado})
+        row = await conn.fetchrow("SELECT * FROM broadcast_jobs ORDER BY id DESC LIMIT 1")
+    if not row:
+        return await inter.response.send_message("❌ Nenhum broadcast registrado.", ephemeral=True)
+
+    # Contadores do banco somam todos os clusters (gravados a cada entrega)
+    ativo = job is not None and job.id == row["id"] and not job.task.done()
+    enviados = row["enviados"]
+    falhas   = row["falhas"]
+    feitos   = enviados + falhas
+    status   = "cancelando" if ativo and row["status"] == "cancelado" else row["status"]
+
+    embed = discord.Embed(title=f"📢 Broadcast #{row['id']}", color=0x3498DB, timestamp=datetime.datetime.utcnow())
+    embed.add_field(name="📌 Status", value=f"`{status}`", inline=True)
+    embed.add_field(name="📊 Progresso", value=f"`{feitos}/{row['total']}`", inline=True)
+    embed.add_field(name="📨 Enviados", value=f"`{enviados}`", inline=True)
+    embed.add_field(name="❌ Falhas", value=f"`{falhas}`", inline=True)
+    if ativo:
+        decorrido = time.monotonic() - job.inicio
+        taxa = job.feitos_sessao / decorrido if decorrido > 0 else 0
+        restante = row["total"] - feitos
+        eta = f"`{restante / taxa:.0f}s`" if taxa > 0 else "`—`"
+        if inter.client.cluster.ativo:
+            taxa *= inter.client.cluster.total   # estimativa: clusters enviam em ritmo parecido
+        embed.add_field(name="⚡ Taxa", value=f"`{taxa:.1f}/s`", inline=True)
+        embed.add_field(name="⏳ ETA", value=eta, inline=True)
+    embed.add_field(name="📝 Mensagem", value=row["mensagem"][:1000], inline=False)
+    await inter.response.send_message(embed=embed, ephemeral=True)
+
+
 # ── /admin recarregar ──────────────────────────────────────────────────────────
 @admin_group.command(name="recarregar", description="Recarrega um cog sem reiniciar o bot.")
 @app_commands.describe(cog="Nome do cog (ex: cogs.xp)")
@@ -216,11 +546,83 @@ async def admin_inspecionar(inter: discord.Interaction, guild_id: str):
 class Admin(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
+        self.broadcast: BroadcastJob | None = None
         bot.tree.add_command(admin_group)
 
+    async def cog_load(self):
+        cluster = self.bot.cluster
+        cluster.registrar("servidores", self._ipc_servidores)
+        cluster.registrar("stats", self._ipc_stats)
+        cluster.registrar("broadcast", self._ipc_broadcast)
+        cluster.registrar("broadcast_cancelar", self._ipc_broadcast_cancelar)
+        asyncio.create_task(self._retomar_broadcast())
+
+    # ── IPC (respostas deste cluster) ──────────────────────────────────────
+
+    async def _ipc_servidores(self, dados: dict) -> dict:
+        limite = dados.get("limite")
+        guilds = sorted(self.bot.guilds, key=lambda g: g.member_count or 0, reverse=True)
+        if limite is not None:
+            guilds = guilds[:limite]
+        resposta = {
+            "total": len(self.bot.guilds),
+            "servidores": [[g.name[:50], g.id, g.member_count or 0] for g in guilds],
+        }
+        # Nomes longos com emoji podem estourar o limite do NOTIFY: corta os menores servidores
+        while resposta["servidores"] and not self.bot.cluster.cabe(resposta):
+            resposta["servidores"].pop()
+        return resposta
+
+    async def _ipc_stats(self, _dados: dict) -> dict:
+        ids = sorted(self.bot.shards) if hasattr(self.bot, "shards") else [0]
+        return {
+            "shards": f"{ids[0]}–{ids[-1]}" if len(ids) > 1 else str(ids[0]),
+            "servidores": len(self.bot.guilds),
+            "membros": sum(g.member_count or 0 for g in self.bot.guilds),
+            "latencia_ms": round(self.bot.latency * 1000),
+            "mem_mb": psutil.Process(os.getpid()).memory_info().rss / 1024 / 1024,
+        }
+
+    async def _ipc_broadcast(self, dados: dict):
+        await self._retomar_broadcast(dados["job_id"])
+
+    async def _ipc_broadcast_cancelar(self, dados: dict):
+        if self.broadcast and self.broadcast.id == dados["job_id"]:
+            self.broadcast.cancelado = True
+
     async def cog_unload(self):
+        if self.broadcast and self.broadcast.task and not self.broadcast.task.done():
+            self.broadcast.task.cancel()
         self.bot.tree.remove_command(admin_group.name)
 
+    async def _retomar_broadcast(self, job_id: int | None = None):
+        """Executa a parte deste cluster de um job novo (job_id) ou interrompido por reinício."""
+        if self.broadcast and self.broadcast.task and not self.broadcast.task.done():
+            return
+        async with get_pool().acquire() as conn:
+            if job_id is None:
+                job = await conn.fetchrow(
+                    "SELECT * FROM broadcast_jobs WHERE status='rodando' ORDER BY id DESC LIMIT 1"
+                )
+            else:
+                job = await conn.fetchrow("SELECT * FROM broadcast_jobs WHERE id=$1 AND status='rodando'", job_id)
+            if not job:
+                return
+            if await conn.fetchval(
+                "SELECT 1 FROM broadcast_clusters WHERE job_id=$1 AND cluster_id=$2",
+                job["id"], self.bot.cluster.id,
+            ):
+                return   # a parte deste cluster já terminou
+            feitos = {r["guild_id"] for r in await conn.fetch(
+                "SELECT guild_id FROM broadcast_entregas WHERE job_id=$1", job["id"]
+            )}
+        await self.bot.wait_until_ready()
+        pendentes = [g.id for g in self.bot.guilds if g.id not in feitos]
+        if job_id is None:
+            log.info(f"[BROADCAST] Retomando job #{job['id']}: {len(pendentes)} servidor(es) pendente(s)")
+        self.broadcast = BroadcastJob(self.bot, job["id"], job["mensagem"], pendentes)
+        self.broadcast.iniciar()
+
 
 async def setup(bot: commands.Bot):
     await bot.add_cog(Admin(bot))
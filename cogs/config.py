@@ -204,6 +204,9 @@ class Config(commands.Cog):
     @app_commands.describe(canal="Canal de texto")
     async def cfg_log(self, inter: discord.Interaction, canal: discord.TextChannel):
         await db.upsert_guild_config(inter.guild.id, log_channel=canal.id)
+        logs_cog = inter.client.cogs.get("Logs")
+        if logs_cog:
+            logs_cog.ativar(inter.guild.id)
         await inter.response.send_message(
             embed=success_embed("Canal de log definido", f"{E.ARROW_BLUE} Logs em {canal.mention}."),
             ephemeral=True,
@@ -265,7 +268,6 @@ class Config(commands.Cog):
             ["*porn*", "*nude*", "*nudes*", "*pack*", "onlyfans.com/*"],
         ]
 
-        import aiohttp
         TOKEN = __import__("os").environ.get("BOT_TOKEN", "")
         url = f"https://discord.com/api/v10/guilds/{inter.guild.id}/auto-moderation/rules"
         headers = {
@@ -273,18 +275,17 @@ class Config(commands.Cog):
             "Content-Type": "application/json",
         }
         criadas = 0
-        async with aiohttp.ClientSession() as session:
-            for i, kw in enumerate(KEYWORDS_BLOCKS):
-                payload = {
-                    "name": f"[Bot] Palavras bloqueadas #{i+1}",
-                    "event_type": 1, "trigger_type": 1,
-                    "trigger_metadata": {"keyword_filter": kw},
-                    "actions": [{"type": 1, "metadata": {"custom_message": "Mensagem bloqueada."}}],
-                    "enabled": True,
-                }
-                async with session.post(url, json=payload, headers=headers) as resp:
-                    if resp.status in (200, 201):
-                        criadas += 1
+        for i, kw in enumerate(KEYWORDS_BLOCKS):
+            payload = {
+                "name": f"[Bot] Palavras bloqueadas #{i+1}",
+                "event_type": 1, "trigger_type": 1,
+                "trigger_metadata": {"keyword_filter": kw},
+                "actions": [{"type": 1, "metadata": {"custom_message": "Mensagem bloqueada."}}],
+                "enabled": True,
+            }
+            async with self.bot.http_client.post(url, json=payload, headers=headers) as resp:
+                if resp.status in (200, 201):
+                    criadas += 1
 
         await inter.followup.send(embed=success_embed("AutoMod configurado!",
             f"{E.ARROW_GREEN} **{criadas}** regra(s) criadas.\n"
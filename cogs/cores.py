@@ -9,6 +9,7 @@ from discord import app_commands
 from discord.ext import commands
 import logging
 import json
+from typing import NamedTuple
 
 from db.database import init_pool
 
@@ -60,32 +61,50 @@ BTN_PAD = "\u2000" * 7  # padding para botões mais largos
 # STORAGE — salva configs no banco (tabela cores_config)
 # ═══════════════════════════════════════════════════════════════
 
+class IndiceCores(NamedTuple):
+    """Cargos de cor de uma guild, pré-calculados a partir das chaves role_*."""
+    por_chave: dict[str, int]   # chave da cor → role_id
+    por_cargo: dict[int, str]   # role_id → chave da cor
+    todos:     frozenset[int]
+
+
+_INDICE_VAZIO = IndiceCores({}, {}, frozenset())
+_CHAVES_COR   = [key for key, *_ in CORES_NORMAIS + CORES_DEGRADE]
+
+
 class CoresStorage:
     """Armazena configurações de cores por guild no PostgreSQL."""
 
     def __init__(self):
-        self._cache: dict[int, dict] = {}
+        self._cache:   dict[int, dict]        = {}
+        self._indices: dict[int, IndiceCores] = {}
+
+    def _reindexar(self, guild_id: int):
+        cfg = self._cache.get(guild_id, {})
+        por_chave = {}
+        for key in _CHAVES_COR:
+            val = cfg.get(f"role_{key}")
+            if val:
+                por_chave[key] = int(val)
+        self._indices[guild_id] = IndiceCores(
+            por_chave,
+            {rid: key for key, rid in por_chave.items()},
+            frozenset(por_chave.values()),
+        )
 
-    async def _ensure_table(self):
-        from db.database import get_pool
-        await get_pool().execute("""
-            CREATE TABLE IF NOT EXISTS cores_config (
-                guild_id BIGINT NOT NULL,
-                key      TEXT   NOT NULL,
-                value    TEXT   NOT NULL,
-                PRIMARY KEY (guild_id, key)
-            )
-        """)
+    def indice(self, guild_id: int) -> IndiceCores:
+        return self._indices.get(guild_id, _INDICE_VAZIO)
 
     async def preload(self):
         from db.database import get_pool
-        await self._ensure_table()
         rows = await get_pool().fetch("SELECT guild_id, key, value FROM cores_config")
         for row in rows:
             gid = row["guild_id"]
             if gid not in self._cache:
                 self._cache[gid] = {}
             self._cache[gid][row["key"]] = row["value"]
+        for gid in self._cache:
+            self._reindexar(gid)
 
     async def get(self, guild_id: int, key: str) -> str | None:
         return self._cache.get(guild_id, {}).get(key)
@@ -100,6 +119,8 @@ class CoresStorage:
         if guild_id not in self._cache:
             self._cache[guild_id] = {}
         self._cache[guild_id][key] = value
+        if key.startswith("role_"):
+            self._reindexar(guild_id)
 
 
 # Instância global
@@ -284,17 +305,11 @@ class Cores(commands.Cog):
     async def _set(self, guild_id: int, key: str, value: str):
         await storage.set(guild_id, key, value)
 
-    async def _role_id(self, guild_id: int, key: str) -> int | None:
-        val = await storage.get(guild_id, f"role_{key}")
-        return int(val) if val else None
+    def _role_id(self, guild_id: int, key: str) -> int | None:
+        return storage.indice(guild_id).por_chave.get(key)
 
-    async def _all_color_role_ids(self, guild_id: int) -> set[int]:
-        ids = set()
-        for key, *_ in CORES_NORMAIS + CORES_DEGRADE:
-            rid = await self._role_id(guild_id, key)
-            if rid:
-                ids.add(rid)
-        return ids
+    def _all_color_role_ids(self, guild_id: int) -> frozenset[int]:
+        return storage.indice(guild_id).todos
 
     async def toggle_color_role(self, inter: discord.Interaction, key: str, degrade: bool):
         await inter.response.defer(ephemeral=True)
@@ -312,7 +327,7 @@ class Cores(commands.Cog):
                     )
                     return
 
-        role_id = await self._role_id(inter.guild.id, key)
+        role_id = self._role_id(inter.guild.id, key)
         if not role_id:
             await inter.followup.send(
                 embed=embed_error("Cor não configurada", "Esta cor ainda não foi configurada pelo admin."),
@@ -328,22 +343,27 @@ class Cores(commands.Cog):
             )
             return
 
-        # Remove todas as cores do mesmo tipo antes de adicionar
-        all_ids = await self._all_color_role_ids(inter.guild.id)
-        roles_to_remove = [r for r in member.roles if r.id in all_ids and r.id != role.id]
-        if roles_to_remove:
-            await member.remove_roles(*roles_to_remove, reason="Nick Color: troca de cor")
+        # Troca em uma única chamada: tira todas as cores e, se for o caso, aplica a nova
+        all_ids   = self._all_color_role_ids(inter.guild.id)
+        atuais    = [r for r in member.roles if not r.is_default()]
+        possuidas = all_ids.intersection(r.id for r in atuais)
+        removendo = role.id in possuidas
+        novos = [r for r in atuais if r.id not in all_ids]
+        if not removendo:
+            novos.append(role)
+        await member.edit(
+            roles=novos,
+            reason="Nick Color: removida pelo usuário" if removendo else "Nick Color: troca de cor",
+        )
 
         # Toggle
-        if role in member.roles:
-            await member.remove_roles(role, reason="Nick Color: removida pelo usuário")
+        if removendo:
             label = next((l for k, l, *_ in (CORES_DEGRADE if degrade else CORES_NORMAIS) if k == key), key)
             await inter.followup.send(
                 embed=embed_info("Cor removida", f"A cor **{label}** foi removida do seu nick."),
                 ephemeral=True,
             )
         else:
-            await member.add_roles(role, reason="Nick Color: adicionada pelo usuário")
             label = next((l for k, l, *_ in (CORES_DEGRADE if degrade else CORES_NORMAIS) if k == key), key)
             await inter.followup.send(
                 embed=embed_success("Cor aplicada!", f"A cor **{label}** foi aplicada ao seu nick."),
@@ -421,7 +441,7 @@ class Cores(commands.Cog):
 
         linhas = []
         for key, label, emoji_str, hex_c in CORES_NORMAIS:
-            rid = await self._role_id(inter.guild.id, key)
+            rid = self._role_id(inter.guild.id, key)
             role = inter.guild.get_role(rid) if rid else None
             linhas.append(f"{emoji_str} **{label}** → {role.mention if role else '*não configurada*'}")
 
@@ -455,7 +475,7 @@ class Cores(commands.Cog):
 
         linhas = []
         for key, label, emoji_str, _ in CORES_DEGRADE:
-            rid = await self._role_id(inter.guild.id, key)
+            rid = self._role_id(inter.guild.id, key)
             role = inter.guild.get_role(rid) if rid else None
             linhas.append(f"{emoji_str} **{label}** → {role.mention if role else '*não configurada*'}")
 
@@ -490,14 +510,14 @@ class Cores(commands.Cog):
 
         normais_txt = []
         for key, label, emoji_str, _ in CORES_NORMAIS:
-            rid = await self._role_id(inter.guild.id, key)
+            rid = self._role_id(inter.guild.id, key)
             role = inter.guild.get_role(rid) if rid else None
             normais_txt.append(f"{emoji_str} {label}: {role.mention if role else '`não configurado`'}")
         emb.add_field(name="🎨 Cores Normais", value="\n".join(normais_txt), inline=False)
 
         degrade_txt = []
         for key, label, emoji_str, _ in CORES_DEGRADE:
-            rid = await self._role_id(inter.guild.id, key)
+            rid = self._role_id(inter.guild.id, key)
             role = inter.guild.get_role(rid) if rid else None
             degrade_txt.append(f"{emoji_str} {label}: {role.mention if role else '`não configurado`'}")
         emb.add_field(name="✨ Cores Degradê", value="\n".join(degrade_txt), inline=False)
@@ -513,10 +533,12 @@ class Cores(commands.Cog):
     @app_commands.default_permissions(manage_roles=True)
     async def cores_remover(self, inter: discord.Interaction, membro: discord.Member):
         await inter.response.defer(ephemeral=True)
-        all_ids = await self._all_color_role_ids(inter.guild.id)
-        to_remove = [r for r in membro.roles if r.id in all_ids]
-        if to_remove:
-            await membro.remove_roles(*to_remove, reason=f"Nick Color: remoção por {inter.user}")
+        all_ids = self._all_color_role_ids(inter.guild.id)
+        if all_ids.intersection(r.id for r in membro.roles):
+            await membro.edit(
+                roles=[r for r in membro.roles if not r.is_default() and r.id not in all_ids],
+                reason=f"Nick Color: remoção por {inter.user}",
+            )
         await inter.followup.send(
             embed=embed_success("Cores removidas", f"Todas as cores de {membro.mention} foram removidas."),
             ephemeral=True,
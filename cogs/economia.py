@@ -10,7 +10,7 @@ from discord.ext import commands
 import json
 import logging
 from datetime import datetime, timezone, timedelta
-from db.database import get_pool
+from db.repositorio import unidade
 from utils.constants import Colors, E, success_embed, error_embed, _now
 
 log = logging.getLogger("multibot.economia")
@@ -20,106 +20,10 @@ DAILY_VALOR  = 200
 DAILY_HORAS  = 24
 
 
-async def _ensure_tables():
-    async with get_pool().acquire() as conn:
-        await conn.execute("""
-            CREATE TABLE IF NOT EXISTS economia (
-                guild_id    BIGINT,
-                user_id     BIGINT,
-                saldo       BIGINT DEFAULT 0,
-                daily_last  TIMESTAMPTZ,
-                PRIMARY KEY (guild_id, user_id)
-            );
-            CREATE TABLE IF NOT EXISTS loja (
-                id          SERIAL PRIMARY KEY,
-                guild_id    BIGINT NOT NULL,
-                nome        TEXT NOT NULL,
-                descricao   TEXT,
-                preco       BIGINT NOT NULL,
-                role_id     BIGINT,
-                estoque     INT DEFAULT -1,
-                created_at  TIMESTAMPTZ DEFAULT NOW()
-            );
-            CREATE TABLE IF NOT EXISTS compras (
-                id          SERIAL PRIMARY KEY,
-                guild_id    BIGINT NOT NULL,
-                user_id     BIGINT NOT NULL,
-                item_id     INT NOT NULL,
-                preco_pago  BIGINT NOT NULL,
-                created_at  TIMESTAMPTZ DEFAULT NOW()
-            );
-        """)
-
-
-async def _get_saldo(guild_id: int, user_id: int) -> int:
-    async with get_pool().acquire() as conn:
-        row = await conn.fetchrow(
-            "SELECT saldo FROM economia WHERE guild_id=$1 AND user_id=$2", guild_id, user_id
-        )
-    return row["saldo"] if row else 0
-
-
-async def _set_saldo(guild_id: int, user_id: int, saldo: int):
-    async with get_pool().acquire() as conn:
-        await conn.execute("""
-            INSERT INTO economia (guild_id, user_id, saldo)
-            VALUES ($1,$2,$3)
-            ON CONFLICT (guild_id, user_id) DO UPDATE SET saldo=$3
-        """, guild_id, user_id, max(0, saldo))
-
-
-async def _add_saldo(guild_id: int, user_id: int, valor: int) -> int:
-    async with get_pool().acquire() as conn:
-        row = await conn.fetchrow("""
-            INSERT INTO economia (guild_id, user_id, saldo)
-            VALUES ($1,$2,$3)
-            ON CONFLICT (guild_id, user_id) DO UPDATE SET saldo = economia.saldo + $3
-            RETURNING saldo
-        """, guild_id, user_id, valor)
-    return row["saldo"]
-
-
-async def _get_daily_last(guild_id: int, user_id: int) -> datetime | None:
-    async with get_pool().acquire() as conn:
-        row = await conn.fetchrow(
-            "SELECT daily_last FROM economia WHERE guild_id=$1 AND user_id=$2", guild_id, user_id
-        )
-    return row["daily_last"] if row else None
-
-
-async def _set_daily_last(guild_id: int, user_id: int):
-    async with get_pool().acquire() as conn:
-        await conn.execute("""
-            INSERT INTO economia (guild_id, user_id, daily_last)
-            VALUES ($1,$2,NOW())
-            ON CONFLICT (guild_id, user_id) DO UPDATE SET daily_last=NOW()
-        """, guild_id, user_id)
-
-
-async def _get_ranking(guild_id: int, limit: int = 10) -> list[dict]:
-    async with get_pool().acquire() as conn:
-        rows = await conn.fetch("""
-            SELECT user_id, saldo FROM economia
-            WHERE guild_id=$1 ORDER BY saldo DESC LIMIT $2
-        """, guild_id, limit)
-    return [dict(r) for r in rows]
-
-
-async def _get_loja(guild_id: int) -> list[dict]:
-    async with get_pool().acquire() as conn:
-        rows = await conn.fetch(
-            "SELECT * FROM loja WHERE guild_id=$1 ORDER BY preco ASC", guild_id
-        )
-    return [dict(r) for r in rows]
-
-
 class Economia(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
 
-    async def cog_load(self):
-        await _ensure_tables()
-
     eco_group = app_commands.Group(name="eco", description="Sistema de economia do servidor")
 
     # ── Públicos ──────────────────────────────────────────────────────────
@@ -128,7 +32,8 @@ class Economia(commands.Cog):
     @app_commands.describe(membro="Membro a consultar")
     async def saldo(self, inter: discord.Interaction, membro: discord.Member = None):
         m     = membro or inter.user
-        valor = await _get_saldo(inter.guild.id, m.id)
+        async with unidade() as uow:
+            valor = await uow.economia.saldo(inter.guild.id, m.id)
         emb   = discord.Embed(
             title=f"{MOEDA} Saldo de {m.display_name}",
             description=f"**{valor:,}** moedas",
@@ -141,25 +46,24 @@ class Economia(commands.Cog):
 
     @eco_group.command(name="daily", description=f"Colete suas moedas diárias ({DAILY_VALOR} moedas / {DAILY_HORAS}h)")
     async def daily(self, inter: discord.Interaction):
-        last = await _get_daily_last(inter.guild.id, inter.user.id)
+        # Crédito e marcação numa query; o daily_last só é lido quando a coleta é recusada
+        async with unidade() as uow:
+            novo_saldo = await uow.economia.coletar_daily(inter.guild.id, inter.user.id, DAILY_VALOR, DAILY_HORAS)
+            last = await uow.economia.daily_last(inter.guild.id, inter.user.id) if novo_saldo is None else None
         agora = datetime.now(tz=timezone.utc)
 
-        if last:
-            proximo = last + timedelta(hours=DAILY_HORAS)
-            if agora < proximo:
-                restante = proximo - agora
-                horas    = int(restante.total_seconds() // 3600)
-                minutos  = int((restante.total_seconds() % 3600) // 60)
-                return await inter.response.send_message(
-                    embed=error_embed("Daily já coletado!",
-                        f"{E.LOADING} Próximo daily disponível em **{horas}h {minutos}m**.\n"
-                        f"{E.ARROW_BLUE} Volte em {discord.utils.format_dt(proximo, 'R')}."
-                    ),
-                    ephemeral=True,
-                )
-
-        novo_saldo = await _add_saldo(inter.guild.id, inter.user.id, DAILY_VALOR)
-        await _set_daily_last(inter.guild.id, inter.user.id)
+        if novo_saldo is None:
+            proximo  = last + timedelta(hours=DAILY_HORAS)
+            restante = max(proximo - agora, timedelta(0))
+            horas    = int(restante.total_seconds() // 3600)
+            minutos  = int((restante.total_seconds() % 3600) // 60)
+            return await inter.response.send_message(
+                embed=error_embed("Daily já coletado!",
+                    f"{E.LOADING} Próximo daily disponível em **{horas}h {minutos}m**.\n"
+                    f"{E.ARROW_BLUE} Volte em {discord.utils.format_dt(proximo, 'R')}."
+                ),
+                ephemeral=True,
+            )
 
         emb = discord.Embed(
             title=f"{E.BEAR} Daily coletado! {MOEDA}",
@@ -188,8 +92,13 @@ class Economia(commands.Cog):
                 embed=error_embed("Erro", "Não é possível transferir para bots."), ephemeral=True
             )
 
-        saldo_origem = await _get_saldo(inter.guild.id, inter.user.id)
-        if saldo_origem < valor:
+        async with unidade(transacao=True) as uow:
+            restante = await uow.economia.debitar(inter.guild.id, inter.user.id, valor)
+            if restante is None:
+                saldo_origem = await uow.economia.saldo(inter.guild.id, inter.user.id)
+            else:
+                novo_destino = await uow.economia.creditar(inter.guild.id, membro.id, valor)
+        if restante is None:
             return await inter.response.send_message(
                 embed=error_embed("Saldo insuficiente",
                     f"Você tem **{saldo_origem:,}** moedas e tentou transferir **{valor:,}**."
@@ -197,9 +106,6 @@ class Economia(commands.Cog):
                 ephemeral=True,
             )
 
-        await _add_saldo(inter.guild.id, inter.user.id, -valor)
-        novo_destino = await _add_saldo(inter.guild.id, membro.id, valor)
-
         emb = discord.Embed(
             title=f"{E.HEART_ANIM} Transferência realizada! {MOEDA}",
             description=(
@@ -215,7 +121,8 @@ class Economia(commands.Cog):
     @eco_group.command(name="ranking", description="Top 10 membros mais ricos do servidor")
     async def ranking(self, inter: discord.Interaction):
         await inter.response.defer()
-        rows = await _get_ranking(inter.guild.id, 10)
+        async with unidade() as uow:
+            rows = await uow.economia.ranking(inter.guild.id, 10)
         if not rows:
             return await inter.followup.send(
                 embed=error_embed("Sem dados", "Nenhum membro tem moedas ainda.")
@@ -237,7 +144,8 @@ class Economia(commands.Cog):
 
     @eco_group.command(name="loja", description="Veja os itens disponíveis na loja do servidor")
     async def loja_ver(self, inter: discord.Interaction):
-        itens = await _get_loja(inter.guild.id)
+        async with unidade() as uow:
+            itens = await uow.loja.listar(inter.guild.id)
         if not itens:
             return await inter.response.send_message(
                 embed=error_embed("Loja vazia", "Nenhum item disponível na loja ainda."), ephemeral=True
@@ -261,40 +169,36 @@ class Economia(commands.Cog):
     @eco_group.command(name="comprar", description="Compre um item da loja")
     @app_commands.describe(item_id="ID do item (veja com /eco loja)")
     async def comprar(self, inter: discord.Interaction, item_id: int):
-        async with get_pool().acquire() as conn:
-            item = await conn.fetchrow(
-                "SELECT * FROM loja WHERE id=$1 AND guild_id=$2", item_id, inter.guild.id
-            )
-        if not item:
-            return await inter.response.send_message(
-                embed=error_embed("Item não encontrado", f"Nenhum item com ID `{item_id}` nesta loja."),
-                ephemeral=True,
-            )
-        item = dict(item)
-        if item["estoque"] == 0:
+        gid, uid = inter.guild.id, inter.user.id
+        # Uma conexão e uma transação: a baixa no estoque é desfeita se faltar saldo
+        async with unidade(transacao=True) as uow:
+            item = await uow.loja.reservar(gid, item_id)
+            if item is None:
+                existe = await uow.loja.item(gid, item_id)
+            else:
+                novo_saldo = await uow.economia.debitar(gid, uid, item["preco"])
+                if novo_saldo is None:
+                    saldo = await uow.economia.saldo(gid, uid)
+                    uow.desfazer()
+                else:
+                    await uow.loja.registrar_compra(gid, uid, item_id, item["preco"])
+
+        if item is None:
+            if existe is None:
+                return await inter.response.send_message(
+                    embed=error_embed("Item não encontrado", f"Nenhum item com ID `{item_id}` nesta loja."),
+                    ephemeral=True,
+                )
             return await inter.response.send_message(
                 embed=error_embed("Sem estoque", "Este item está esgotado."), ephemeral=True
             )
-
-        saldo = await _get_saldo(inter.guild.id, inter.user.id)
-        if saldo < item["preco"]:
+        if novo_saldo is None:
             return await inter.response.send_message(
                 embed=error_embed("Saldo insuficiente",
                     f"Você precisa de **{item['preco']:,}** {MOEDA} mas tem **{saldo:,}**."),
                 ephemeral=True,
             )
 
-        await _add_saldo(inter.guild.id, inter.user.id, -item["preco"])
-        if item["estoque"] > 0:
-            async with get_pool().acquire() as conn:
-                await conn.execute("UPDATE loja SET estoque=estoque-1 WHERE id=$1", item_id)
-
-        async with get_pool().acquire() as conn:
-            await conn.execute(
-                "INSERT INTO compras (guild_id, user_id, item_id, preco_pago) VALUES ($1,$2,$3,$4)",
-                inter.guild.id, inter.user.id, item_id, item["preco"]
-            )
-
         # Dá cargo se configurado
         if item["role_id"]:
             role = inter.guild.get_role(item["role_id"])
@@ -304,7 +208,6 @@ class Economia(commands.Cog):
                 except discord.HTTPException:
                     pass
 
-        novo_saldo = await _get_saldo(inter.guild.id, inter.user.id)
         emb = discord.Embed(
             title=f"{MOEDA} Compra realizada!",
             description=(
@@ -324,7 +227,8 @@ class Economia(commands.Cog):
     @app_commands.default_permissions(administrator=True)
     async def eco_dar(self, inter: discord.Interaction, membro: discord.Member,
                       valor: app_commands.Range[int, 1, 1000000]):
-        novo = await _add_saldo(inter.guild.id, membro.id, valor)
+        async with unidade() as uow:
+            novo = await uow.economia.creditar(inter.guild.id, membro.id, valor)
         await inter.response.send_message(
             embed=success_embed("Moedas adicionadas!",
                 f"{MOEDA} {membro.mention} recebeu **{valor:,}** moedas.\n"
@@ -338,9 +242,8 @@ class Economia(commands.Cog):
     @app_commands.default_permissions(administrator=True)
     async def eco_remover(self, inter: discord.Interaction, membro: discord.Member,
                            valor: app_commands.Range[int, 1, 1000000]):
-        saldo = await _get_saldo(inter.guild.id, membro.id)
-        novo  = max(0, saldo - valor)
-        await _set_saldo(inter.guild.id, membro.id, novo)
+        async with unidade() as uow:
+            novo = await uow.economia.remover(inter.guild.id, membro.id, valor)
         await inter.response.send_message(
             embed=success_embed("Moedas removidas!",
                 f"{MOEDA} **{valor:,}** moedas removidas de {membro.mention}.\n"
@@ -362,15 +265,12 @@ class Economia(commands.Cog):
                         descricao: str = None,
                         cargo: discord.Role = None,
                         estoque: int = -1):
-        async with get_pool().acquire() as conn:
-            row = await conn.fetchrow("""
-                INSERT INTO loja (guild_id, nome, descricao, preco, role_id, estoque)
-                VALUES ($1,$2,$3,$4,$5,$6) RETURNING id
-            """, inter.guild.id, nome, descricao, preco,
-                cargo.id if cargo else None, estoque)
+        async with unidade() as uow:
+            novo_id = await uow.loja.adicionar(inter.guild.id, nome, descricao, preco,
+                                               cargo.id if cargo else None, estoque)
         await inter.response.send_message(
             embed=success_embed("Item adicionado!",
-                f"{MOEDA} **{nome}** (ID: `{row['id']}`)\n"
+                f"{MOEDA} **{nome}** (ID: `{novo_id}`)\n"
                 f"{E.STAR} Preço: **{preco:,}** moedas\n"
                 + (f"{E.ARROW_BLUE} Cargo: {cargo.mention}\n" if cargo else "")
                 + (f"{E.SYMBOL} Estoque: `{estoque}`" if estoque >= 0 else f"{E.SYMBOL} Estoque: ilimitado")
@@ -382,11 +282,9 @@ class Economia(commands.Cog):
     @app_commands.describe(item_id="ID do item")
     @app_commands.default_permissions(administrator=True)
     async def loja_rem(self, inter: discord.Interaction, item_id: int):
-        async with get_pool().acquire() as conn:
-            result = await conn.execute(
-                "DELETE FROM loja WHERE id=$1 AND guild_id=$2", item_id, inter.guild.id
-            )
-        if result == "DELETE 0":
+        async with unidade() as uow:
+            removido = await uow.loja.remover(inter.guild.id, item_id)
+        if not removido:
             return await inter.response.send_message(
                 embed=error_embed("Não encontrado", f"Item `{item_id}` não existe."), ephemeral=True
             )
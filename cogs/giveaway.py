@@ -10,7 +10,7 @@ import asyncio
 import random
 import logging
 from datetime import datetime, timezone, timedelta
-from db.database import get_pool
+from db.repositorio import unidade
 from utils.constants import Colors, E, success_embed, error_embed, _now
 
 log = logging.getLogger("multibot.giveaway")
@@ -24,31 +24,6 @@ _NUMS = {
 }
 
 
-async def _ensure_table():
-    async with get_pool().acquire() as conn:
-        await conn.execute("""
-            CREATE TABLE IF NOT EXISTS giveaways (
-                id              SERIAL PRIMARY KEY,
-                guild_id        BIGINT NOT NULL,
-                channel_id      BIGINT NOT NULL,
-                message_id      BIGINT,
-                host_id         BIGINT NOT NULL,
-                premio          TEXT NOT NULL,
-                descricao       TEXT,
-                imagem          TEXT,
-                thumbnail       TEXT,
-                cor             INT DEFAULT 2728702,
-                vencedores      INT DEFAULT 1,
-                encerra_em      TIMESTAMPTZ NOT NULL,
-                encerrado       BOOLEAN DEFAULT FALSE,
-                roles_permitidos BIGINT[],
-                roles_bloqueados BIGINT[],
-                bonus_entries    JSONB DEFAULT '{}',
-                created_at      TIMESTAMPTZ DEFAULT NOW()
-            );
-        """)
-
-
 def _fmt_tempo(seconds: int) -> str:
     if seconds <= 0:
         return "Encerrado"
@@ -123,17 +98,13 @@ class GiveawayJoinView(discord.ui.View):
         custom_id="giveaway:participar",
     )
     async def participar(self, inter: discord.Interaction, _):
-        async with get_pool().acquire() as conn:
-            row = await conn.fetchrow(
-                "SELECT * FROM giveaways WHERE message_id=$1 AND encerrado=FALSE",
-                inter.message.id,
-            )
-        if not row:
+        async with unidade() as uow:
+            gw = await uow.giveaways.ativo_por_mensagem(inter.message.id)
+        if not gw:
             return await inter.response.send_message(
                 embed=error_embed("Sorteio encerrado", "Este sorteio já foi encerrado."),
                 ephemeral=True,
             )
-        gw = dict(row)
 
         # Verifica cargo requerido
         if gw.get("roles_permitidos"):
@@ -377,21 +348,14 @@ class Giveaway(commands.Cog):
         self._tasks: dict[int, asyncio.Task] = {}
 
     async def cog_load(self):
-        await _ensure_table()
         await self._restore_giveaways()
 
     async def _restore_giveaways(self):
         agora = datetime.now(tz=timezone.utc)
-        async with get_pool().acquire() as conn:
-            rows = await conn.fetch(
-                "SELECT * FROM giveaways WHERE encerrado=FALSE AND encerra_em > $1", agora
-            )
+        async with unidade() as uow:
+            rows = await uow.giveaways.pendentes(agora)
         self.bot.add_view(GiveawayJoinView())
-        for row in rows:
-            gw = dict(row)
-            if isinstance(gw.get("bonus_entries"), str):
-                import json
-                gw["bonus_entries"] = json.loads(gw["bonus_entries"])
+        for gw in rows:
             self._tasks[gw["id"]] = asyncio.create_task(
                 self._aguardar(gw)
             )
@@ -408,25 +372,11 @@ class Giveaway(commands.Cog):
                                   builder: GiveawayBuilder, canal: discord.TextChannel):
         gw_dict  = builder.to_dict()
         guild    = inter.guild
+        gw_dict.update(guild_id=guild.id, channel_id=canal.id)
 
         # Salva no banco
-        import json
-        async with get_pool().acquire() as conn:
-            row = await conn.fetchrow("""
-                INSERT INTO giveaways
-                  (guild_id, channel_id, host_id, premio, descricao, imagem, thumbnail,
-                   cor, vencedores, encerra_em, roles_permitidos, roles_bloqueados, bonus_entries)
-                VALUES ($1,$2,$3,$4,$5,$6,$7,$8,$9,$10,$11,$12,$13)
-                RETURNING id
-            """,
-                guild.id, canal.id, builder.host.id, builder.premio,
-                builder.descricao, builder.imagem, builder.thumbnail,
-                builder.cor, builder.vencedores, gw_dict["encerra_em"],
-                builder.roles_permitidos or None,
-                builder.roles_bloqueados or None,
-                json.dumps({str(k): v for k, v in builder.bonus_entries.items()}),
-            )
-        gid = row["id"]
+        async with unidade() as uow:
+            gid = await uow.giveaways.criar(gw_dict)
         gw_dict["id"] = gid
 
         emb  = _giveaway_embed(gw_dict, guild)
@@ -437,8 +387,8 @@ class Giveaway(commands.Cog):
         except Exception:
             pass
 
-        async with get_pool().acquire() as conn:
-            await conn.execute("UPDATE giveaways SET message_id=$1 WHERE id=$2", msg.id, gid)
+        async with unidade() as uow:
+            await uow.giveaways.definir_mensagem(gid, msg.id)
         gw_dict["message_id"] = msg.id
 
         self._tasks[gid] = asyncio.create_task(self._aguardar(gw_dict))
@@ -453,18 +403,16 @@ class Giveaway(commands.Cog):
             ephemeral=True,
         )
 
-    async def _encerrar(self, giveaway_id: int):
-        async with get_pool().acquire() as conn:
-            row = await conn.fetchrow("SELECT * FROM giveaways WHERE id=$1", giveaway_id)
-            if not row or row["encerrado"]:
-                return
-            await conn.execute("UPDATE giveaways SET encerrado=TRUE WHERE id=$1", giveaway_id)
-
-        import json
-        gw      = dict(row)
-        if isinstance(gw.get("bonus_entries"), str):
-            gw["bonus_entries"] = json.loads(gw["bonus_entries"])
+    async def _encerrar(self, giveaway_id: int, guild_id: int | None = None) -> bool:
+        """Marca como encerrado (UPDATE ... RETURNING, sem SELECT antes) e sorteia. False se já estava encerrado."""
+        async with unidade() as uow:
+            gw = await uow.giveaways.encerrar(giveaway_id, guild_id)
+        if not gw:
+            return False
+        await self._sortear(gw)
+        return True
 
+    async def _sortear(self, gw: dict):
         guild   = self.bot.get_guild(gw["guild_id"])
         if not guild:
             return
@@ -521,7 +469,7 @@ class Giveaway(commands.Cog):
         )
         if gw.get("thumbnail"):
             emb_final.set_thumbnail(url=gw["thumbnail"])
-        emb_final.set_footer(text=f"Encerrado • ID: {giveaway_id}")
+        emb_final.set_footer(text=f"Encerrado • ID: {gw['id']}")
         emb_final.timestamp = _now()
 
         try:
@@ -576,12 +524,8 @@ class Giveaway(commands.Cog):
     @app_commands.describe(giveaway_id="ID do sorteio")
     async def gv_encerrar(self, inter: discord.Interaction, giveaway_id: int):
         await inter.response.defer(ephemeral=True)
-        async with get_pool().acquire() as conn:
-            row = await conn.fetchrow(
-                "SELECT * FROM giveaways WHERE id=$1 AND guild_id=$2 AND encerrado=FALSE",
-                giveaway_id, inter.guild.id,
-            )
-        if not row:
+        # Só cancela a task agendada depois de confirmar que o sorteio é deste servidor
+        if not await self._encerrar(giveaway_id, inter.guild.id):
             return await inter.followup.send(
                 embed=error_embed("Não encontrado", f"Sorteio `{giveaway_id}` não existe ou já encerrou."),
                 ephemeral=True,
@@ -589,7 +533,6 @@ class Giveaway(commands.Cog):
         task = self._tasks.pop(giveaway_id, None)
         if task:
             task.cancel()
-        await self._encerrar(giveaway_id)
         await inter.followup.send(
             embed=success_embed("Encerrado!", f"{E.BOT_ANIME} Sorteio `{giveaway_id}` encerrado."),
             ephemeral=True,
@@ -599,11 +542,8 @@ class Giveaway(commands.Cog):
     @app_commands.describe(giveaway_id="ID do sorteio")
     async def gv_resorteio(self, inter: discord.Interaction, giveaway_id: int):
         await inter.response.defer()
-        async with get_pool().acquire() as conn:
-            row = await conn.fetchrow(
-                "SELECT * FROM giveaways WHERE id=$1 AND guild_id=$2 AND encerrado=TRUE",
-                giveaway_id, inter.guild.id,
-            )
+        async with unidade() as uow:
+            row = await uow.giveaways.encerrado(giveaway_id, inter.guild.id)
         if not row:
             return await inter.followup.send(
                 embed=error_embed("Não encontrado", "Sorteio não encontrado ou ainda ativo."), ephemeral=True
@@ -652,11 +592,8 @@ class Giveaway(commands.Cog):
 
     @gv_group.command(name="lista", description="Lista todos os sorteios ativos")
     async def gv_lista(self, inter: discord.Interaction):
-        async with get_pool().acquire() as conn:
-            rows = await conn.fetch(
-                "SELECT * FROM giveaways WHERE guild_id=$1 AND encerrado=FALSE ORDER BY encerra_em",
-                inter.guild.id,
-            )
+        async with unidade() as uow:
+            rows = await uow.giveaways.ativos(inter.guild.id)
         if not rows:
             return await inter.response.send_message(
                 embed=error_embed("Sem sorteios", f"{E.GHOST} Nenhum sorteio ativo."), ephemeral=True
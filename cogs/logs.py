@@ -2,14 +2,24 @@
 cogs/logs.py — Logs completos do servidor.
 Registra: entrou, saiu, ban, unban, mensagem editada, mensagem deletada,
           cargo adicionado/removido, canal criado/deletado, nickname alterado.
-Comando: /logs setup, /logs desativar
+Os eventos também são gravados na tabela log_eventos (inserts em lote)
+para consulta posterior, mantidos por LOGS_RETENCAO_DIAS (padrão 30) e
+purgados de hora em hora por um único processo do cluster. Edições/deleções usam os eventos raw com um cache
+próprio de conteúdo (ring buffer por canal), independente do cache do discord.py.
+Comando: /logs setup, /logs desativar, /logs buscar
 """
 
 import discord
 from discord import app_commands
-from discord.ext import commands
+from discord.ext import commands, tasks
+import asyncio
 import logging
+import os
+from collections import OrderedDict
+from datetime import datetime, timezone, timedelta
+from typing import NamedTuple
 from db.database import get_pool, upsert_guild_config, get_guild_config
+from utils import metrics
 from utils.constants import Colors, E, success_embed, error_embed, _now
 
 log = logging.getLogger("multibot.logs")
@@ -27,10 +37,249 @@ _CORES = {
     "nick":    0xFEE75C,
 }
 
+# Tipos de evento gravados no histórico (valor → rótulo)
+_TIPOS = {
+    "join":           "Membro entrou",
+    "leave":          "Membro saiu",
+    "ban":            "Banimento",
+    "unban":          "Desbanimento",
+    "msg_edit":       "Mensagem editada",
+    "msg_delete":     "Mensagem deletada",
+    "role_add":       "Cargo adicionado",
+    "role_remove":    "Cargo removido",
+    "channel_create": "Canal criado",
+    "channel_delete": "Canal deletado",
+    "nick":           "Nickname alterado",
+}
+
+# Inserts em lote: grava a cada N segundos ou quando a fila atinge o limite
+_FLUSH_SEGUNDOS = 5
+_FLUSH_MAX      = 200
+
+# Retenção do histórico; também é o período máximo do /logs buscar
+_RETENCAO_DIAS = max(1, int(os.environ.get("LOGS_RETENCAO_DIAS", "30")))
+_PURGA_LOTE    = 10_000   # linhas por DELETE, para não segurar locks por muito tempo
+
+_COLUNAS = ("guild_id", "tipo", "user_id", "channel_id", "conteudo", "created_at")
+
+
+# ── Cache de conteúdo das mensagens ──────────────────────────────────────────
+
+_CACHE_POR_CANAL  = 500                 # mensagens mantidas por canal
+_CACHE_ORCAMENTO  = 16 * 1024 * 1024    # orçamento total aproximado (bytes)
+_CACHE_MAX_TEXTO  = 1000                # caracteres guardados por mensagem
+_EDICAO_RECENTE   = 60                  # s — sem cache, só loga se edited_timestamp for recente
+
+
+class _MsgCache(NamedTuple):
+    author_id:  int
+    author:     str
+    avatar_url: str
+    conteudo:   str
+    anexos:     tuple[str, ...]
+
+
+def _tamanho(m: _MsgCache) -> int:
+    # Estimativa: texto + nomes + overhead fixo da tupla/chave
+    return 120 + len(m.conteudo) + len(m.author) + len(m.avatar_url) + sum(len(a) for a in m.anexos)
+
+
+class ConteudoCache:
+    """
+    Ring buffer por canal (message_id → _MsgCache) com orçamento global de memória.
+    Ao estourar o orçamento, descarta as mensagens mais antigas do canal menos ativo.
+    """
+
+    def __init__(self, por_canal: int = _CACHE_POR_CANAL, orcamento: int = _CACHE_ORCAMENTO):
+        self.por_canal = por_canal
+        self.orcamento = orcamento
+        self._canais: OrderedDict[int, OrderedDict[int, _MsgCache]] = OrderedDict()
+        self._bytes = 0
+        self.hits   = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return sum(len(c) for c in self._canais.values())
+
+    @property
+    def bytes(self) -> int:
+        return self._bytes
+
+    def adicionar(self, message: discord.Message):
+        entrada = _MsgCache(
+            author_id=message.author.id,
+            author=str(message.author),
+            avatar_url=message.author.display_avatar.url,
+            conteudo=(message.content or "")[:_CACHE_MAX_TEXTO],
+            anexos=tuple(a.filename for a in message.attachments),
+        )
+        canal = self._canais.get(message.channel.id)
+        if canal is None:
+            canal = self._canais[message.channel.id] = OrderedDict()
+        else:
+            self._canais.move_to_end(message.channel.id)
+        antiga = canal.pop(message.id, None)
+        if antiga:
+            self._bytes -= _tamanho(antiga)
+        canal[message.id] = entrada
+        self._bytes += _tamanho(entrada)
+
+        if len(canal) > self.por_canal:
+            _, velha = canal.popitem(last=False)
+            self._bytes -= _tamanho(velha)
+        self._respeitar_orcamento()
+
+    def obter(self, channel_id: int, message_id: int) -> _MsgCache | None:
+        canal = self._canais.get(channel_id)
+        entrada = canal.get(message_id) if canal else None
+        if entrada:
+            self.hits += 1
+        else:
+            self.misses += 1
+        return entrada
+
+    def atualizar(self, channel_id: int, message_id: int, conteudo: str):
+        canal = self._canais.get(channel_id)
+        antiga = canal.get(message_id) if canal else None
+        if not antiga:
+            return
+        nova = antiga._replace(conteudo=conteudo[:_CACHE_MAX_TEXTO])
+        canal[message_id] = nova
+        self._bytes += _tamanho(nova) - _tamanho(antiga)
+
+    def remover(self, channel_id: int, message_id: int) -> _MsgCache | None:
+        canal = self._canais.get(channel_id)
+        if not canal:
+            self.misses += 1
+            return None
+        entrada = canal.pop(message_id, None)
+        if entrada:
+            self.hits += 1
+            self._bytes -= _tamanho(entrada)
+        else:
+            self.misses += 1
+        if not canal:
+            del self._canais[channel_id]
+        return entrada
+
+    def limpar_canais(self, channel_ids: set[int]):
+        for channel_id in channel_ids & self._canais.keys():
+            canal = self._canais.pop(channel_id)
+            self._bytes -= sum(_tamanho(m) for m in canal.values())
+
+    def _respeitar_orcamento(self):
+        while self._bytes > self.orcamento and self._canais:
+            channel_id, canal = next(iter(self._canais.items()))
+            _, velha = canal.popitem(last=False)
+            self._bytes -= _tamanho(velha)
+            if not canal:
+                del self._canais[channel_id]
+
+
+def _jump_url(guild_id: int, channel_id: int, message_id: int) -> str:
+    return f"https://discord.com/channels/{guild_id}/{channel_id}/{message_id}"
+
+
+def _edicao_recente(edited_timestamp: str | None) -> bool:
+    if not edited_timestamp:
+        return False
+    editada = discord.utils.parse_time(edited_timestamp)
+    return (datetime.now(tz=timezone.utc) - editada).total_seconds() <= _EDICAO_RECENTE
+
+
+def _parse_periodo(valor: str) -> timedelta | None:
+    unidades = {"m": 60, "h": 3600, "d": 86400, "w": 604800}
+    try:
+        n = int(valor[:-1])
+        janela = timedelta(seconds=n * unidades[valor[-1].lower()])
+    except (ValueError, KeyError, IndexError, OverflowError):
+        return None
+    # Além da retenção não há o que buscar
+    return janela if timedelta(0) < janela <= timedelta(days=_RETENCAO_DIAS) else None
+
 
 class Logs(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
+        self._fila: list[tuple] = []
+        self._flush_task: asyncio.Task | None = None
+        self.cache = ConteudoCache()
+        metrics.registrar_cache("logs_mensagens", self.cache)
+        # Guilds com canal de log — só elas alimentam o cache de conteúdo
+        self._guilds_log: set[int] = set()
+
+    def ativar(self, guild_id: int):
+        """Passa a alimentar o cache de conteúdo da guild (canal de log configurado)."""
+        self._guilds_log.add(guild_id)
+
+    def desativar(self, guild_id: int):
+        """Para de acompanhar a guild e descarta o conteúdo já guardado dos canais dela."""
+        self._guilds_log.discard(guild_id)
+        guild = self.bot.get_guild(guild_id)
+        if guild:
+            self.cache.limpar_canais({c.id for c in guild.channels} | {t.id for t in guild.threads})
+
+    async def cog_load(self):
+        async with get_pool().acquire() as conn:
+            rows = await conn.fetch("SELECT guild_id FROM guild_config WHERE log_channel IS NOT NULL")
+        self._guilds_log = {r["guild_id"] for r in rows}
+        self.gravar_eventos.start()
+        self.bot.cluster.singleton("logs_purga", self.purgar_antigos.start, self.purgar_antigos.cancel)
+
+    async def cog_unload(self):
+        self.gravar_eventos.cancel()
+        self.bot.cluster.liberar("logs_purga")
+        await self._flush()
+
+    # ── Histórico (inserts em lote) ────────────────────────────────────────
+
+    def _registrar(self, guild: discord.Guild, tipo: str,
+                   user_id: int | None, channel_id: int | None, conteudo: str | None):
+        self._fila.append((guild.id, tipo, user_id, channel_id, conteudo, _now()))
+        if len(self._fila) >= _FLUSH_MAX and (self._flush_task is None or self._flush_task.done()):
+            self._flush_task = asyncio.create_task(self._flush())
+
+    async def _flush(self):
+        if not self._fila:
+            return
+        lote, self._fila = self._fila, []
+        try:
+            async with get_pool().acquire() as conn:
+                await conn.copy_records_to_table("log_eventos", records=lote, columns=_COLUNAS)
+        except Exception as exc:
+            # Volta para a fila (limitada: com o banco fora, descarta os mais antigos)
+            pendentes   = lote + self._fila
+            descartados = len(pendentes) - _FLUSH_MAX
+            self._fila  = pendentes[-_FLUSH_MAX:]
+            log.warning(f"[LOGS] Falha ao gravar {len(lote)} evento(s): {exc}"
+                        + (f" ({descartados} descartado(s))" if descartados > 0 else ""))
+
+    @tasks.loop(seconds=_FLUSH_SEGUNDOS)
+    async def gravar_eventos(self):
+        await self._flush()
+
+    @tasks.loop(hours=1)
+    async def purgar_antigos(self):
+        total = 0
+        try:
+            while True:
+                async with get_pool().acquire() as conn:
+                    status = await conn.execute("""
+                        DELETE FROM log_eventos WHERE id IN (
+                            SELECT id FROM log_eventos
+                            WHERE created_at < NOW() - make_interval(days => $1)
+                            LIMIT $2
+                        )
+                    """, _RETENCAO_DIAS, _PURGA_LOTE)
+                apagados = int(status.split()[-1])
+                total += apagados
+                if apagados < _PURGA_LOTE:
+                    break
+                await asyncio.sleep(1)
+        except Exception as exc:
+            log.warning(f"[LOGS] Falha na purga do histórico: {exc}")
+        if total:
+            log.info(f"[LOGS] {total} evento(s) com mais de {_RETENCAO_DIAS} dia(s) removido(s)")
 
     async def _log_ch(self, guild: discord.Guild) -> discord.TextChannel | None:
         cfg = await get_guild_config(guild.id)
@@ -40,9 +289,12 @@ class Logs(commands.Cog):
         ch = guild.get_channel(ch_id)
         return ch if isinstance(ch, discord.TextChannel) else None
 
-    async def _send(self, guild: discord.Guild, emb: discord.Embed):
+    async def _send(self, guild: discord.Guild, emb: discord.Embed, tipo: str,
+                    user_id: int | None = None, channel_id: int | None = None,
+                    conteudo: str | None = None):
         ch = await self._log_ch(guild)
         if ch:
+            self._registrar(guild, tipo, user_id, channel_id, conteudo)
             try:
                 await ch.send(embed=emb)
             except discord.HTTPException:
@@ -63,7 +315,7 @@ class Logs(commands.Cog):
         emb.add_field(name="ID",          value=f"`{member.id}`",                 inline=True)
         emb.add_field(name="Conta criada", value=discord.utils.format_dt(member.created_at, "R"), inline=True)
         emb.add_field(name="Membros",     value=f"`{member.guild.member_count}`", inline=True)
-        await self._send(member.guild, emb)
+        await self._send(member.guild, emb, "join", user_id=member.id, conteudo=str(member))
 
     @commands.Cog.listener()
     async def on_member_remove(self, member: discord.Member):
@@ -73,49 +325,107 @@ class Logs(commands.Cog):
         roles = [r.mention for r in member.roles if r.name != "@everyone"]
         if roles:
             emb.add_field(name="Cargos", value=" ".join(roles[:10]), inline=False)
-        await self._send(member.guild, emb)
+        await self._send(member.guild, emb, "leave", user_id=member.id, conteudo=str(member))
 
     @commands.Cog.listener()
     async def on_member_ban(self, guild: discord.Guild, user: discord.User):
         emb = self._base("🔨 Membro banido", "ban")
         emb.set_thumbnail(url=user.display_avatar.url)
         emb.add_field(name="Usuário", value=f"{user} (`{user.id}`)", inline=True)
-        await self._send(guild, emb)
+        await self._send(guild, emb, "ban", user_id=user.id, conteudo=str(user))
 
     @commands.Cog.listener()
     async def on_member_unban(self, guild: discord.Guild, user: discord.User):
         emb = self._base("✅ Membro desbanido", "unban")
         emb.add_field(name="Usuário", value=f"{user} (`{user.id}`)", inline=True)
-        await self._send(guild, emb)
+        await self._send(guild, emb, "unban", user_id=user.id, conteudo=str(user))
+
+    @commands.Cog.listener()
+    async def on_message(self, message: discord.Message):
+        if message.guild and not message.author.bot and message.guild.id in self._guilds_log:
+            self.cache.adicionar(message)
 
     @commands.Cog.listener()
-    async def on_message_edit(self, before: discord.Message, after: discord.Message):
-        if before.author.bot or not before.guild:
+    async def on_raw_message_edit(self, payload: discord.RawMessageUpdateEvent):
+        if not payload.guild_id or payload.guild_id not in self._guilds_log:
+            return
+        if "content" not in payload.data:   # atualização só de embed/unfurl
+            return
+        autor_raw = payload.data.get("author") or {}
+        if autor_raw.get("bot"):
+            return
+        guild = self.bot.get_guild(payload.guild_id)
+        if not guild:
             return
-        if before.content == after.content:
+
+        depois  = payload.data["content"]
+        antiga  = self.cache.obter(payload.channel_id, payload.message_id)
+        before  = payload.cached_message
+        if before:
+            if before.author.bot:
+                return
+            antes, autor_id = before.content, before.author.id
+            autor_nome, avatar = str(before.author), before.author.display_avatar.url
+        elif antiga:
+            antes, autor_id, autor_nome, avatar = antiga.conteudo, antiga.author_id, antiga.author, antiga.avatar_url
+        elif _edicao_recente(payload.data.get("edited_timestamp")):
+            antes, autor_id, autor_nome, avatar = None, int(autor_raw.get("id", 0)) or None, autor_raw.get("username"), None
+        else:
+            # Fora dos dois caches e sem edição recente: unfurl/atualização sem mudança de texto
+            return
+        if antes == depois:
             return
+        self.cache.atualizar(payload.channel_id, payload.message_id, depois)
+
         emb = self._base("✏️ Mensagem editada", "msg_edit")
-        emb.set_author(name=str(before.author), icon_url=before.author.display_avatar.url)
-        emb.add_field(name="Canal",  value=before.channel.mention, inline=True)
-        emb.add_field(name="Autor",  value=before.author.mention,  inline=True)
-        emb.add_field(name="Link",   value=f"[Ir para mensagem]({after.jump_url})", inline=True)
-        emb.add_field(name="Antes",  value=(before.content or "*(vazio)*")[:400], inline=False)
-        emb.add_field(name="Depois", value=(after.content or "*(vazio)*")[:400],  inline=False)
-        await self._send(before.guild, emb)
+        if autor_nome:
+            emb.set_author(name=autor_nome, icon_url=avatar)
+        emb.add_field(name="Canal",  value=f"<#{payload.channel_id}>", inline=True)
+        emb.add_field(name="Autor",  value=f"<@{autor_id}>" if autor_id else "*(desconhecido)*", inline=True)
+        emb.add_field(name="Link",   value=f"[Ir para mensagem]({_jump_url(guild.id, payload.channel_id, payload.message_id)})", inline=True)
+        antes_txt = "*(fora do cache)*" if antes is None else (antes or "*(vazio)*")
+        emb.add_field(name="Antes",  value=antes_txt[:400], inline=False)
+        emb.add_field(name="Depois", value=(depois or "*(vazio)*")[:400], inline=False)
+        await self._send(guild, emb, "msg_edit",
+                         user_id=autor_id, channel_id=payload.channel_id,
+                         conteudo=f"{antes or ''}\n→ {depois}")
 
     @commands.Cog.listener()
-    async def on_message_delete(self, message: discord.Message):
-        if message.author.bot or not message.guild:
+    async def on_raw_message_delete(self, payload: discord.RawMessageDeleteEvent):
+        if not payload.guild_id or payload.guild_id not in self._guilds_log:
+            return
+        guild = self.bot.get_guild(payload.guild_id)
+        if not guild:
             return
+
+        entrada = self.cache.remover(payload.channel_id, payload.message_id)
+        message = payload.cached_message
+        if message:
+            if message.author.bot:
+                return
+            autor_id, autor_nome, avatar = message.author.id, str(message.author), message.author.display_avatar.url
+            conteudo, anexos = message.content, [a.filename for a in message.attachments]
+        elif entrada:
+            autor_id, autor_nome, avatar = entrada.author_id, entrada.author, entrada.avatar_url
+            conteudo, anexos = entrada.conteudo, list(entrada.anexos)
+        else:
+            # Fora dos dois caches: quase sempre mensagem de bot (que o ConteudoCache ignora)
+            log.debug(f"[LOGS] Deleção fora do cache ignorada: {payload.message_id}")
+            return
+
         emb = self._base("🗑️ Mensagem deletada", "msg_delete")
-        emb.set_author(name=str(message.author), icon_url=message.author.display_avatar.url)
-        emb.add_field(name="Canal",   value=message.channel.mention, inline=True)
-        emb.add_field(name="Autor",   value=message.author.mention,  inline=True)
-        if message.content:
-            emb.add_field(name="Conteúdo", value=message.content[:800], inline=False)
-        if message.attachments:
-            emb.add_field(name="Anexos", value="\n".join(a.filename for a in message.attachments), inline=False)
-        await self._send(message.guild, emb)
+        if autor_nome:
+            emb.set_author(name=autor_nome, icon_url=avatar)
+        emb.add_field(name="Canal",   value=f"<#{payload.channel_id}>", inline=True)
+        emb.add_field(name="Autor",   value=f"<@{autor_id}>", inline=True)
+        if conteudo:
+            emb.add_field(name="Conteúdo", value=conteudo[:800], inline=False)
+        if anexos:
+            emb.add_field(name="Anexos", value="\n".join(anexos), inline=False)
+        emb.set_footer(text=f"ID da mensagem: {payload.message_id}")
+        await self._send(guild, emb, "msg_delete",
+                         user_id=autor_id, channel_id=payload.channel_id,
+                         conteudo=conteudo)
 
     @commands.Cog.listener()
     async def on_member_update(self, before: discord.Member, after: discord.Member):
@@ -126,7 +436,8 @@ class Logs(commands.Cog):
             emb.add_field(name="Membro", value=after.mention, inline=True)
             emb.add_field(name="Antes",  value=before.nick or before.name, inline=True)
             emb.add_field(name="Depois", value=after.nick or after.name,   inline=True)
-            await self._send(after.guild, emb)
+            await self._send(after.guild, emb, "nick", user_id=after.id,
+                             conteudo=f"{before.nick or before.name} → {after.nick or after.name}")
 
         # Cargo adicionado
         added   = set(after.roles) - set(before.roles)
@@ -135,26 +446,28 @@ class Logs(commands.Cog):
             emb = self._base(f"{E.TICKET_IC} Cargo adicionado", "role")
             emb.add_field(name="Membro", value=after.mention, inline=True)
             emb.add_field(name="Cargo",  value=" ".join(r.mention for r in added), inline=True)
-            await self._send(after.guild, emb)
+            await self._send(after.guild, emb, "role_add", user_id=after.id,
+                             conteudo=", ".join(r.name for r in added))
         if removed:
             emb = self._base(f"{E.MAGIC} Cargo removido", "role")
             emb.add_field(name="Membro", value=after.mention, inline=True)
             emb.add_field(name="Cargo",  value=" ".join(r.mention for r in removed), inline=True)
-            await self._send(after.guild, emb)
+            await self._send(after.guild, emb, "role_remove", user_id=after.id,
+                             conteudo=", ".join(r.name for r in removed))
 
     @commands.Cog.listener()
     async def on_guild_channel_create(self, channel: discord.abc.GuildChannel):
         emb = self._base("📁 Canal criado", "channel")
         emb.add_field(name="Canal", value=f"{channel.mention} (`{channel.name}`)", inline=True)
         emb.add_field(name="Tipo",  value=str(channel.type).replace("ChannelType.", ""), inline=True)
-        await self._send(channel.guild, emb)
+        await self._send(channel.guild, emb, "channel_create", channel_id=channel.id, conteudo=channel.name)
 
     @commands.Cog.listener()
     async def on_guild_channel_delete(self, channel: discord.abc.GuildChannel):
         emb = self._base("🗑️ Canal deletado", "channel")
         emb.add_field(name="Canal", value=f"`{channel.name}`", inline=True)
         emb.add_field(name="Tipo",  value=str(channel.type).replace("ChannelType.", ""), inline=True)
-        await self._send(channel.guild, emb)
+        await self._send(channel.guild, emb, "channel_delete", channel_id=channel.id, conteudo=channel.name)
 
     # ── Slash commands ─────────────────────────────────────────────────────
 
@@ -168,6 +481,7 @@ class Logs(commands.Cog):
     @app_commands.describe(canal="Canal onde os logs serão enviados")
     async def logs_setup(self, inter: discord.Interaction, canal: discord.TextChannel):
         await upsert_guild_config(inter.guild.id, logs_channel=canal.id, log_channel=canal.id)
+        self.ativar(inter.guild.id)
         await inter.response.send_message(
             embed=success_embed("Logs configurados!",
                 f"{E.ARROW_BLUE} Todos os eventos serão registrados em {canal.mention}.\n\n"
@@ -177,7 +491,8 @@ class Logs(commands.Cog):
                 f"{E.ARROW_BLUE} Mensagens editadas e deletadas\n"
                 f"{E.ARROW_BLUE} Nickname alterado\n"
                 f"{E.ARROW_BLUE} Cargos adicionados/removidos\n"
-                f"{E.ARROW_BLUE} Canais criados/deletados"
+                f"{E.ARROW_BLUE} Canais criados/deletados\n\n"
+                f"{E.BULB} Use `/logs buscar` para pesquisar o histórico."
             ),
             ephemeral=True,
         )
@@ -185,11 +500,87 @@ class Logs(commands.Cog):
     @logs_group.command(name="desativar", description="Desativa o sistema de logs")
     async def logs_off(self, inter: discord.Interaction):
         await upsert_guild_config(inter.guild.id, logs_channel=None, log_channel=None)
+        self.desativar(inter.guild.id)
         await inter.response.send_message(
             embed=success_embed("Logs desativados", "Os logs do servidor foram desativados."),
             ephemeral=True,
         )
 
+    @logs_group.command(name="buscar", description="Pesquisa o histórico de eventos do servidor")
+    @app_commands.describe(
+        usuario="Filtrar por usuário",
+        canal="Filtrar por canal",
+        tipo="Filtrar por tipo de evento",
+        periodo="Janela de tempo: ex. 30m, 12h, 7d, 4w (padrão: 7d)",
+        limite="Quantidade de resultados (máx. 25)",
+    )
+    @app_commands.choices(tipo=[app_commands.Choice(name=l, value=v) for v, l in _TIPOS.items()])
+    async def logs_buscar(self, inter: discord.Interaction,
+                          usuario: discord.User = None,
+                          canal: discord.abc.GuildChannel = None,
+                          tipo: str = None,
+                          periodo: str = "7d",
+                          limite: app_commands.Range[int, 1, 25] = 10):
+        janela = _parse_periodo(periodo)
+        if not janela:
+            return await inter.response.send_message(
+                embed=error_embed("Período inválido",
+                                  f"Use: `30m`, `12h`, `7d`, `4w` (máximo {_RETENCAO_DIAS} dias)."),
+                ephemeral=True
+            )
+        await inter.response.defer(ephemeral=True)
+        # Garante que eventos ainda na fila apareçam na busca
+        await self._flush()
+
+        desde  = datetime.now(tz=timezone.utc) - janela
+        filtros = ["guild_id = $1", "created_at >= $2"]
+        args: list = [inter.guild.id, desde]
+        if usuario:
+            args.append(usuario.id)
+            filtros.append(f"user_id = ${len(args)}")
+        if canal:
+            args.append(canal.id)
+            filtros.append(f"channel_id = ${len(args)}")
+        if tipo:
+            args.append(tipo)
+            filtros.append(f"tipo = ${len(args)}")
+        args.append(limite)
+
+        async with get_pool().acquire() as conn:
+            rows = await conn.fetch(f"""
+                SELECT tipo, user_id, channel_id, conteudo, created_at
+                FROM log_eventos
+                WHERE {' AND '.join(filtros)}
+                ORDER BY created_at DESC
+                LIMIT ${len(args)}
+            """, *args)
+
+        if not rows:
+            return await inter.followup.send(
+                embed=error_embed("Nada encontrado", "Nenhum evento corresponde aos filtros."), ephemeral=True
+            )
+
+        linhas = []
+        for r in rows:
+            partes = [discord.utils.format_dt(r["created_at"], "f"), f"**{_TIPOS.get(r['tipo'], r['tipo'])}**"]
+            if r["user_id"]:
+                partes.append(f"<@{r['user_id']}>")
+            if r["channel_id"]:
+                partes.append(f"<#{r['channel_id']}>")
+            linha = " · ".join(partes)
+            if r["conteudo"]:
+                linha += f"\n{E.ARROW_BLUE} {discord.utils.escape_markdown(r['conteudo'][:150])}"
+            linhas.append(linha)
+
+        emb = discord.Embed(
+            title=f"{E.SYMBOL} Histórico de eventos ({len(rows)})",
+            description="\n".join(linhas)[:4000],
+            color=Colors.MAIN,
+        )
+        emb.set_footer(text=f"Últimos {periodo}")
+        emb.timestamp = _now()
+        await inter.followup.send(embed=emb, ephemeral=True)
+
 
 async def setup(bot: commands.Bot):
     await bot.add_cog(Logs(bot))
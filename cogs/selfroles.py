@@ -1,7 +1,7 @@
 """
 cogs/selfroles.py — Self-roles: cargos por botão persistente.
 Comandos:
-  /selfroles painel  — cria painel com botões de cargo
+  /selfroles painel  — cria painel com botões (ou menu de seleção múltipla) de cargo
   /selfroles adicionar — adiciona cargo a um painel existente
   /selfroles remover   — remove cargo de um painel
   /selfroles lista     — lista painéis configurados
@@ -12,67 +12,19 @@ from discord import app_commands
 from discord.ext import commands
 import json
 import logging
-from db.database import get_pool
+from db.repositorio import unidade
 from utils.constants import Colors, E, success_embed, error_embed, _now
 
 log = logging.getLogger("multibot.selfroles")
 
 
-# ── Tabela ────────────────────────────────────────────────────────────────────
-async def _ensure_table():
-    async with get_pool().acquire() as conn:
-        await conn.execute("""
-            CREATE TABLE IF NOT EXISTS selfroles_panels (
-                message_id  BIGINT PRIMARY KEY,
-                channel_id  BIGINT NOT NULL,
-                guild_id    BIGINT NOT NULL,
-                titulo      TEXT,
-                descricao   TEXT,
-                cor         INT DEFAULT 5899754,
-                roles       JSONB DEFAULT '[]',
-                created_at  TIMESTAMPTZ DEFAULT NOW()
-            );
-        """)
-
-
-async def _get_panel(message_id: int) -> dict | None:
-    async with get_pool().acquire() as conn:
-        row = await conn.fetchrow(
-            "SELECT * FROM selfroles_panels WHERE message_id=$1", message_id
-        )
-    if not row:
-        return None
-    d = dict(row)
-    d["roles"] = json.loads(d["roles"]) if isinstance(d["roles"], str) else d["roles"]
-    return d
-
-
-async def _save_panel(panel: dict):
-    async with get_pool().acquire() as conn:
-        await conn.execute("""
-            INSERT INTO selfroles_panels (message_id, channel_id, guild_id, titulo, descricao, cor, roles)
-            VALUES ($1,$2,$3,$4,$5,$6,$7)
-            ON CONFLICT (message_id) DO UPDATE SET
-                titulo=$4, descricao=$5, cor=$6, roles=$7
-        """,
-            panel["message_id"], panel["channel_id"], panel["guild_id"],
-            panel["titulo"], panel["descricao"], panel["cor"],
-            json.dumps(panel["roles"]),
-        )
-
-
-async def _list_panels(guild_id: int) -> list[dict]:
-    async with get_pool().acquire() as conn:
-        rows = await conn.fetch(
-            "SELECT * FROM selfroles_panels WHERE guild_id=$1 ORDER BY created_at DESC LIMIT 20",
-            guild_id,
-        )
-    result = []
-    for row in rows:
-        d = dict(row)
-        d["roles"] = json.loads(d["roles"]) if isinstance(d["roles"], str) else d["roles"]
-        result.append(d)
-    return result
+def _indexar(panel: dict) -> dict:
+    """Normaliza o JSONB e pré-calcula o conjunto de IDs de cargo do painel."""
+    if isinstance(panel["roles"], str):
+        panel["roles"] = json.loads(panel["roles"])
+    panel["modo"] = panel.get("modo") or "botoes"
+    panel["ids"]  = frozenset(r["role_id"] for r in panel["roles"])
+    return panel
 
 
 # ── View de botões ────────────────────────────────────────────────────────────
@@ -93,7 +45,7 @@ class SelfRoleButton(discord.ui.Button):
             return await inter.response.send_message(
                 embed=error_embed("Cargo não encontrado", "Este cargo não existe mais."), ephemeral=True
             )
-        if role in inter.user.roles:
+        if inter.user.get_role(self.role_id):
             await inter.user.remove_roles(role, reason="Self-role removida")
             await inter.response.send_message(
                 embed=discord.Embed(
@@ -113,8 +65,72 @@ class SelfRoleButton(discord.ui.Button):
             )
 
 
-def _build_view(roles: list[dict]) -> discord.ui.View:
-    view = discord.ui.View(timeout=None)
+class SelfRoleSelect(discord.ui.Select):
+    """Modo menu: o membro escolhe de uma vez quais cargos do painel quer ter."""
+
+    def __init__(self, roles: list[dict]):
+        super().__init__(
+            placeholder="Selecione os cargos que deseja ter...",
+            min_values=0,
+            max_values=max(len(roles), 1),
+            options=[
+                discord.SelectOption(
+                    label=(r.get("label") or r["role_name"])[:100],
+                    value=str(r["role_id"]),
+                    emoji=r.get("emoji") or None,
+                )
+                for r in roles
+            ] or [discord.SelectOption(label="Nenhum cargo", value="0")],
+            custom_id="selfrole:menu",
+            disabled=not roles,
+        )
+
+    async def callback(self, inter: discord.Interaction):
+        cog   = inter.client.cogs.get("SelfRoles")
+        panel = cog.paineis.get(inter.message.id) if cog else None
+        if not panel:
+            return await inter.response.send_message(
+                embed=error_embed("Painel não encontrado", "Este painel não existe mais."), ephemeral=True
+            )
+
+        mutaveis = {
+            rid for rid in panel["ids"]
+            if (r := inter.guild.get_role(rid)) and r.is_assignable()
+        }
+        escolhidos = {int(v) for v in self.values} & mutaveis
+        atuais     = {r.id for r in inter.user.roles if not r.is_default()}
+        novos      = (atuais - mutaveis) | escolhidos
+        adicionados = novos - atuais
+        removidos   = atuais - novos
+        if not adicionados and not removidos:
+            return await inter.response.send_message(
+                embed=discord.Embed(description=f"{E.LEAF} Nenhuma alteração nos seus cargos.", color=0x99AAB5),
+                ephemeral=True,
+            )
+
+        try:
+            await inter.user.edit(
+                roles=[discord.Object(id=rid) for rid in novos],
+                reason="Self-roles (menu)",
+            )
+        except discord.HTTPException:
+            return await inter.response.send_message(
+                embed=error_embed("Sem permissão", "Não consegui alterar seus cargos."), ephemeral=True
+            )
+
+        linhas = [f"{E.VERIFY} <@&{rid}>" for rid in adicionados] + [f"{E.LEAF} ~~<@&{rid}>~~" for rid in removidos]
+        await inter.response.send_message(
+            embed=discord.Embed(description="\n".join(linhas), color=Colors.SUCCESS),
+            ephemeral=True,
+        )
+
+
+def _build_view(panel: dict) -> discord.ui.View:
+    view  = discord.ui.View(timeout=None)
+    roles = panel["roles"]
+    if panel.get("modo") == "menu":
+        view.add_item(SelfRoleSelect(roles[:20]))
+        return view
     styles = [
         discord.ButtonStyle.primary,
         discord.ButtonStyle.secondary,
@@ -131,29 +147,35 @@ def _build_view(roles: list[dict]) -> discord.ui.View:
     return view
 
 
-def _restore_view(panel: dict) -> discord.ui.View:
-    return _build_view(panel["roles"])
-
-
 # ── Cog ───────────────────────────────────────────────────────────────────────
 
 class SelfRoles(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
+        self.paineis: dict[int, dict] = {}   # message_id → painel
 
     async def cog_load(self):
-        await _ensure_table()
-        # Restaura views de todos os painéis após reinício
-        panels = []
-        async with get_pool().acquire() as conn:
-            rows = await conn.fetch("SELECT * FROM selfroles_panels")
-        for row in rows:
-            d = dict(row)
-            d["roles"] = json.loads(d["roles"]) if isinstance(d["roles"], str) else d["roles"]
-            panels.append(d)
-        for panel in panels:
-            self.bot.add_view(_restore_view(panel), message_id=panel["message_id"])
-        log.info(f"[SELFROLES] {len(panels)} painel(is) restaurado(s).")
+        # Carrega o registro de painéis e restaura as views após reinício
+        async with unidade() as uow:
+            paineis = await uow.selfroles.paineis()
+        self.paineis = {p["message_id"]: _indexar(p) for p in paineis}
+        for panel in self.paineis.values():
+            self.bot.add_view(_build_view(panel), message_id=panel["message_id"])
+        log.info(f"[SELFROLES] {len(self.paineis)} painel(is) restaurado(s).")
+
+    def _painel_do_servidor(self, guild_id: int, message_id: int) -> dict | None:
+        panel = self.paineis.get(message_id)
+        return panel if panel and panel["guild_id"] == guild_id else None
+
+    async def _atualizar_mensagem(self, guild: discord.Guild, panel: dict):
+        view = _build_view(panel)
+        self.bot.add_view(view, message_id=panel["message_id"])
+        ch = guild.get_channel(panel["channel_id"])
+        if isinstance(ch, discord.TextChannel):
+            try:
+                await ch.get_partial_message(panel["message_id"]).edit(view=view)
+            except discord.HTTPException:
+                pass
 
     sr_group = app_commands.Group(
         name="selfroles",
@@ -167,12 +189,18 @@ class SelfRoles(commands.Cog):
         titulo="Título do painel",
         descricao="Descrição do painel",
         cor="Cor hex (ex: #590CEA)",
+        modo="Botões (um cargo por clique) ou menu de seleção múltipla",
     )
+    @app_commands.choices(modo=[
+        app_commands.Choice(name="Botões", value="botoes"),
+        app_commands.Choice(name="Menu (vários cargos de uma vez)", value="menu"),
+    ])
     async def sr_painel(self, inter: discord.Interaction,
                          canal: discord.TextChannel,
                          titulo: str = "🎭 Selecione seus cargos",
                          descricao: str = "Clique nos botões abaixo para adicionar ou remover cargos do seu perfil.",
-                         cor: str = "#590CEA"):
+                         cor: str = "#590CEA",
+                         modo: str = "botoes"):
         try:
             color = int(cor.lstrip("#"), 16)
         except ValueError:
@@ -192,8 +220,11 @@ class SelfRoles(commands.Cog):
             "descricao":  descricao,
             "cor":        color,
             "roles":      [],
+            "modo":       modo,
         }
-        await _save_panel(panel)
+        async with unidade() as uow:
+            await uow.selfroles.salvar(panel)
+        self.paineis[msg.id] = _indexar(panel)
 
         await inter.response.send_message(
             embed=success_embed("Painel criado!",
@@ -221,8 +252,8 @@ class SelfRoles(commands.Cog):
                 embed=error_embed("ID inválido", "Digite o ID numérico da mensagem."), ephemeral=True
             )
 
-        panel = await _get_panel(mid)
-        if not panel or panel["guild_id"] != inter.guild.id:
+        panel = self._painel_do_servidor(inter.guild.id, mid)
+        if not panel:
             return await inter.response.send_message(
                 embed=error_embed("Painel não encontrado", f"Nenhum painel com ID `{mid}` neste servidor."),
                 ephemeral=True,
@@ -233,29 +264,27 @@ class SelfRoles(commands.Cog):
                 embed=error_embed("Limite atingido", "Máximo de 20 cargos por painel."), ephemeral=True
             )
 
-        if any(r["role_id"] == cargo.id for r in panel["roles"]):
+        if cargo.id in panel["ids"]:
             return await inter.response.send_message(
                 embed=error_embed("Já adicionado", f"{cargo.mention} já está neste painel."), ephemeral=True
             )
 
-        panel["roles"].append({
-            "role_id":   cargo.id,
-            "role_name": cargo.name,
-            "label":     label or cargo.name,
-            "emoji":     emoji,
-        })
-        await _save_panel(panel)
+        async with unidade() as uow:
+            roles = await uow.selfroles.acrescentar_cargo(mid, {
+                "role_id":   cargo.id,
+                "role_name": cargo.name,
+                "label":     label or cargo.name,
+                "emoji":     emoji,
+            })
+        if roles is None:
+            return await inter.response.send_message(
+                embed=error_embed("Não adicionado", "O painel está cheio ou já tem este cargo."), ephemeral=True
+            )
+        panel["roles"] = roles
+        _indexar(panel)
 
         # Atualiza a mensagem
-        ch  = inter.guild.get_channel(panel["channel_id"])
-        if isinstance(ch, discord.TextChannel):
-            try:
-                msg = await ch.fetch_message(mid)
-                view = _build_view(panel["roles"])
-                self.bot.add_view(view, message_id=mid)
-                await msg.edit(view=view)
-            except discord.HTTPException:
-                pass
+        await self._atualizar_mensagem(inter.guild, panel)
 
         await inter.response.send_message(
             embed=success_embed("Cargo adicionado!", f"{cargo.mention} adicionado ao painel."),
@@ -270,27 +299,22 @@ class SelfRoles(commands.Cog):
         except ValueError:
             return await inter.response.send_message(embed=error_embed("ID inválido", ""), ephemeral=True)
 
-        panel = await _get_panel(mid)
-        if not panel or panel["guild_id"] != inter.guild.id:
+        panel = self._painel_do_servidor(inter.guild.id, mid)
+        if not panel:
             return await inter.response.send_message(embed=error_embed("Não encontrado", ""), ephemeral=True)
 
-        antes = len(panel["roles"])
-        panel["roles"] = [r for r in panel["roles"] if r["role_id"] != cargo.id]
-        if len(panel["roles"]) == antes:
+        roles = None
+        if cargo.id in panel["ids"]:
+            async with unidade() as uow:
+                roles = await uow.selfroles.remover_cargo(mid, cargo.id)
+        if roles is None:
             return await inter.response.send_message(
                 embed=error_embed("Não encontrado", f"{cargo.mention} não está neste painel."), ephemeral=True
             )
+        panel["roles"] = roles
+        _indexar(panel)
 
-        await _save_panel(panel)
-
-        ch = inter.guild.get_channel(panel["channel_id"])
-        if isinstance(ch, discord.TextChannel):
-            try:
-                msg = await ch.fetch_message(mid)
-                view = _build_view(panel["roles"])
-                await msg.edit(view=view)
-            except discord.HTTPException:
-                pass
+        await self._atualizar_mensagem(inter.guild, panel)
 
         await inter.response.send_message(
             embed=success_embed("Removido!", f"{cargo.mention} removido do painel."), ephemeral=True
@@ -298,7 +322,10 @@ class SelfRoles(commands.Cog):
 
     @sr_group.command(name="lista", description="Lista todos os painéis de self-roles do servidor")
     async def sr_lista(self, inter: discord.Interaction):
-        panels = await _list_panels(inter.guild.id)
+        panels = sorted(
+            (p for p in self.paineis.values() if p["guild_id"] == inter.guild.id),
+            key=lambda p: p["message_id"], reverse=True,
+        )[:20]
         if not panels:
             return await inter.response.send_message(
                 embed=error_embed("Sem painéis", "Nenhum painel criado ainda."), ephemeral=True
@@ -311,7 +338,7 @@ class SelfRoles(commands.Cog):
                 value=(
                     f"{E.ARROW_BLUE} Canal: {ch.mention if ch else ('`' + str(p['channel_id']) + '`')}\n"
                     f"{E.SYMBOL} ID: `{p['message_id']}`\n"
-                    f"{E.STAR} Cargos: `{len(p['roles'])}`"
+                    f"{E.STAR} Cargos: `{len(p['roles'])}` · Modo: `{p['modo']}`"
                 ),
                 inline=False,
             )
@@ -4,8 +4,14 @@ import discord
 from discord import app_commands
 from discord.ext import commands
 import asyncio
+import gzip
+import hashlib
+import html
 import io
 import logging
+import tempfile
+import typing
+import zlib
 from datetime import timezone
 from db import database as db
 from utils.constants import Colors, E, success_embed, error_embed, mod_embed, _now
@@ -29,19 +35,187 @@ LABEL_MAP = {
 
 # ── Helpers ───────────────────────────────────────────────────────────────────
 
-async def _gerar_transcript(channel: discord.TextChannel) -> discord.File:
-    """Gera um arquivo .txt com o histórico do ticket."""
-    linhas = [f"═══ Transcript — #{channel.name} ═══\n"]
-    async for msg in channel.history(limit=500, oldest_first=True):
-        ts = msg.created_at.replace(tzinfo=timezone.utc).strftime("%d/%m/%Y %H:%M")
-        conteudo = msg.content or ""
-        if msg.embeds:
-            conteudo += " [embed]"
-        if msg.attachments:
-            conteudo += " " + " ".join(a.url for a in msg.attachments)
-        linhas.append(f"[{ts}] {msg.author} ({msg.author.id}): {conteudo}")
-    texto = "\n".join(linhas) or "Sem mensagens."
-    return discord.File(fp=io.BytesIO(texto.encode()), filename=f"transcript-{channel.name}.txt")
+_TRANSCRIPT_MEMORIA = 1024 * 1024   # acima disso o arquivo temporário vai para o disco
+
+_HTML_INICIO = """<!DOCTYPE html>
+<html lang="pt-br"><head><meta charset="utf-8"><title>Transcript — #{canal}</title>
+<style>
+body{{background:#313338;color:#dbdee1;font-family:Segoe UI,Helvetica,Arial,sans-serif;margin:0;padding:16px}}
+h1{{font-size:18px;color:#f2f3f5;border-bottom:1px solid #3f4147;padding-bottom:8px}}
+.msg{{display:flex;gap:12px;padding:6px 0}}
+.av{{width:40px;height:40px;border-radius:50%;flex-shrink:0}}
+.autor{{font-weight:600;color:#f2f3f5}} .ts{{color:#949ba4;font-size:12px;margin-left:6px}}
+.txt{{white-space:pre-wrap;word-wrap:break-word}}
+.emb{{border-left:4px solid #590cea;background:#2b2d31;border-radius:4px;padding:8px 12px;margin-top:4px;max-width:520px}}
+.emb-t{{font-weight:600;color:#f2f3f5}} .emb-f{{margin-top:4px}} .emb-f b{{display:block;color:#f2f3f5}}
+.anexo img{{max-width:400px;max-height:300px;border-radius:4px;margin-top:4px}}
+a{{color:#00a8fc}}
+</style></head><body>
+<h1>Transcript — #{canal}</h1>
+"""
+_HTML_FIM = "</body></html>\n"
+
+
+def _linha_txt(msg: discord.Message) -> str:
+    ts = msg.created_at.replace(tzinfo=timezone.utc).strftime("%d/%m/%Y %H:%M")
+    conteudo = msg.content or ""
+    if msg.embeds:
+        conteudo += " [embed]"
+    if msg.attachments:
+        conteudo += " " + " ".join(a.url for a in msg.attachments)
+    return f"[{ts}] {msg.author} ({msg.author.id}): {conteudo}\n"
+
+
+def _bloco_html(msg: discord.Message) -> str:
+    ts = msg.created_at.replace(tzinfo=timezone.utc).strftime("%d/%m/%Y %H:%M")
+    partes = [
+        '<div class="msg">',
+        f'<img class="av" src="{html.escape(msg.author.display_avatar.with_size(64).url)}" alt="">',
+        "<div>",
+        f'<span class="autor">{html.escape(str(msg.author))}</span><span class="ts">{ts}</span>',
+    ]
+    if msg.content:
+        partes.append(f'<div class="txt">{html.escape(msg.content)}</div>')
+    for emb in msg.embeds:
+        cor = f"#{emb.color.value:06x}" if emb.color else "#590cea"
+        partes.append(f'<div class="emb" style="border-color:{cor}">')
+        if emb.title:
+            partes.append(f'<div class="emb-t">{html.escape(emb.title)}</div>')
+        if emb.description:
+            partes.append(f'<div class="txt">{html.escape(emb.description)}</div>')
+        for field in emb.fields:
+            partes.append(
+                f'<div class="emb-f"><b>{html.escape(str(field.name))}</b>'
+                f'<span class="txt">{html.escape(str(field.value))}</span></div>'
+            )
+        if emb.image and emb.image.url:
+            partes.append(f'<div class="anexo"><img src="{html.escape(emb.image.url)}" alt=""></div>')
+        partes.append("</div>")
+    for a in msg.attachments:
+        url = html.escape(a.url)
+        if (a.content_type or "").startswith("image/"):
+            partes.append(f'<div class="anexo"><a href="{url}"><img src="{url}" alt="{html.escape(a.filename)}"></a></div>')
+        else:
+            partes.append(f'<div class="anexo"><a href="{url}">{html.escape(a.filename)}</a></div>')
+    partes.append("</div></div>\n")
+    return "".join(partes)
+
+
+async def _gerar_transcript(channel: discord.TextChannel,
+                            formatos: tuple[str, ...] = ("txt",)) -> list[discord.File]:
+    """
+    Gera os transcripts do ticket percorrendo todo o histórico uma única vez.
+    Cada mensagem é escrita direto em um SpooledTemporaryFile, então a memória
+    fica constante independente do tamanho do ticket.
+    Formatos: "txt" (texto puro) e "html" (HTML com avatares e embeds, gzip).
+    """
+    arquivos: dict[str, tempfile.SpooledTemporaryFile] = {}
+    saidas:   dict[str, typing.BinaryIO] = {}
+    for fmt in formatos:
+        fp = tempfile.SpooledTemporaryFile(max_size=_TRANSCRIPT_MEMORIA)
+        arquivos[fmt] = fp
+        if fmt == "html":
+            saidas[fmt] = gzip.GzipFile(fileobj=fp, mode="wb", filename=f"transcript-{channel.name}.html")
+            saidas[fmt].write(_HTML_INICIO.format(canal=html.escape(channel.name)).encode())
+        else:
+            saidas[fmt] = fp
+            fp.write(f"═══ Transcript — #{channel.name} ═══\n\n".encode())
+
+    total = 0
+    try:
+        async for msg in channel.history(limit=None, oldest_first=True):
+            total += 1
+            if "txt" in saidas:
+                saidas["txt"].write(_linha_txt(msg).encode())
+            if "html" in saidas:
+                saidas["html"].write(_bloco_html(msg).encode())
+    except BaseException:
+        for fp in arquivos.values():
+            fp.close()
+        raise
+
+    files = []
+    for fmt, fp in arquivos.items():
+        if fmt == "html":
+            if not total:
+                saidas[fmt].write("<p>Sem mensagens.</p>".encode())
+            saidas[fmt].write(_HTML_FIM.encode())
+            saidas[fmt].close()   # fecha só o gzip, o arquivo temporário continua aberto
+            nome = f"transcript-{channel.name}.html.gz"
+        else:
+            if not total:
+                fp.write("Sem mensagens.\n".encode())
+            nome = f"transcript-{channel.name}.txt"
+        fp.seek(0)
+        files.append(discord.File(fp=fp, filename=nome))
+    return files
+
+
+def _compactar(file: discord.File) -> tuple[bytes, str]:
+    """Comprime (gzip) um transcript em texto para o arquivo, sem consumir o File."""
+    fp   = file.fp
+    comp = zlib.compressobj(9, zlib.DEFLATED, 31)
+    sha  = hashlib.sha256()
+    partes = []
+    while chunk := fp.read(64 * 1024):
+        sha.update(chunk)
+        partes.append(comp.compress(chunk))
+    partes.append(comp.flush())
+    fp.seek(0)
+    return b"".join(partes), sha.hexdigest()
+
+
+def _descompactar(dados: bytes, filename: str) -> discord.File:
+    fp     = tempfile.SpooledTemporaryFile(max_size=_TRANSCRIPT_MEMORIA)
+    decomp = zlib.decompressobj(31)
+    for i in range(0, len(dados), 64 * 1024):
+        fp.write(decomp.decompress(dados[i:i + 64 * 1024]))
+    fp.write(decomp.flush())
+    fp.seek(0)
+    return discord.File(fp=fp, filename=filename)
+
+
+def _liberar(files: list[discord.File]):
+    """discord.File não fecha arquivos que não abriu: libera os temporários depois do envio."""
+    for f in files:
+        f.close()      # devolve o close() original ao fp
+        f.fp.close()
+
+
+def _tamanho(file: discord.File) -> int:
+    fp = file.fp
+    fp.seek(0, 2)
+    n = fp.tell()
+    fp.seek(0)
+    return n
+
+
+def _caber_no_limite(files: list[discord.File], limite: int,
+                     txt_gz: bytes | None = None) -> tuple[list[discord.File], list[str]]:
+    """
+    Ajusta os anexos ao limite de upload do servidor (guild.filesize_limit).
+    O .txt que não couber vai compactado (txt_gz, se já calculado); o que ainda
+    assim não couber fica de fora e é fechado. Retorna (anexos, nomes omitidos).
+    """
+    cabem, fora = [], []
+    for f in files:
+        if _tamanho(f) <= limite:
+            cabem.append(f)
+            continue
+        if f.filename.endswith(".txt"):
+            dados = txt_gz if txt_gz is not None else _compactar(f)[0]
+            if len(dados) <= limite:
+                cabem.append(discord.File(io.BytesIO(dados), filename=f"{f.filename}.gz"))
+                _liberar([f])
+                continue
+        fora.append(f.filename)
+        _liberar([f])
+    return cabem, fora
+
+
+def _aviso_omitidos(fora: list[str]) -> str:
+    return (f"\n{E.ARROW_RED} Grande demais para o limite de upload do servidor: "
+            + ", ".join(f"`{n}`" for n in fora) + ". Use `/ticket historico` para o arquivo.")
 
 
 # ── Modals ────────────────────────────────────────────────────────────────────
@@ -131,7 +305,10 @@ class TicketSelect(discord.ui.Select):
 
     async def callback(self, inter: discord.Interaction):
         categoria = self.values[0]
-        ticket = await db.get_ticket_by_user(inter.guild.id, inter.user.id)
+        cog = inter.client.cogs.get("Tickets")
+        if not cog:
+            return
+        ticket = cog.index.do_usuario(inter.guild.id, inter.user.id)
         if ticket:
             ch = inter.guild.get_channel(ticket["channel_id"])
             if ch:
@@ -142,10 +319,9 @@ class TicketSelect(discord.ui.Select):
                     ephemeral=True,
                 )
             else:
-                await db.close_ticket(ticket["channel_id"])
+                await cog._arquivar(ticket["channel_id"], None, None)
 
-        cfg = await db.get_guild_config(inter.guild.id)
-        if not cfg.get("ticket_category"):
+        if inter.guild.id not in cog.index.categoria:
             return await inter.response.send_message(
                 embed=error_embed("Não configurado", "Use `/ticket setup` primeiro."),
                 ephemeral=True,
@@ -185,10 +361,11 @@ class TicketMainView(discord.ui.View):
                        emoji="<a:1000006152:1475983799568433355>", custom_id="ticket:atender")
     async def atender(self, inter: discord.Interaction, _):
         cog = inter.client.cogs.get("Tickets")
-        if not cog or not await cog._check_staff(inter):
+        if not cog or not cog._check_staff(inter):
             return await inter.response.send_message(
                 embed=error_embed("Sem permissão", "Apenas a staff pode assumir tickets."), ephemeral=True
             )
+        cog.index.atender(inter.channel.id, inter.user.id)
         await db.set_ticket_atendente(inter.channel.id, inter.user.id)
         emb = discord.Embed(
             title=f"{E.VERIFY} Ticket Assumido",
@@ -206,7 +383,7 @@ class TicketMainView(discord.ui.View):
                        emoji="<:1000006182:1475983151712174290>", custom_id="ticket:admin")
     async def admin(self, inter: discord.Interaction, _):
         cog = inter.client.cogs.get("Tickets")
-        if not cog or not await cog._check_staff(inter):
+        if not cog or not cog._check_staff(inter):
             return await inter.response.send_message(
                 embed=error_embed("Sem permissão", "Apenas a staff."), ephemeral=True
             )
@@ -231,12 +408,12 @@ class TicketMainView(discord.ui.View):
         cog = inter.client.cogs.get("Tickets")
         if not cog:
             return
-        ticket = await db.get_ticket_by_channel(inter.channel.id)
+        ticket = cog.index.por_canal_id(inter.channel.id)
         if not ticket:
             return await inter.response.send_message(
                 embed=error_embed("Erro", "Este canal não é um ticket."), ephemeral=True
             )
-        is_staff = await cog._check_staff(inter)
+        is_staff = cog._check_staff(inter)
         is_owner = inter.user.id == ticket["user_id"]
         if not (is_staff or is_owner):
             return await inter.response.send_message(
@@ -262,7 +439,10 @@ class TicketMainView(discord.ui.View):
     @discord.ui.button(label="Notificar", style=discord.ButtonStyle.secondary,
                        emoji="<a:1503hearts:1430339028720549908>", custom_id="ticket:notificar")
     async def notificar(self, inter: discord.Interaction, _):
-        ticket = await db.get_ticket_by_channel(inter.channel.id)
+        cog = inter.client.cogs.get("Tickets")
+        if not cog:
+            return
+        ticket = cog.index.por_canal_id(inter.channel.id)
         if not ticket:
             return await inter.response.send_message(
                 embed=error_embed("Erro", "Este canal não é um ticket."), ephemeral=True
@@ -280,8 +460,7 @@ class TicketMainView(discord.ui.View):
                     embed=mod_embed(f"{E.WARN_IC} Notificação", f"{inter.user.mention} aguarda atendimento.")
                 )
                 return
-        cfg = await db.get_guild_config(inter.guild.id)
-        staff_roles = cfg.get("staff_roles") or []
+        staff_roles = cog.index.staff.get(inter.guild.id)
         if staff_roles:
             mentions = " ".join(f"<@&{rid}>" for rid in staff_roles)
             await inter.response.send_message(
@@ -314,18 +493,36 @@ class TicketAdminView(discord.ui.View):
     @discord.ui.button(label="Transcript", style=discord.ButtonStyle.success, emoji="📄")
     async def transcript(self, inter: discord.Interaction, _):
         await inter.response.defer(ephemeral=True)
-        file = await _gerar_transcript(inter.channel)
-        await inter.followup.send(
-            embed=success_embed("Transcript gerado", f"Log do canal `{inter.channel.name}`."),
-            file=file, ephemeral=True,
-        )
+        files, fora = _caber_no_limite(await _gerar_transcript(inter.channel, ("txt", "html")),
+                                       inter.guild.filesize_limit)
+        try:
+            await inter.followup.send(
+                embed=success_embed("Transcript gerado", f"Log do canal `{inter.channel.name}`."
+                                    + (_aviso_omitidos(fora) if fora else "")),
+                files=files, ephemeral=True,
+            )
+        finally:
+            _liberar(files)
 
     @discord.ui.button(label="Fechar Silenciosamente", style=discord.ButtonStyle.danger, emoji="🗑️")
     async def fechar_silencioso(self, inter: discord.Interaction, _):
         await inter.response.send_message(
             embed=mod_embed(f"{E.ARROW_RED} Fechando...", f"{E.LOADING} Canal deletado em 3 segundos.")
         )
-        await db.close_ticket(inter.channel.id)
+        files: list[discord.File] = []
+        dados = sha = None
+        try:
+            files = await _gerar_transcript(inter.channel)
+            dados, sha = _compactar(files[0])
+        except Exception as exc:
+            log.warning(f"[TICKETS] Erro ao gerar transcript: {exc}")
+        finally:
+            _liberar(files)
+        cog = inter.client.cogs.get("Tickets")
+        if cog:
+            await cog._arquivar(inter.channel.id, inter.channel.name, inter.user.id, dados, sha)
+        else:
+            await db.archive_ticket(inter.channel.id, inter.channel.name, inter.user.id, dados, sha)
         await asyncio.sleep(3)
         try:
             await inter.channel.delete()
@@ -333,20 +530,98 @@ class TicketAdminView(discord.ui.View):
             pass
 
 
+# ── Índice em memória ─────────────────────────────────────────────────────────
+
+class TicketIndex:
+    """Tickets abertos (por canal e por dono) e config de staff por servidor.
+
+    Aquecido no cog_load e mantido em sincronia a cada abertura, atendimento,
+    fechamento e /ticket setup — os botões dos tickets não consultam o banco.
+    """
+
+    def __init__(self):
+        self.por_canal:   dict[int, dict]            = {}
+        self.por_usuario: dict[tuple[int, int], int] = {}
+        self.staff:       dict[int, frozenset[int]]  = {}
+        self.categoria:   dict[int, int]             = {}
+
+    def carregar(self, tickets: list[dict], configs: list[dict]):
+        self.por_canal.clear()
+        self.por_usuario.clear()
+        self.staff.clear()
+        self.categoria.clear()
+        for t in tickets:
+            self.abrir(t)
+        for c in configs:
+            self.configurar(c["guild_id"], c["ticket_category"], c["staff_roles"] or [])
+
+    def configurar(self, guild_id: int, categoria: int | None, staff_roles: typing.Iterable[int]):
+        self.staff[guild_id] = frozenset(staff_roles)
+        if categoria:
+            self.categoria[guild_id] = categoria
+        else:
+            self.categoria.pop(guild_id, None)
+
+    def abrir(self, ticket: dict):
+        self.por_canal[ticket["channel_id"]] = ticket
+        self.por_usuario[(ticket["guild_id"], ticket["user_id"])] = ticket["channel_id"]
+
+    def fechar(self, channel_id: int) -> dict | None:
+        ticket = self.por_canal.pop(channel_id, None)
+        if ticket:
+            chave = (ticket["guild_id"], ticket["user_id"])
+            if self.por_usuario.get(chave) == channel_id:
+                del self.por_usuario[chave]
+        return ticket
+
+    def por_canal_id(self, channel_id: int) -> dict | None:
+        return self.por_canal.get(channel_id)
+
+    def do_usuario(self, guild_id: int, user_id: int) -> dict | None:
+        ch_id = self.por_usuario.get((guild_id, user_id))
+        return self.por_canal.get(ch_id) if ch_id else None
+
+    def atender(self, channel_id: int, user_id: int):
+        ticket = self.por_canal.get(channel_id)
+        if ticket:
+            ticket["atendente"] = user_id
+            if not ticket.get("atendido_em"):
+                ticket["atendido_em"] = _now()
+
+    def eh_staff(self, member: discord.Member) -> bool:
+        if member.guild_permissions.administrator:
+            return True
+        staff = self.staff.get(member.guild.id)
+        return bool(staff) and any(member.get_role(rid) for rid in staff)
+
+
 # ── Cog ───────────────────────────────────────────────────────────────────────
 
 class Tickets(commands.Cog):
     def __init__(self, bot: commands.Bot):
-        self.bot = bot
+        self.bot   = bot
+        self.index = TicketIndex()
         bot.add_view(TicketSelectView())
         bot.add_view(TicketMainView(0))
 
-    async def _check_staff(self, inter: discord.Interaction) -> bool:
-        if inter.user.guild_permissions.administrator:
-            return True
-        cfg = await db.get_guild_config(inter.guild.id)
-        staff_ids = set(cfg.get("staff_roles") or [])
-        return bool({r.id for r in inter.user.roles} & staff_ids)
+    async def cog_load(self):
+        self.index.carregar(await db.list_all_open_tickets(), await db.list_ticket_configs())
+        log.info(f"[TICKETS] Índice carregado: {len(self.index.por_canal)} ticket(s) aberto(s), "
+                 f"{len(self.index.staff)} servidor(es) configurado(s)")
+
+    def _check_staff(self, inter: discord.Interaction) -> bool:
+        return self.index.eh_staff(inter.user)
+
+    async def _arquivar(self, channel_id: int, canal_nome: str | None, fechado_por: int | None,
+                        transcript: bytes | None = None, sha: str | None = None) -> int | None:
+        self.index.fechar(channel_id)
+        return await db.archive_ticket(channel_id, canal_nome, fechado_por, transcript, sha)
+
+    @commands.Cog.listener()
+    async def on_guild_channel_delete(self, channel: discord.abc.GuildChannel):
+        # Canal de ticket apagado manualmente: arquiva sem transcript
+        if self.index.por_canal_id(channel.id):
+            await self._arquivar(channel.id, channel.name, None)
 
     async def criar_ticket(self, inter: discord.Interaction, categoria: str, motivo: str):
         await inter.response.defer(ephemeral=True)
@@ -377,6 +652,10 @@ class Tickets(commands.Cog):
             )
 
         await db.open_ticket(inter.guild.id, inter.user.id, channel.id, categoria)
+        self.index.abrir({
+            "channel_id": channel.id, "guild_id": inter.guild.id, "user_id": inter.user.id,
+            "categoria": categoria, "atendente": None, "created_at": _now(), "atendido_em": None,
+        })
 
         emb = discord.Embed(
             title="*__Boas vindas__*! <:1000011429:1483272519522848849>",
@@ -424,36 +703,51 @@ class Tickets(commands.Cog):
         )
 
     async def fechar_ticket_confirmado(self, inter: discord.Interaction, opener_id: int, gerar_transcript_auto: bool = True):
-        """Fecha o ticket após confirmação, gerando transcript automático no canal de log."""
+        """Fecha o ticket após confirmação: gera o transcript, arquiva o ticket e envia ao canal de log."""
+        await inter.response.edit_message(
+            embed=mod_embed(f"{E.ARROW_YELLOW} Fechando...", f"{E.LOADING} Canal deletado em 5 segundos."),
+            view=None,
+        )
         cfg    = await db.get_guild_config(inter.guild.id)
-        ticket = await db.get_ticket_by_channel(inter.channel.id)
+        ticket = self.index.por_canal_id(inter.channel.id)
 
+        files: list[discord.File] = []
+        dados = sha = None
         if gerar_transcript_auto:
             try:
-                file = await _gerar_transcript(inter.channel)
-                log_id = cfg.get("ticket_log") or cfg.get("log_channel")
-                if log_id:
-                    lch = inter.guild.get_channel(log_id)
-                    if isinstance(lch, discord.TextChannel):
-                        opener = inter.guild.get_member(ticket["user_id"]) if ticket else None
-                        le = discord.Embed(
-                            title=f"{E.RULES} Ticket Fechado — Transcript",
-                            color=0xe74c3c,
-                        )
-                        le.add_field(name="Canal",       value=inter.channel.name, inline=True)
-                        le.add_field(name="Fechado por", value=inter.user.mention,  inline=True)
-                        if opener:
-                            le.add_field(name="Dono", value=opener.mention, inline=True)
-                        le.timestamp = _now()
-                        await lch.send(embed=le, file=file)
+                files = await _gerar_transcript(inter.channel, ("txt", "html"))
+                dados, sha = _compactar(files[0])
             except Exception as exc:
                 log.warning(f"[TICKETS] Erro ao gerar transcript: {exc}")
 
-        await inter.response.edit_message(
-            embed=mod_embed(f"{E.ARROW_YELLOW} Fechando...", f"{E.LOADING} Canal deletado em 5 segundos."),
-            view=None,
-        )
-        await db.close_ticket(inter.channel.id)
+        try:
+            arquivo_id = await self._arquivar(inter.channel.id, inter.channel.name, inter.user.id, dados, sha)
+
+            log_id = cfg.get("ticket_log") or cfg.get("log_channel")
+            lch = inter.guild.get_channel(log_id) if log_id else None
+            if isinstance(lch, discord.TextChannel):
+                opener = inter.guild.get_member(ticket["user_id"]) if ticket else None
+                le = discord.Embed(
+                    title=f"{E.RULES} Ticket Fechado — Transcript",
+                    color=0xe74c3c,
+                )
+                le.add_field(name="Canal",       value=inter.channel.name, inline=True)
+                le.add_field(name="Fechado por", value=inter.user.mention,  inline=True)
+                if opener:
+                    le.add_field(name="Dono", value=opener.mention, inline=True)
+                if arquivo_id:
+                    le.set_footer(text=f"Arquivo #{arquivo_id} • /ticket historico")
+                le.timestamp = _now()
+                files, fora = _caber_no_limite(files, inter.guild.filesize_limit, dados)
+                if fora:
+                    le.description = _aviso_omitidos(fora).strip()
+                try:
+                    await lch.send(embed=le, files=files)
+                except discord.HTTPException as exc:
+                    log.warning(f"[TICKETS] Erro ao enviar transcript: {exc}")
+        finally:
+            _liberar(files)
+
         await asyncio.sleep(5)
         try:
             await inter.channel.delete()
@@ -499,6 +793,7 @@ class Tickets(commands.Cog):
         if banner_url:
             fields["ticket_banner"] = banner_url
         await db.upsert_guild_config(inter.guild.id, **fields)
+        self.index.configurar(inter.guild.id, categoria.id, fields["staff_roles"])
 
         await inter.response.send_message(embed=success_embed("Tickets configurados!",
             f"{E.SYMBOL} Categoria: {categoria.name}\n"
@@ -568,31 +863,43 @@ class Tickets(commands.Cog):
         await inter.response.send_message(embed=emb, ephemeral=True)
 
     @ticket_group.command(name="transcript", description="Gera o transcript do ticket atual")
-    async def ticket_transcript(self, inter: discord.Interaction):
-        if not await self._check_staff(inter):
+    @app_commands.describe(formato="Formato do arquivo (padrão: texto + HTML)")
+    @app_commands.choices(formato=[
+        app_commands.Choice(name="Texto + HTML", value="ambos"),
+        app_commands.Choice(name="Texto (.txt)", value="txt"),
+        app_commands.Choice(name="HTML compactado (.html.gz)", value="html"),
+    ])
+    async def ticket_transcript(self, inter: discord.Interaction, formato: str = "ambos"):
+        if not self._check_staff(inter):
             return await inter.response.send_message(
                 embed=error_embed("Sem permissão", "Apenas a staff pode usar este comando."), ephemeral=True
             )
-        ticket = await db.get_ticket_by_channel(inter.channel.id)
+        ticket = self.index.por_canal_id(inter.channel.id)
         if not ticket:
             return await inter.response.send_message(
                 embed=error_embed("Erro", "Este canal não é um ticket."), ephemeral=True
             )
         await inter.response.defer(ephemeral=True)
-        file = await _gerar_transcript(inter.channel)
-        await inter.followup.send(
-            embed=success_embed("Transcript gerado", f"Log do canal `{inter.channel.name}`."),
-            file=file, ephemeral=True,
-        )
+        formatos = ("txt", "html") if formato == "ambos" else (formato,)
+        files, fora = _caber_no_limite(await _gerar_transcript(inter.channel, formatos),
+                                       inter.guild.filesize_limit)
+        try:
+            await inter.followup.send(
+                embed=success_embed("Transcript gerado", f"Log do canal `{inter.channel.name}`."
+                                    + (_aviso_omitidos(fora) if fora else "")),
+                files=files, ephemeral=True,
+            )
+        finally:
+            _liberar(files)
 
     @ticket_group.command(name="fechar", description="Fecha o ticket do canal atual")
     async def ticket_fechar(self, inter: discord.Interaction):
-        ticket = await db.get_ticket_by_channel(inter.channel.id)
+        ticket = self.index.por_canal_id(inter.channel.id)
         if not ticket:
             return await inter.response.send_message(
                 embed=error_embed("Erro", "Este canal não é um ticket."), ephemeral=True
             )
-        is_staff = await self._check_staff(inter)
+        is_staff = self._check_staff(inter)
         is_owner = inter.user.id == ticket["user_id"]
         if not (is_staff or is_owner):
             return await inter.response.send_message(
@@ -615,6 +922,81 @@ class Tickets(commands.Cog):
             ephemeral=True,
         )
 
+    @ticket_group.command(name="historico", description="Pesquisa tickets fechados")
+    @app_commands.describe(
+        usuario="Quem abriu o ticket",
+        categoria="Categoria do ticket",
+        ticket_id="ID do arquivo — envia o transcript completo",
+    )
+    @app_commands.choices(categoria=[
+        app_commands.Choice(name=label, value=valor) for valor, label in LABEL_MAP.items()
+    ])
+    async def ticket_historico(self, inter: discord.Interaction,
+                               usuario: discord.User = None,
+                               categoria: str = None,
+                               ticket_id: app_commands.Range[int, 1, 2_147_483_647] = None):
+        await inter.response.defer(ephemeral=True)
+
+        if ticket_id is not None:
+            t = await db.get_archived_ticket(inter.guild.id, ticket_id)
+            if not t:
+                return await inter.followup.send(
+                    embed=error_embed("Não encontrado", f"Nenhum ticket arquivado com ID `{ticket_id}`."),
+                    ephemeral=True,
+                )
+            emb = discord.Embed(title=f"{E.RULES} Ticket #{t['id']} — {t['canal_nome'] or t['channel_id']}",
+                                color=Colors.MAIN)
+            emb.add_field(name="Dono",      value=f"<@{t['user_id']}>", inline=True)
+            emb.add_field(name="Categoria", value=LABEL_MAP.get(t["categoria"], t["categoria"] or "—"), inline=True)
+            emb.add_field(name="Atendente", value=f"<@{t['atendente']}>" if t["atendente"] else "—", inline=True)
+            if t["aberto_em"]:
+                emb.add_field(name="Aberto", value=discord.utils.format_dt(t["aberto_em"], "f"), inline=True)
+            if t["atendido_em"]:
+                emb.add_field(name="Atendido", value=discord.utils.format_dt(t["atendido_em"], "f"), inline=True)
+            emb.add_field(name="Fechado",
+                          value=f"{discord.utils.format_dt(t['fechado_em'], 'f')}"
+                                + (f" por <@{t['fechado_por']}>" if t["fechado_por"] else ""),
+                          inline=True)
+            emb.timestamp = _now()
+            files = []
+            if t["transcript"]:
+                files, fora = _caber_no_limite(
+                    [_descompactar(t["transcript"], f"transcript-{t['canal_nome'] or t['id']}.txt")],
+                    inter.guild.filesize_limit, t["transcript"],
+                )
+                if fora:
+                    emb.set_footer(text="Transcript grande demais para o limite de upload do servidor")
+            else:
+                emb.set_footer(text="Sem transcript arquivado")
+            try:
+                return await inter.followup.send(embed=emb, files=files, ephemeral=True)
+            finally:
+                _liberar(files)
+
+        tickets = await db.search_ticket_archive(
+            inter.guild.id, usuario.id if usuario else None, categoria, limit=15,
+        )
+        if not tickets:
+            return await inter.followup.send(
+                embed=error_embed("Nada encontrado", "Nenhum ticket fechado corresponde aos filtros."),
+                ephemeral=True,
+            )
+        emb = discord.Embed(title=f"{E.RULES} Histórico de Tickets ({len(tickets)})", color=Colors.MAIN)
+        for t in tickets:
+            emb.add_field(
+                name=f"#{t['id']} · {t['canal_nome'] or t['channel_id']}",
+                value=(
+                    f"<@{t['user_id']}> · {LABEL_MAP.get(t['categoria'], t['categoria'] or '—')}\n"
+                    f"{E.LOADING} Fechado {discord.utils.format_dt(t['fechado_em'], 'R')}"
+                    + (f" · atendido por <@{t['atendente']}>" if t["atendente"] else "")
+                    + ("" if t["tem_transcript"] else " · sem transcript")
+                ),
+                inline=False,
+            )
+        emb.set_footer(text="Use /ticket historico ticket_id:<ID> para baixar o transcript")
+        emb.timestamp = _now()
+        await inter.followup.send(embed=emb, ephemeral=True)
+
 
 async def setup(bot: commands.Bot):
     await bot.add_cog(Tickets(bot))
@@ -3,10 +3,16 @@
 import discord
 from discord import app_commands
 from discord.ext import commands
+import asyncio
+import json
 import random
 import itertools
 import aiohttp
 import logging
+import os
+import tempfile
+from collections import deque
+from pathlib import Path
 from utils.constants import Colors, E, success_embed, error_embed, _now
 
 log = logging.getLogger("multibot.util")
@@ -62,18 +68,112 @@ _NEKOS_MAP = {k: k for k in _ACOES}
 _NEKOS_MAP["highfive"] = "highfive"
 
 
-async def _get_gif(action: str) -> str:
-    cat = _NEKOS_MAP.get(action, "hug")
-    try:
-        async with aiohttp.ClientSession() as s:
-            async with s.get(f"https://nekos.best/api/v2/{cat}",
-                             timeout=aiohttp.ClientTimeout(total=5)) as r:
-                if r.status == 200:
-                    data = await r.json()
-                    return data["results"][0]["url"]
-    except Exception:
-        pass
-    return f"https://nekos.best/api/v2/{cat}/0001.gif"
+# ── Pool de GIFs ──────────────────────────────────────────────────────────────
+# Cada ação mantém uma fila de URLs já buscadas; os comandos só retiram da fila
+# e a reposição roda em segundo plano, em lote (?amount=), abaixo do mínimo.
+
+_GIF_MIN     = 5     # abaixo disso dispara reposição
+_GIF_MAX     = 20    # tamanho alvo da fila (máximo do ?amount= da nekos.best)
+_GIF_RESERVA = 50    # URLs guardadas em disco por categoria
+_GIF_ARQUIVO = Path(__file__).resolve().parent.parent / "data" / "gifs.json"   # independe do CWD
+
+
+class GifPool:
+    def __init__(self):
+        self.http = None
+        self.filas:   dict[str, deque[str]] = {cat: deque() for cat in set(_NEKOS_MAP.values())}
+        self.reserva: dict[str, list[str]]  = {}
+        self._repondo: set[str] = set()
+        self._tarefas: set[asyncio.Task] = set()   # referências: o loop só guarda weakrefs
+
+    def carregar_disco(self):
+        try:
+            dados = json.loads(_GIF_ARQUIVO.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            dados = {}
+        if not isinstance(dados, dict):
+            dados = {}
+        self.reserva = {
+            cat: [u for u in urls if isinstance(u, str)][-_GIF_RESERVA:]
+            for cat, urls in dados.items() if isinstance(urls, list)
+        }
+        for cat, urls in self.reserva.items():
+            if cat in self.filas:
+                self.filas[cat].extend(random.sample(urls, min(len(urls), _GIF_MAX)))
+
+    def salvar_disco(self, texto: str | None = None):
+        # Vários processos do cluster gravam o mesmo arquivo: escreve num temporário
+        # do mesmo diretório e troca atomicamente, nunca deixando JSON truncado
+        try:
+            _GIF_ARQUIVO.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=_GIF_ARQUIVO.parent, prefix=".gifs-", suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    f.write(texto or json.dumps(self.reserva))
+                os.replace(tmp, _GIF_ARQUIVO)
+            except BaseException:
+                os.unlink(tmp)
+                raise
+        except OSError as exc:
+            log.warning(f"[GIFS] Falha ao salvar cache em disco: {exc}")
+
+    def pegar(self, action: str) -> str:
+        cat  = _NEKOS_MAP.get(action, "hug")
+        fila = self.filas.setdefault(cat, deque())
+        if fila:
+            url = fila.popleft()
+        elif self.reserva.get(cat):
+            url = random.choice(self.reserva[cat])
+        else:
+            url = f"https://nekos.best/api/v2/{cat}/0001.gif"
+        if len(fila) < _GIF_MIN:
+            self.agendar(cat)
+        return url
+
+    def agendar(self, cat: str):
+        if self.http and cat not in self._repondo:
+            self._repondo.add(cat)
+            task = asyncio.create_task(self._repor(cat))
+            self._tarefas.add(task)
+            task.add_done_callback(self._tarefas.discard)
+
+    async def _repor(self, cat: str):
+        fila = self.filas[cat]
+        try:
+            faltam = _GIF_MAX - len(fila)
+            if faltam <= 0:
+                return
+            async with self.http.get(f"https://nekos.best/api/v2/{cat}?amount={faltam}",
+                                     timeout=aiohttp.ClientTimeout(total=10)) as r:
+                if r.status != 200:
+                    return
+                data = await r.json()
+            urls = [item["url"] for item in data.get("results", []) if item.get("url")]
+            fila.extend(urls)
+            reserva = self.reserva.setdefault(cat, [])
+            novas   = [u for u in urls if u not in reserva]
+            if novas:
+                reserva.extend(novas)
+                del reserva[:-_GIF_RESERVA]
+                # Grava a cada reposição: o SIGTERM do container não passa pelo cog_unload.
+                # Serializa aqui no loop; só a escrita vai para a thread.
+                await asyncio.to_thread(self.salvar_disco, json.dumps(self.reserva))
+        except Exception as exc:
+            log.debug(f"[GIFS] Reposição de '{cat}' falhou: {exc}")
+        finally:
+            self._repondo.discard(cat)
+
+    async def aquecer(self):
+        for cat in self.filas:
+            if len(self.filas[cat]) < _GIF_MAX:
+                self.agendar(cat)
+
+
+gif_pool = GifPool()
+
+
+def _get_gif(action: str) -> str:
+    return gif_pool.pegar(action)
 
 
 class RetribuirView(discord.ui.View):
@@ -91,7 +191,7 @@ class RetribuirView(discord.ui.View):
                 f"{E.ARROW_RED} Apenas {self.alvo.mention} pode retribuir!", ephemeral=True
             )
         dados = _ACOES[self.action]
-        gif   = await _get_gif(self.action)
+        gif   = _get_gif(self.action)
         texto = dados.get("frase_ret", f"{self.alvo.mention} retribuiu!") \
             .format(a=self.alvo.mention, b=self.autor.mention)
         emb = discord.Embed(description=f"{dados['emoji']} {texto} {dados['emoji2']}", color=Colors.MAIN)
@@ -107,7 +207,7 @@ class RetribuirView(discord.ui.View):
 async def _interacao(action: str, autor: discord.Member,
                       alvo: discord.Member | None = None) -> tuple[discord.Embed, discord.ui.View | None]:
     dados = _ACOES[action]
-    gif   = await _get_gif(action)
+    gif   = _get_gif(action)
     if alvo and alvo.id != autor.id:
         texto = random.choice(dados["frases"]).format(a=autor.mention, b=alvo.mention)
     else:
@@ -335,6 +435,14 @@ class Utilidade(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
 
+    async def cog_load(self):
+        gif_pool.http = self.bot.http_client
+        await asyncio.to_thread(gif_pool.carregar_disco)
+        await gif_pool.aquecer()
+
+    async def cog_unload(self):
+        await asyncio.to_thread(gif_pool.salvar_disco)
+
     # ── Comandos públicos ──────────────────────────────────────────────────
 
     @app_commands.command(name="ping", description="Latência do bot")
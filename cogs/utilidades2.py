@@ -1,8 +1,8 @@
 """
 cogs/utilidades2.py — Funcionalidades extras:
-  - Contador de membros em canal de voz (atualiza a cada 10 min)
+  - Contador de membros em canal de voz (atualiza na entrada/saída de membros)
   - Sistema de aniversário (registra data, bot parabeniza)
-  - Lembretes pessoais (/lembrar)
+  - Lembretes pessoais (/lembrar, /lembretes), com repetição opcional
   - Clima (/clima)
   - Tradução (/traduzir)
 """
@@ -13,161 +13,445 @@ from discord.ext import commands
 from discord.ext import tasks
 import aiohttp
 import asyncio
+import calendar
+import heapq
 import logging
-from datetime import datetime, timezone, timedelta
+import time
+from collections import deque
+from datetime import date, datetime, timezone, timedelta
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 from db.database import get_pool, get_guild_config, upsert_guild_config
+from utils.cache import TTLCache
 from utils.constants import Colors, E, success_embed, error_embed, _now
 
 log = logging.getLogger("multibot.util2")
 
+# Respostas das APIs externas: clima muda rápido, tradução não
+_CACHE_CLIMA    = TTLCache(ttl=10 * 60,      maxsize=512,  nome="clima")
+_CACHE_TRADUCAO = TTLCache(ttl=24 * 60 * 60, maxsize=2048, nome="traducao")
 
-async def _ensure_tables():
-    async with get_pool().acquire() as conn:
-        await conn.execute("""
-            CREATE TABLE IF NOT EXISTS aniversarios (
-                user_id   BIGINT PRIMARY KEY,
-                dia       INT NOT NULL,
-                mes       INT NOT NULL
-            );
-            CREATE TABLE IF NOT EXISTS lembretes (
-                id          SERIAL PRIMARY KEY,
-                user_id     BIGINT NOT NULL,
-                guild_id    BIGINT,
-                channel_id  BIGINT,
-                mensagem    TEXT NOT NULL,
-                dispara_em  TIMESTAMPTZ NOT NULL,
-                disparado   BOOLEAN DEFAULT FALSE
-            );
-            -- Coluna para canal de membro counter e aniversário
-            ALTER TABLE guild_config ADD COLUMN IF NOT EXISTS counter_channel BIGINT;
-            ALTER TABLE guild_config ADD COLUMN IF NOT EXISTS aniv_channel    BIGINT;
-            ALTER TABLE guild_config ADD COLUMN IF NOT EXISTS logs_channel    BIGINT;
-        """)
+
+_ANIV_HORA        = 9    # hora local do servidor em que os parabéns são enviados
+_ANIV_CONCORRENCIA = 5    # envios simultâneos de parabéns
+
+# Discord permite 2 renomeações de canal a cada 10 minutos
+_CONTADOR_JANELA = 600
+_CONTADOR_LIMITE = 2
+_CONTADOR_ESPERA = 5      # agrupa rajadas de entradas/saídas antes de renomear
+
+_LEMB_JANELA       = 500                   # prazos mantidos no heap em memória
+_LEMB_CONCORRENCIA = 10                    # entregas simultâneas
+_LEMB_BACKOFF      = (60, 5 * 60, 30 * 60)  # espera entre tentativas; esgotou → falhou
+_LEMB_REPETICAO    = {"hora": 3600, "dia": 86400, "semana": 7 * 86400}
+
+
+class _CidadeNaoEncontrada(Exception):
+    pass
+
+
+def _fuso(nome: str | None) -> ZoneInfo | timezone:
+    if nome:
+        try:
+            return ZoneInfo(nome)
+        except (ZoneInfoNotFoundError, ValueError):
+            pass
+    return timezone.utc
+
+
+class MotorLembretes:
+    """Entrega de lembretes com timers exatos.
+
+    Mantém em memória um min-heap com os próximos prazos pendentes (até
+    _LEMB_JANELA); o resto fica no banco, acessado pelo índice parcial de
+    pendentes, e é recarregado quando a janela esvazia. O lembrete só deixa
+    de ser pendente depois da entrega (ou de esgotar as tentativas).
+    """
+
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+        self._heap:   list[tuple[datetime, int]] = []
+        self._agenda: dict[int, dict] = {}          # id → linha pendente carregada
+        self._limite: datetime | None = None        # prazos depois disso ainda estão só no banco
+        self._acordar = asyncio.Event()
+        self._sem     = asyncio.Semaphore(_LEMB_CONCORRENCIA)
+        self._task: asyncio.Task | None = None
+        self._entregas: set[asyncio.Task] = set()
+
+    @property
+    def ativo(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def iniciar(self):
+        self._task = asyncio.create_task(self._executar())
+
+    def parar(self):
+        if self._task:
+            self._task.cancel()
+        self._heap, self._agenda, self._limite = [], {}, None
+
+    async def _recarregar(self):
+        async with get_pool().acquire() as conn:
+            rows = await conn.fetch(
+                "SELECT * FROM lembretes WHERE disparado=FALSE ORDER BY dispara_em LIMIT $1",
+                _LEMB_JANELA,
+            )
+        em_entrega = {rid for rid, row in self._agenda.items() if row.get("_entregando")}
+        self._agenda = {rid: self._agenda[rid] for rid in em_entrega}
+        for r in rows:
+            if r["id"] not in em_entrega:
+                self._agenda[r["id"]] = dict(r)
+        self._heap = [(row["dispara_em"], rid) for rid, row in self._agenda.items() if rid not in em_entrega]
+        heapq.heapify(self._heap)
+        self._limite = rows[-1]["dispara_em"] if len(rows) >= _LEMB_JANELA else None
+
+    def agendar(self, row: dict):
+        """Coloca um lembrete (novo ou reagendado) no heap, se couber na janela."""
+        if self._limite is not None and row["dispara_em"] > self._limite:
+            self._agenda.pop(row["id"], None)
+            return
+        self._agenda[row["id"]] = row
+        heapq.heappush(self._heap, (row["dispara_em"], row["id"]))
+        self._acordar.set()
+
+    def cancelar(self, lembrete_id: int):
+        self._agenda.pop(lembrete_id, None)   # a entrada no heap é descartada ao sair
+
+    async def _executar(self):
+        await self.bot.wait_until_ready()
+        while True:
+            try:
+                await self._recarregar()
+                await self._laco()
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                log.error(f"[LEMBRETE] Erro no agendador: {exc}", exc_info=True)
+                await asyncio.sleep(30)
+
+    async def _laco(self):
+        while True:
+            agora = datetime.now(tz=timezone.utc)
+            while self._heap and self._heap[0][0] <= agora:
+                prazo, rid = heapq.heappop(self._heap)
+                row = self._agenda.get(rid)
+                if not row or row["dispara_em"] != prazo or row.get("_entregando"):
+                    continue
+                row["_entregando"] = True
+                task = asyncio.create_task(self._entregar(row))
+                self._entregas.add(task)
+                task.add_done_callback(self._entregas.discard)
+
+            if not self._heap and self._limite is not None:
+                await self._recarregar()
+                continue
+
+            espera = (self._heap[0][0] - agora).total_seconds() if self._heap else None
+            self._acordar.clear()
+            try:
+                await asyncio.wait_for(self._acordar.wait(), timeout=espera)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _enviar(self, row: dict):
+        user = self.bot.get_user(row["user_id"]) or await self.bot.fetch_user(row["user_id"])
+        emb = discord.Embed(
+            title=f"{E.GHOST} Lembrete! {E.BULB}",
+            description=row["mensagem"],
+            color=Colors.MAIN,
+        )
+        emb.set_footer(text="Lembrete recorrente" if row.get("intervalo_secs") else "Lembrete programado por você")
+        emb.timestamp = _now()
+        # Tenta enviar no canal original, senão DM
+        if row["channel_id"]:
+            # No cluster o canal pode ser de um shard de outro processo: envia via REST
+            ch = self.bot.get_channel(row["channel_id"]) or self.bot.get_partial_messageable(row["channel_id"])
+            if isinstance(ch, (discord.TextChannel, discord.PartialMessageable)):
+                try:
+                    await ch.send(content=f"{user.mention} 🔔", embed=emb)
+                    return
+                except discord.HTTPException:
+                    pass
+        await user.send(embed=emb)
+
+    async def _entregar(self, row: dict):
+        async with self._sem:
+            try:
+                await self._enviar(row)
+                erro = None
+            except discord.NotFound as exc:
+                erro, row["tentativas"] = str(exc), len(_LEMB_BACKOFF)   # usuário não existe: sem retry
+            except Exception as exc:
+                erro = str(exc) or type(exc).__name__
+
+        agora = datetime.now(tz=timezone.utc)
+        rid   = row["id"]
+        if erro is None and row.get("intervalo_secs"):
+            # Recorrente: próximo prazo futuro, pulando os perdidos
+            passo   = timedelta(seconds=row["intervalo_secs"])
+            proximo = row["dispara_em"] + passo
+            while proximo <= agora:
+                proximo += passo
+            query = ("UPDATE lembretes SET dispara_em=$2, status='entregue', tentativas=0, ultimo_erro=NULL "
+                     "WHERE id=$1 AND disparado=FALSE RETURNING *")
+            args  = (rid, proximo)
+        elif erro is None:
+            query = "UPDATE lembretes SET disparado=TRUE, status='entregue' WHERE id=$1 RETURNING *"
+            args  = (rid,)
+        elif (row.get("tentativas") or 0) < len(_LEMB_BACKOFF):
+            novo = agora + timedelta(seconds=_LEMB_BACKOFF[row.get("tentativas") or 0])
+            query = ("UPDATE lembretes SET dispara_em=$2, tentativas=tentativas+1, status='erro', ultimo_erro=$3 "
+                     "WHERE id=$1 AND disparado=FALSE RETURNING *")
+            args  = (rid, novo, erro[:500])
+        else:
+            log.warning(f"[LEMBRETE] #{rid} falhou após {len(_LEMB_BACKOFF)} tentativa(s): {erro}")
+            query = "UPDATE lembretes SET disparado=TRUE, status='falhou', ultimo_erro=$2 WHERE id=$1 RETURNING *"
+            args  = (rid, erro[:500])
+
+        try:
+            async with get_pool().acquire() as conn:
+                nova = await conn.fetchrow(query, *args)
+        except Exception as exc:
+            log.error(f"[LEMBRETE] Falha ao atualizar #{rid}: {exc}")
+            nova = None
+        finally:
+            self._agenda.pop(rid, None)
+        if nova and not nova["disparado"]:
+            self.agendar(dict(nova))
 
 
 class Utilidades2(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
+        # guild_id → (canal de parabéns, fuso) dos servidores com aniversário configurado
+        self._aniv_cfg: dict[int, tuple[int, ZoneInfo | timezone]] = {}
+        # (mes, dia) → aniversariantes; válido só para as datas locais em andamento
+        self._aniv_dia: dict[tuple[int, int], frozenset[int]] = {}
+        self._aniv_feitos: set[tuple[int, date]] = set()   # (guild, data) já resolvidos neste processo
+        self._aniv_purga: date | None = None
+        self._aniv_sem = asyncio.Semaphore(_ANIV_CONCORRENCIA)
+        # guild_id → canal de voz do contador
+        self._contadores: dict[int, int] = {}
+        self._renomeacoes: dict[int, deque[float]] = {}   # channel_id → horários das últimas renomeações
+        self._contador_tasks: dict[int, asyncio.Task] = {}
+        self.lembretes = MotorLembretes(bot)
 
     async def cog_load(self):
-        await _ensure_tables()
-        self.atualizar_contador.start()
+        async with get_pool().acquire() as conn:
+            rows = await conn.fetch("""
+                SELECT guild_id, aniv_channel, aniv_tz, counter_channel FROM guild_config
+                WHERE aniv_channel IS NOT NULL OR counter_channel IS NOT NULL
+            """)
+        self._aniv_cfg = {
+            r["guild_id"]: (r["aniv_channel"], _fuso(r["aniv_tz"])) for r in rows if r["aniv_channel"]
+        }
+        self._contadores = {r["guild_id"]: r["counter_channel"] for r in rows if r["counter_channel"]}
+        asyncio.create_task(self._sincronizar_contadores())
         self.checar_aniversarios.start()
-        self.checar_lembretes.start()
+        # Só um processo do cluster entrega lembretes; os outros avisam o líder por IPC
+        self.bot.cluster.registrar("lembrete", self._ipc_lembrete)
+        self.bot.cluster.singleton("lembretes", self.lembretes.iniciar, self.lembretes.parar)
 
     def cog_unload(self):
-        self.atualizar_contador.cancel()
+        for task in self._contador_tasks.values():
+            task.cancel()
         self.checar_aniversarios.cancel()
-        self.checar_lembretes.cancel()
+        self.bot.cluster.liberar("lembretes")
+
+    async def _lembrete_alterado(self, lembrete_id: int, row: dict | None = None):
+        """Repassa um lembrete criado (row) ou cancelado (sem row) ao motor ativo."""
+        if self.lembretes.ativo:
+            if row is None:
+                self.lembretes.cancelar(lembrete_id)
+            else:
+                self.lembretes.agendar(row)
+            return
+        try:
+            await self.bot.cluster.publicar("lembrete", {"id": lembrete_id, "cancelar": row is None})
+        except Exception as exc:
+            log.error(f"[LEMBRETE] Falha ao avisar o líder sobre #{lembrete_id}: {exc}")
+
+    async def _ipc_lembrete(self, dados: dict):
+        if not self.lembretes.ativo:
+            return
+        if dados["cancelar"]:
+            self.lembretes.cancelar(dados["id"])
+            return
+        async with get_pool().acquire() as conn:
+            row = await conn.fetchrow("SELECT * FROM lembretes WHERE id=$1 AND disparado=FALSE", dados["id"])
+        if row:
+            self.lembretes.agendar(dict(row))
 
     # ── Contador de membros ────────────────────────────────────────────────
 
-    @tasks.loop(minutes=10)
-    async def atualizar_contador(self):
-        for guild in self.bot.guilds:
-            cfg = await get_guild_config(guild.id)
-            ch_id = cfg.get("counter_channel")
-            if not ch_id:
-                continue
-            ch = guild.get_channel(ch_id)
-            if not isinstance(ch, discord.VoiceChannel):
-                continue
-            nome_novo = f"👥 Membros: {guild.member_count:,}"
-            if ch.name != nome_novo:
-                try:
-                    await ch.edit(name=nome_novo, reason="Contador de membros")
-                except discord.HTTPException:
-                    pass
+    @staticmethod
+    def _nome_contador(guild: discord.Guild) -> str:
+        return f"👥 Membros: {guild.member_count:,}"
+
+    def _agendar_contador(self, guild: discord.Guild):
+        """Agenda a renomeação do contador respeitando o limite de 2 por 10 min do canal."""
+        ch_id = self._contadores.get(guild.id)
+        if not ch_id:
+            return
+        pendente = self._contador_tasks.get(guild.id)
+        if pendente and not pendente.done():
+            return   # a renomeação já agendada lerá a contagem atualizada
+        historico = self._renomeacoes.setdefault(ch_id, deque(maxlen=_CONTADOR_LIMITE))
+        espera = _CONTADOR_ESPERA
+        if len(historico) >= _CONTADOR_LIMITE:
+            espera = max(espera, historico[0] + _CONTADOR_JANELA - time.monotonic())
+        self._contador_tasks[guild.id] = asyncio.create_task(self._renomear_contador(guild.id, espera))
+
+    async def _renomear_contador(self, guild_id: int, espera: float):
+        await asyncio.sleep(espera)
+        guild = self.bot.get_guild(guild_id)
+        ch_id = self._contadores.get(guild_id)
+        ch = guild.get_channel(ch_id) if guild and ch_id else None
+        if not isinstance(ch, discord.VoiceChannel):
+            return
+        nome_novo = self._nome_contador(guild)
+        if ch.name == nome_novo:
+            return
+        try:
+            await ch.edit(name=nome_novo, reason="Contador de membros")
+            self._renomeacoes.setdefault(ch.id, deque(maxlen=_CONTADOR_LIMITE)).append(time.monotonic())
+        except discord.HTTPException as exc:
+            log.debug(f"[CONTADOR] Falha ao renomear {ch.id}: {exc}")
 
-    @atualizar_contador.before_loop
-    async def before_counter(self):
+    async def _sincronizar_contadores(self):
+        # Corrige contagens que mudaram enquanto o bot estava offline
         await self.bot.wait_until_ready()
+        for guild_id in list(self._contadores):
+            if not self.bot.owns_guild(guild_id):
+                continue
+            guild = self.bot.get_guild(guild_id)
+            if guild:
+                self._agendar_contador(guild)
+
+    @commands.Cog.listener()
+    async def on_member_join(self, member: discord.Member):
+        if member.guild.id in self._contadores:
+            self._agendar_contador(member.guild)
+
+    @commands.Cog.listener()
+    async def on_member_remove(self, member: discord.Member):
+        if member.guild.id in self._contadores:
+            self._agendar_contador(member.guild)
+
+    # ── Checar aniversários (9h no fuso de cada servidor) ──────────────────
+
+    async def _aniversariantes(self, hoje: date) -> frozenset[int]:
+        """Aniversariantes de uma data; uma query indexada por data distinta."""
+        chave = (hoje.month, hoje.day)
+        if chave not in self._aniv_dia:
+            dias = [hoje.day]
+            # 29/02 comemora em 28/02 nos anos não bissextos
+            if chave == (2, 28) and not calendar.isleap(hoje.year):
+                dias.append(29)
+            async with get_pool().acquire() as conn:
+                rows = await conn.fetch(
+                    "SELECT user_id FROM aniversarios WHERE mes=$1 AND dia = ANY($2::int[])",
+                    hoje.month, dias,
+                )
+            self._aniv_dia[chave] = frozenset(r["user_id"] for r in rows)
+        return self._aniv_dia[chave]
 
-    # ── Checar aniversários (diário às 9h UTC) ─────────────────────────────
+    async def _parabenizar(self, ch: discord.TextChannel, member: discord.Member) -> bool:
+        emb = discord.Embed(
+            title=f"{E.BEAR} Feliz Aniversário, {member.display_name}! 🎂",
+            description=(
+                f"{E.HEARTS_S} Hoje é o grande dia de {member.mention}!\n\n"
+                f"{E.SPARKLE} O servidor inteiro deseja a você um ótimo dia!\n"
+                f"{E.CROWN_PINK} Parabéns! 🎉🎊"
+            ),
+            color=0xFF69B4,
+        )
+        emb.set_thumbnail(url=member.display_avatar.url)
+        emb.timestamp = _now()
+        async with self._aniv_sem:
+            try:
+                await ch.send(content=member.mention, embed=emb)
+            except discord.HTTPException:
+                return False
+        return True
 
-    @tasks.loop(hours=1)
+    @tasks.loop(minutes=5)
     async def checar_aniversarios(self):
         agora = datetime.now(tz=timezone.utc)
-        if agora.hour != 9:
-            return
-        for guild in self.bot.guilds:
-            cfg = await get_guild_config(guild.id)
-            ch_id = cfg.get("aniv_channel")
-            if not ch_id:
+
+        # Servidores deste processo cuja hora local já passou das 9h, agrupados por data
+        # local — reservar servidores de outro shard impediria o dono de enviar.
+        pendentes: dict[int, date] = {}
+        for guild_id, (_, tz) in self._aniv_cfg.items():
+            if not self.bot.owns_guild(guild_id):
+                continue
+            local = agora.astimezone(tz)
+            if local.hour >= _ANIV_HORA:
+                pendentes[guild_id] = local.date()
+        datas_ativas = {(d.month, d.day) for d in pendentes.values()}
+        for chave in [c for c in self._aniv_dia if c not in datas_ativas]:
+            del self._aniv_dia[chave]
+        datas = set(pendentes.values())
+        self._aniv_feitos = {f for f in self._aniv_feitos if f[1] in datas}
+        await self._purgar_aniv_enviados(agora.date())
+
+        # Só reserva servidores que têm canal válido e algum aniversariante hoje
+        envios: dict[int, list] = {}
+        for guild_id, hoje in pendentes.items():
+            if (guild_id, hoje) in self._aniv_feitos:
                 continue
-            ch = guild.get_channel(ch_id)
+            guild = self.bot.get_guild(guild_id)
+            ch    = guild.get_channel(self._aniv_cfg[guild_id][0]) if guild else None
             if not isinstance(ch, discord.TextChannel):
                 continue
-            async with get_pool().acquire() as conn:
-                rows = await conn.fetch(
-                    "SELECT user_id FROM aniversarios WHERE dia=$1 AND mes=$2",
-                    agora.day, agora.month,
-                )
-            for row in rows:
-                member = guild.get_member(row["user_id"])
-                if not member:
-                    continue
-                emb = discord.Embed(
-                    title=f"{E.BEAR} Feliz Aniversário, {member.display_name}! 🎂",
-                    description=(
-                        f"{E.HEARTS_S} Hoje é o grande dia de {member.mention}!\n\n"
-                        f"{E.SPARKLE} O servidor inteiro deseja a você um ótimo dia!\n"
-                        f"{E.CROWN_PINK} Parabéns! 🎉🎊"
-                    ),
-                    color=0xFF69B4,
-                )
-                emb.set_thumbnail(url=member.display_avatar.url)
-                emb.timestamp = _now()
-                try:
-                    await ch.send(content=member.mention, embed=emb)
-                except discord.HTTPException:
-                    pass
-
-    @checar_aniversarios.before_loop
-    async def before_aniv(self):
-        await self.bot.wait_until_ready()
+            membros = [m for uid in await self._aniversariantes(hoje) if (m := guild.get_member(uid))]
+            if membros:
+                    envios[guild_id] = [(ch, m) for m in membros]
+        if not envios:
+            return
 
-    # ── Checar lembretes ───────────────────────────────────────────────────
+        # Reserva (guild, data) de uma vez — quem já recebeu hoje (outro processo) fica de fora
+        async with get_pool().acquire() as conn:
+            rows = await conn.fetch("""
+                INSERT INTO aniversarios_enviados (guild_id, data)
+                SELECT * FROM unnest($1::bigint[], $2::date[])
+                ON CONFLICT DO NOTHING
+                RETURNING guild_id
+            """, list(envios), [pendentes[gid] for gid in envios])
+        self._aniv_feitos.update((gid, pendentes[gid]) for gid in envios)
+        reservados = {r["guild_id"] for r in rows}
+        envios = {gid: [self._parabenizar(ch, m) for ch, m in alvos]
+                  for gid, alvos in envios.items() if gid in reservados}
+        if not envios:
+            return
 
-    @tasks.loop(seconds=30)
-    async def checar_lembretes(self):
-        agora = datetime.now(tz=timezone.utc)
+        resultados = await asyncio.gather(*(asyncio.gather(*c) for c in envios.values()))
+        # Nenhum envio deu certo no servidor: libera a reserva para tentar no próximo ciclo.
+        # Com sucesso parcial a reserva fica, para não repetir os parabéns já enviados.
+        falhos = [gid for gid, oks in zip(envios, resultados) if not any(oks)]
+        if falhos:
+            async with get_pool().acquire() as conn:
+                await conn.execute("""
+                    DELETE FROM aniversarios_enviados e
+                    USING unnest($1::bigint[], $2::date[]) AS f(guild_id, data)
+                    WHERE e.guild_id = f.guild_id AND e.data = f.data
+                """, falhos, [pendentes[gid] for gid in falhos])
+            self._aniv_feitos.difference_update((gid, pendentes[gid]) for gid in falhos)
+            log.warning(f"[ANIV] Envio falhou em {len(falhos)} servidor(es); nova tentativa no próximo ciclo")
+        enviados = sum(sum(oks) for oks in resultados)
+        log.info(f"[ANIV] {enviados} parabéns enviado(s) em {len(envios) - len(falhos)} servidor(es)")
+
+    async def _purgar_aniv_enviados(self, hoje: date):
+        """Reservas só importam no dia (em algum fuso): apaga as antigas uma vez por dia."""
+        if self._aniv_purga == hoje:
+            return
+        self._aniv_purga = hoje
         async with get_pool().acquire() as conn:
-            rows = await conn.fetch(
-                "SELECT * FROM lembretes WHERE disparado=FALSE AND dispara_em <= $1", agora
-            )
-            if rows:
-                await conn.execute(
-                    "UPDATE lembretes SET disparado=TRUE WHERE id = ANY($1::int[])",
-                    [r["id"] for r in rows],
-                )
-        for row in rows:
-            user = self.bot.get_user(row["user_id"])
-            if not user:
-                continue
-            emb = discord.Embed(
-                title=f"{E.GHOST} Lembrete! {E.BULB}",
-                description=row["mensagem"],
-                color=Colors.MAIN,
+            await conn.execute(
+                "DELETE FROM aniversarios_enviados WHERE data < $1::date - 3", hoje
             )
-            emb.set_footer(text="Lembrete programado por você")
-            emb.timestamp = _now()
-            # Tenta enviar no canal original, senão DM
-            if row["channel_id"]:
-                ch = self.bot.get_channel(row["channel_id"])
-                if isinstance(ch, discord.TextChannel):
-                    try:
-                        await ch.send(content=f"{user.mention} 🔔", embed=emb)
-                        continue
-                    except Exception:
-                        pass
-            try:
-                await user.send(embed=emb)
-            except Exception:
-                pass
 
-    @checar_lembretes.before_loop
-    async def before_lemb(self):
+    @checar_aniversarios.before_loop
+    async def before_aniv(self):
         await self.bot.wait_until_ready()
 
     # ── Slash commands ─────────────────────────────────────────────────────
@@ -183,15 +467,17 @@ class Utilidades2(commands.Cog):
     @app_commands.describe(canal="Canal de voz (será renomeado automaticamente)")
     async def counter_setup(self, inter: discord.Interaction, canal: discord.VoiceChannel):
         await upsert_guild_config(inter.guild.id, counter_channel=canal.id)
-        nome = f"👥 Membros: {inter.guild.member_count:,}"
+        self._contadores[inter.guild.id] = canal.id
+        nome = self._nome_contador(inter.guild)
         try:
             await canal.edit(name=nome)
+            self._renomeacoes.setdefault(canal.id, deque(maxlen=_CONTADOR_LIMITE)).append(time.monotonic())
         except discord.HTTPException:
             pass
         await inter.response.send_message(
             embed=success_embed("Contador configurado!",
                 f"{E.ARROW_BLUE} {canal.mention} mostrará a contagem de membros.\n"
-                f"{E.SYMBOL} Atualiza a cada 10 minutos."
+                f"{E.SYMBOL} Atualiza quando membros entram ou saem (até 2x a cada 10 minutos)."
             ),
             ephemeral=True,
         )
@@ -199,6 +485,10 @@ class Utilidades2(commands.Cog):
     @counter_group.command(name="desativar", description="Desativa o contador de membros")
     async def counter_off(self, inter: discord.Interaction):
         await upsert_guild_config(inter.guild.id, counter_channel=None)
+        self._contadores.pop(inter.guild.id, None)
+        task = self._contador_tasks.pop(inter.guild.id, None)
+        if task:
+            task.cancel()
         await inter.response.send_message(
             embed=success_embed("Contador desativado", "O contador de membros foi desativado."),
             ephemeral=True,
@@ -230,13 +520,24 @@ class Utilidades2(commands.Cog):
         )
 
     @aniv_group.command(name="setup", description="[Admin] Define o canal de parabéns")
-    @app_commands.describe(canal="Canal onde o bot parabenizará os aniversariantes")
+    @app_commands.describe(
+        canal="Canal onde o bot parabenizará os aniversariantes",
+        fuso="Fuso horário do servidor (ex: America/Sao_Paulo; padrão: UTC)",
+    )
     @app_commands.default_permissions(manage_guild=True)
-    async def aniv_setup(self, inter: discord.Interaction, canal: discord.TextChannel):
-        await upsert_guild_config(inter.guild.id, aniv_channel=canal.id)
+    async def aniv_setup(self, inter: discord.Interaction, canal: discord.TextChannel, fuso: str = "UTC"):
+        try:
+            tz = ZoneInfo(fuso)
+        except (ZoneInfoNotFoundError, ValueError):
+            return await inter.response.send_message(
+                embed=error_embed("Fuso inválido", f"`{fuso}` não é um fuso IANA válido (ex: `America/Sao_Paulo`)."),
+                ephemeral=True,
+            )
+        await upsert_guild_config(inter.guild.id, aniv_channel=canal.id, aniv_tz=fuso)
+        self._aniv_cfg[inter.guild.id] = (canal.id, tz)
         await inter.response.send_message(
             embed=success_embed("Canal de aniversário definido!",
-                f"{E.ARROW_BLUE} Parabéns serão enviados em {canal.mention} às 9h UTC."
+                f"{E.ARROW_BLUE} Parabéns serão enviados em {canal.mention} às {_ANIV_HORA}h ({fuso})."
             ),
             ephemeral=True,
         )
@@ -269,10 +570,17 @@ class Utilidades2(commands.Cog):
         quando="Quando lembrar: ex. 30m, 2h, 1d",
         mensagem="O que lembrar",
         canal="Enviar neste canal (padrão: DM)",
+        repetir="Repetir o lembrete periodicamente",
     )
+    @app_commands.choices(repetir=[
+        app_commands.Choice(name="A cada hora",  value="hora"),
+        app_commands.Choice(name="Todo dia",     value="dia"),
+        app_commands.Choice(name="Toda semana",  value="semana"),
+    ])
     async def lembrar(self, inter: discord.Interaction,
                        quando: str, mensagem: str,
-                       canal: discord.TextChannel = None):
+                       canal: discord.TextChannel = None,
+                       repetir: str = None):
         unidades = {"s": 1, "m": 60, "h": 3600, "d": 86400}
         try:
             secs = int(quando[:-1]) * unidades[quando[-1].lower()]
@@ -286,26 +594,72 @@ class Utilidades2(commands.Cog):
             )
         dispara_em = datetime.now(tz=timezone.utc) + timedelta(seconds=secs)
         async with get_pool().acquire() as conn:
-            await conn.execute("""
-                INSERT INTO lembretes (user_id, guild_id, channel_id, mensagem, dispara_em)
-                VALUES ($1,$2,$3,$4,$5)
+            row = await conn.fetchrow("""
+                INSERT INTO lembretes (user_id, guild_id, channel_id, mensagem, dispara_em, intervalo_secs)
+                VALUES ($1,$2,$3,$4,$5,$6)
+                RETURNING *
             """,
                 inter.user.id,
                 inter.guild.id if inter.guild else None,
                 canal.id if canal else None,
                 mensagem,
                 dispara_em,
+                _LEMB_REPETICAO.get(repetir),
             )
+        await self._lembrete_alterado(row["id"], dict(row))
         destino = canal.mention if canal else "sua DM"
         await inter.response.send_message(
             embed=success_embed("Lembrete criado!",
                 f"{E.BULB} Vou te lembrar {discord.utils.format_dt(dispara_em, 'R')}.\n"
                 f"{E.ARROW_BLUE} Destino: {destino}\n"
-                f"{E.SYMBOL} Mensagem: *{mensagem[:100]}*"
+                + (f"{E.LOADING} Repete: a cada {repetir}\n" if repetir else "")
+                + f"{E.SYMBOL} Mensagem: *{mensagem[:100]}*\n"
+                f"{E.PIN} ID: `{row['id']}` · `/lembretes cancelar:{row['id']}`"
             ),
             ephemeral=True,
         )
 
+    @app_commands.command(name="lembretes", description="Lista ou cancela seus lembretes pendentes")
+    @app_commands.describe(cancelar="ID do lembrete a cancelar")
+    async def lembretes_cmd(self, inter: discord.Interaction, cancelar: int = None):
+        if cancelar is not None:
+            async with get_pool().acquire() as conn:
+                ok = await conn.fetchval("""
+                    UPDATE lembretes SET disparado=TRUE, status='cancelado'
+                    WHERE id=$1 AND user_id=$2 AND disparado=FALSE
+                    RETURNING id
+                """, cancelar, inter.user.id)
+            if not ok:
+                return await inter.response.send_message(
+                    embed=error_embed("Não encontrado", f"Nenhum lembrete pendente seu com ID `{cancelar}`."),
+                    ephemeral=True,
+                )
+            await self._lembrete_alterado(cancelar)
+            return await inter.response.send_message(
+                embed=success_embed("Lembrete cancelado", f"O lembrete `{cancelar}` foi cancelado."),
+                ephemeral=True,
+            )
+
+        async with get_pool().acquire() as conn:
+            rows = await conn.fetch("""
+                SELECT id, mensagem, dispara_em, intervalo_secs FROM lembretes
+                WHERE user_id=$1 AND disparado=FALSE ORDER BY dispara_em LIMIT 15
+            """, inter.user.id)
+        if not rows:
+            return await inter.response.send_message(
+                embed=error_embed("Sem lembretes", "Você não tem lembretes pendentes."), ephemeral=True
+            )
+        emb = discord.Embed(title=f"{E.BULB} Seus lembretes", color=Colors.MAIN)
+        for r in rows:
+            repete = " · 🔁" if r["intervalo_secs"] else ""
+            emb.add_field(
+                name=f"`{r['id']}` · {discord.utils.format_dt(r['dispara_em'], 'R')}{repete}",
+                value=r["mensagem"][:100],
+                inline=False,
+            )
+        emb.set_footer(text="Use /lembretes cancelar:<ID> para cancelar")
+        await inter.response.send_message(embed=emb, ephemeral=True)
+
     # Clima
     @app_commands.command(name="clima", description="Consulta o clima de uma cidade")
     @app_commands.describe(cidade="Nome da cidade (ex: São Paulo, BR)")
@@ -318,17 +672,24 @@ class Utilidades2(commands.Cog):
                 embed=error_embed("Sem chave de API", "Configure a variável `OPENWEATHER_API_KEY` no Railway."),
                 ephemeral=True,
             )
-        url = f"https://api.openweathermap.org/data/2.5/weather?q={cidade}&appid={api_key}&units=metric&lang=pt_br"
+        async def buscar():
+            async with self.bot.http_client.get(
+                "https://api.openweathermap.org/data/2.5/weather",
+                params={"q": cidade, "appid": api_key, "units": "metric", "lang": "pt_br"},
+                timeout=aiohttp.ClientTimeout(total=8),
+            ) as resp:
+                if resp.status == 404:
+                    raise _CidadeNaoEncontrada
+                if resp.status != 200:
+                    raise ValueError(f"HTTP {resp.status}")
+                return await resp.json()
+
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, timeout=aiohttp.ClientTimeout(total=8)) as resp:
-                    if resp.status == 404:
-                        return await inter.followup.send(
-                            embed=error_embed("Cidade não encontrada", f"Não encontrei `{cidade}`."), ephemeral=True
-                        )
-                    if resp.status != 200:
-                        raise ValueError(f"HTTP {resp.status}")
-                    data = await resp.json()
+            data = await _CACHE_CLIMA.obter(cidade.strip().casefold(), buscar)
+        except _CidadeNaoEncontrada:
+            return await inter.followup.send(
+                embed=error_embed("Cidade não encontrada", f"Não encontrei `{cidade}`."), ephemeral=True
+            )
         except Exception as exc:
             return await inter.followup.send(
                 embed=error_embed("Erro", f"Não foi possível consultar o clima.\n`{exc}`"), ephemeral=True
@@ -367,20 +728,32 @@ class Utilidades2(commands.Cog):
     async def traduzir(self, inter: discord.Interaction, texto: str, idioma: str = "pt"):
         await inter.response.defer(ephemeral=True)
         # Usa a API MyMemory (gratuita, sem chave)
-        url = f"https://api.mymemory.translated.net/get?q={texto}&langpair=auto|{idioma}"
+        async def buscar():
+            async with self.bot.http_client.get(
+                "https://api.mymemory.translated.net/get",
+                params={"q": texto, "langpair": f"auto|{idioma}"},
+                timeout=aiohttp.ClientTimeout(total=8),
+            ) as resp:
+                data = await resp.json()
+            traducao = data.get("responseData", {}).get("translatedText", "")
+            # Erros (cota, idioma inválido) vêm com status != 200 e a mensagem em translatedText;
+            # levantar evita que entrem no cache como se fossem tradução
+            if str(data.get("responseStatus")) != "200":
+                raise ValueError(data.get("responseDetails") or traducao or "erro da API")
+            if not traducao:
+                raise ValueError("resposta vazia")
+            return traducao
+
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, timeout=aiohttp.ClientTimeout(total=8)) as resp:
-                    data = await resp.json()
-        except Exception as exc:
+            traducao = await _CACHE_TRADUCAO.obter((texto, idioma.strip().lower()), buscar)
+        except ValueError as exc:
             return await inter.followup.send(
-                embed=error_embed("Erro de conexão", str(exc)), ephemeral=True
+                embed=error_embed("Erro", f"Não foi possível traduzir o texto.\n`{str(exc)[:200]}`"),
+                ephemeral=True,
             )
-
-        traducao = data.get("responseData", {}).get("translatedText", "")
-        if not traducao:
+        except Exception as exc:
             return await inter.followup.send(
-                embed=error_embed("Erro", "Não foi possível traduzir o texto."), ephemeral=True
+                embed=error_embed("Erro de conexão", str(exc)), ephemeral=True
             )
 
         emb = discord.Embed(title=f"{E.WAND} Tradução", color=Colors.MAIN)
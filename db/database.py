@@ -11,104 +11,129 @@ import os
 import json
 from typing import Any
 
+from db.pool import ConfigPool, PoolInstrumentado
+from db.schema import aplicar_migracoes
+
 log = logging.getLogger("multibot.db")
 
-_pool: asyncpg.Pool | None = None
+_pool: PoolInstrumentado | None = None
+_modo: str = "pooler"
+
+# ── Modo de acesso ────────────────────────────────────────────────────────────
+# DB_MODE=direct  → conexão direta ao Postgres: cache de statements do asyncpg e
+#                   prepared statements explícitos nas queries quentes.
+# DB_MODE=pooler  → (padrão) atrás de um pooler em modo transação (PgBouncer,
+#                   Supavisor): sem statements preparados, que não sobrevivem à
+#                   troca de backend.
+# Não há detecção automática: um PgBouncer ocioso devolve quase sempre o mesmo
+# backend, então sondar não distingue os casos, e errar para "direct" quebra
+# com "prepared statement does not exist" sob carga. O modo direto é opt-in.
+
+
+class ConexaoBot(asyncpg.Connection):
+    """Conexão com os prepared statements das queries quentes (modo direct)."""
+    __slots__ = ("preparadas",)
 
 
-async def init_pool() -> asyncpg.Pool:
-    """Inicializa o pool de conexões e cria as tabelas se não existirem."""
-    global _pool
+async def _init_conexao(conn: ConexaoBot):
+    conn.preparadas = {}
+
+
+async def init_pool() -> PoolInstrumentado:
+    """Inicializa o pool de conexões e aplica as migrações pendentes do schema."""
+    global _pool, _modo
     dsn = os.environ.get("DATABASE_URL")
     if not dsn:
         raise RuntimeError("Variável DATABASE_URL não definida.")
 
-    _pool = await asyncpg.create_pool(
+    modo = os.environ.get("DB_MODE", "pooler").lower()
+    if modo not in ("direct", "pooler"):
+        log.warning(f"[DB] DB_MODE={modo!r} desconhecido; usando pooler.")
+        modo = "pooler"
+    _modo = modo
+
+    if modo == "direct":
+        opcoes = dict(connection_class=ConexaoBot, init=_init_conexao)
+    else:
+        opcoes = dict(statement_cache_size=0)
+    # O pool real vai até o teto; o PoolInstrumentado controla o limite efetivo
+    config = ConfigPool.do_ambiente()
+    bruto = await asyncpg.create_pool(
         dsn,
-        min_size=2,
-        max_size=10,
+        min_size=config.minimo,
+        max_size=config.teto,
         command_timeout=30,
-        statement_cache_size=0,   # necessário para algumas configs do Railway
+        **opcoes,
     )
-    log.info("[DB] Pool criado com sucesso.")
-    await _create_tables()
+    _pool = PoolInstrumentado(bruto, config)
+    _pool.iniciar()
+    log.info(f"[DB] Pool criado (modo {modo}: "
+             f"{'statements preparados' if modo == 'direct' else 'sem cache de statements'}; "
+             f"{config.minimo}–{config.maximo} conexões, teto {config.teto}).")
+    await aplicar_migracoes(_pool)
     return _pool
 
 
-def get_pool() -> asyncpg.Pool:
+def get_db_mode() -> str:
+    return _modo
+
+
+def get_pool() -> PoolInstrumentado:
     if _pool is None:
         raise RuntimeError("Pool não inicializado. Chame init_pool() primeiro.")
     return _pool
 
 
-async def _create_tables():
-    """Cria todas as tabelas necessárias."""
+# ═══════════════════════════════════════════════════
+# QUERIES QUENTES (prepared statements no modo direct)
+# ═══════════════════════════════════════════════════
+
+_QUENTES = {
+    "guild_config": "SELECT * FROM guild_config WHERE guild_id = $1",
+    "get_xp":       "SELECT xp, level FROM xp_data WHERE guild_id=$1 AND user_id=$2",
+    "upsert_xp": """
+        INSERT INTO xp_data (guild_id, user_id, xp, level, updated_at)
+        VALUES ($1, $2, $3, $4, NOW())
+        ON CONFLICT (guild_id, user_id)
+        DO UPDATE SET xp=$3, level=$4, updated_at=NOW()
+    """,
+}
+
+
+async def _quente(conn, nome: str, metodo: str, *args):
+    """Executa uma query quente pelo statement preparado da conexão, se houver.
+
+    O prepare é feito no primeiro uso (depois das migrações, para o plano já ver
+    as colunas novas) e refeito se o schema mudar por baixo dele.
+    """
+    preparadas = getattr(conn, "preparadas", None)
+    if preparadas is None:
+        return await getattr(conn, metodo)(_QUENTES[nome], *args)
+    stmt = preparadas.get(nome)
+    if stmt is None:
+        stmt = preparadas[nome] = await conn.prepare(_QUENTES[nome])
+    try:
+        return await getattr(stmt, metodo)(*args)
+    except asyncpg.exceptions.InvalidCachedStatementError:
+        stmt = preparadas[nome] = await conn.prepare(_QUENTES[nome])
+        return await getattr(stmt, metodo)(*args)
+
+
+# ═══════════════════════════════════════════════════
+# BOT META
+# ═══════════════════════════════════════════════════
+
+async def get_bot_meta(chave: str) -> str | None:
+    async with get_pool().acquire() as conn:
+        return await conn.fetchval("SELECT valor FROM bot_meta WHERE chave=$1", chave)
+
+
+async def set_bot_meta(chave: str, valor: str):
     async with get_pool().acquire() as conn:
         await conn.execute("""
-            -- Configurações gerais por servidor
-            CREATE TABLE IF NOT EXISTS guild_config (
-                guild_id        BIGINT PRIMARY KEY,
-                -- Geral
-                log_channel     BIGINT,
-                -- Tickets
-                ticket_category BIGINT,
-                ticket_log      BIGINT,
-                ticket_banner   TEXT,
-                staff_roles     BIGINT[],
-                -- Boas-vindas
-                welcome_canal   BIGINT,
-                welcome_msg     TEXT,
-                welcome_banner  TEXT,
-                welcome_dm      BOOLEAN DEFAULT FALSE,
-                welcome_cor     INT DEFAULT 5899754,
-                welcome_titulo  TEXT,
-                welcome_rodape  TEXT,
-                -- XP
-                xp_canal        BIGINT,
-                xp_max_level    INT DEFAULT 100,
-                xp_ativo        BOOLEAN DEFAULT TRUE,
-                xp_embed_cor    INT DEFAULT 5899754,
-                xp_embed_banner TEXT,
-                xp_embed_titulo TEXT,
-                xp_embed_rodape TEXT,
-                xp_cargo_nivel  JSONB DEFAULT '{}',
-                -- Timestamps
-                updated_at      TIMESTAMPTZ DEFAULT NOW()
-            );
-
-            -- XP por membro por servidor
-            CREATE TABLE IF NOT EXISTS xp_data (
-                guild_id    BIGINT,
-                user_id     BIGINT,
-                xp          INT DEFAULT 0,
-                level       INT DEFAULT 0,
-                updated_at  TIMESTAMPTZ DEFAULT NOW(),
-                PRIMARY KEY (guild_id, user_id)
-            );
-
-            -- Avisos de moderação
-            CREATE TABLE IF NOT EXISTS warns (
-                id          SERIAL PRIMARY KEY,
-                guild_id    BIGINT NOT NULL,
-                user_id     BIGINT NOT NULL,
-                motivo      TEXT NOT NULL,
-                mod_id      BIGINT NOT NULL,
-                created_at  TIMESTAMPTZ DEFAULT NOW()
-            );
-            CREATE INDEX IF NOT EXISTS warns_guild_user ON warns(guild_id, user_id);
-
-            -- Tickets abertos
-            CREATE TABLE IF NOT EXISTS tickets (
-                channel_id  BIGINT PRIMARY KEY,
-                guild_id    BIGINT NOT NULL,
-                user_id     BIGINT NOT NULL,
-                categoria   TEXT,
-                atendente   BIGINT,
-                created_at  TIMESTAMPTZ DEFAULT NOW()
-            );
-            CREATE INDEX IF NOT EXISTS tickets_guild_user ON tickets(guild_id, user_id);
-        """)
-        log.info("[DB] Tabelas verificadas/criadas.")
+            INSERT INTO bot_meta (chave, valor) VALUES ($1, $2)
+            ON CONFLICT (chave) DO UPDATE SET valor=EXCLUDED.valor, atualizado_em=NOW()
+        """, chave, valor)
 
 
 # ═══════════════════════════════════════════════════
@@ -118,9 +143,7 @@ async def _create_tables():
 async def get_guild_config(guild_id: int) -> dict:
     """Retorna a config do servidor ou um dict com defaults."""
     async with get_pool().acquire() as conn:
-        row = await conn.fetchrow(
-            "SELECT * FROM guild_config WHERE guild_id = $1", guild_id
-        )
+        row = await _quente(conn, "guild_config", "fetchrow", guild_id)
     if row:
         import json
         d = dict(row)
@@ -189,21 +212,13 @@ async def upsert_guild_config(guild_id: int, **fields):
 
 async def get_xp(guild_id: int, user_id: int) -> dict:
     async with get_pool().acquire() as conn:
-        row = await conn.fetchrow(
-            "SELECT xp, level FROM xp_data WHERE guild_id=$1 AND user_id=$2",
-            guild_id, user_id,
-        )
+        row = await _quente(conn, "get_xp", "fetchrow", guild_id, user_id)
     return {"xp": row["xp"], "level": row["level"]} if row else {"xp": 0, "level": 0}
 
 
 async def upsert_xp(guild_id: int, user_id: int, xp: int, level: int):
     async with get_pool().acquire() as conn:
-        await conn.execute("""
-            INSERT INTO xp_data (guild_id, user_id, xp, level, updated_at)
-            VALUES ($1, $2, $3, $4, NOW())
-            ON CONFLICT (guild_id, user_id)
-            DO UPDATE SET xp=$3, level=$4, updated_at=NOW()
-        """, guild_id, user_id, xp, level)
+        await _quente(conn, "upsert_xp", "fetchval", guild_id, user_id, xp, level)
 
 
 async def get_xp_ranking(guild_id: int, limit: int = 10) -> list[dict]:
@@ -299,7 +314,7 @@ async def get_ticket_by_channel(channel_id: int) -> dict | None:
 async def set_ticket_atendente(channel_id: int, user_id: int):
     async with get_pool().acquire() as conn:
         await conn.execute(
-            "UPDATE tickets SET atendente=$1 WHERE channel_id=$2",
+            "UPDATE tickets SET atendente=$1, atendido_em=COALESCE(atendido_em, NOW()) WHERE channel_id=$2",
             user_id, channel_id,
         )
 
@@ -318,3 +333,69 @@ async def list_open_tickets(guild_id: int) -> list[dict]:
             guild_id,
         )
     return [dict(r) for r in rows]
+
+
+async def list_all_open_tickets() -> list[dict]:
+    """Todos os tickets abertos (usado para aquecer o índice em memória)."""
+    async with get_pool().acquire() as conn:
+        rows = await conn.fetch("SELECT * FROM tickets")
+    return [dict(r) for r in rows]
+
+
+async def list_ticket_configs() -> list[dict]:
+    """Categoria e cargos de staff de todos os servidores com tickets configurados."""
+    async with get_pool().acquire() as conn:
+        rows = await conn.fetch("""
+            SELECT guild_id, ticket_category, staff_roles FROM guild_config
+            WHERE ticket_category IS NOT NULL OR cardinality(staff_roles) > 0
+        """)
+    return [dict(r) for r in rows]
+
+
+async def archive_ticket(channel_id: int, canal_nome: str | None, fechado_por: int | None,
+                         transcript: bytes | None = None, transcript_sha256: str | None = None) -> int | None:
+    """Move o ticket aberto para tickets_arquivo (uma única query). Retorna o ID arquivado."""
+    async with get_pool().acquire() as conn:
+        row = await conn.fetchrow("""
+            WITH t AS (DELETE FROM tickets WHERE channel_id=$1 RETURNING *)
+            INSERT INTO tickets_arquivo
+              (guild_id, channel_id, canal_nome, user_id, categoria, atendente,
+               fechado_por, aberto_em, atendido_em, transcript_sha256, transcript)
+            SELECT guild_id, channel_id, $2, user_id, categoria, atendente,
+                   $3, created_at, atendido_em, $4, $5
+            FROM t
+            RETURNING id
+        """, channel_id, canal_nome, fechado_por, transcript_sha256, transcript)
+    return row["id"] if row else None
+
+
+async def search_ticket_archive(guild_id: int, user_id: int | None = None,
+                                categoria: str | None = None, limit: int = 15) -> list[dict]:
+    filtros = ["guild_id = $1"]
+    args: list = [guild_id]
+    if user_id:
+        args.append(user_id)
+        filtros.append(f"user_id = ${len(args)}")
+    if categoria:
+        args.append(categoria)
+        filtros.append(f"categoria = ${len(args)}")
+    args.append(limit)
+    async with get_pool().acquire() as conn:
+        rows = await conn.fetch(f"""
+            SELECT id, channel_id, canal_nome, user_id, categoria, atendente, fechado_por,
+                   aberto_em, atendido_em, fechado_em, transcript IS NOT NULL AS tem_transcript
+            FROM tickets_arquivo
+            WHERE {' AND '.join(filtros)}
+            ORDER BY fechado_em DESC
+            LIMIT ${len(args)}
+        """, *args)
+    return [dict(r) for r in rows]
+
+
+async def get_archived_ticket(guild_id: int, ticket_id: int) -> dict | None:
+    async with get_pool().acquire() as conn:
+        row = await conn.fetchrow(
+            "SELECT * FROM tickets_arquivo WHERE guild_id=$1 AND id=$2",
+            guild_id, ticket_id,
+        )
+    return dict(row) if row else None
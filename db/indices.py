@@ -0,0 +1,103 @@
+"""
+db/indices.py
+Conjunto gerenciado de índices para as queries quentes.
+
+Criados com CREATE INDEX CONCURRENTLY (sem bloquear escritas), por isso
+ficam fora das migrações, que rodam numa transação. Sobe em segundo plano
+depois do init_pool; com tudo criado, custa uma única consulta ao catálogo.
+Um build interrompido deixa o índice INVALID: ele é removido e refeito.
+Atrás de um pooler em modo transação o build não roda: o advisory lock de
+sessão e o unlock podem cair em conexões diferentes do servidor.
+"""
+
+import logging
+import time
+import zlib
+from dataclasses import dataclass
+
+from db.database import get_db_mode, get_pool
+
+log = logging.getLogger("multibot.db")
+
+_LOCK = zlib.crc32(b"multibot:indices")
+
+
+@dataclass(frozen=True)
+class Indice:
+    nome:      str
+    tabela:    str
+    definicao: str   # colunas (e WHERE, se parcial)
+    uso:       str   # query atendida
+
+    @property
+    def ddl(self) -> str:
+        return f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {self.nome} ON {self.tabela} {self.definicao}"
+
+
+INDICES: tuple[Indice, ...] = (
+    Indice("giveaways_mensagem_ativo", "giveaways", "(message_id) WHERE encerrado = FALSE",
+           "botão de participar (message_id)"),
+    Indice("giveaways_guild_ativos", "giveaways", "(guild_id, encerra_em) WHERE encerrado = FALSE",
+           "/giveaway lista"),
+    Indice("xp_data_ranking", "xp_data", "(guild_id, level DESC, xp DESC)",
+           "ranking e posição de XP"),
+    Indice("economia_ranking", "economia", "(guild_id, saldo DESC)",
+           "ranking da economia"),
+    Indice("loja_guild_preco", "loja", "(guild_id, preco)",
+           "listagem da loja"),
+    Indice("log_eventos_data", "log_eventos", "(created_at)",
+           "purga da retenção dos logs"),
+)
+
+
+async def garantir_indices() -> int:
+    """Cria (ou refaz, se inválidos) os índices do conjunto; retorna quantos foram construídos."""
+    nomes = [i.nome for i in INDICES]
+    async with get_pool().acquire() as conn:
+        rows = await conn.fetch("""
+            SELECT c.relname, i.indisvalid
+            FROM pg_class c JOIN pg_index i ON i.indexrelid = c.oid
+            WHERE c.relname = ANY($1::text[])
+        """, nomes)
+        estado = {r["relname"]: r["indisvalid"] for r in rows}
+        pendentes = [i for i in INDICES if not estado.get(i.nome)]
+        if not pendentes:
+            return 0
+        if get_db_mode() == "pooler":
+            log.warning(f"[DB] {len(pendentes)} índice(s) pendente(s) não criado(s) atrás do pooler: "
+                        f"{', '.join(i.nome for i in pendentes)}. Rode com DB_MODE=direct numa DSN direta.")
+            return 0
+
+        # Outro processo do cluster já está construindo: ele termina o serviço
+        if not await conn.fetchval("SELECT pg_try_advisory_lock($1)", _LOCK):
+            return 0
+        construidos = 0
+        try:
+            for indice in pendentes:
+                inicio = time.perf_counter()
+                try:
+                    if estado.get(indice.nome) is False:
+                        await conn.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {indice.nome}")
+                    await conn.execute(indice.ddl)
+                except Exception as exc:
+                    log.error(f"[DB] Índice {indice.nome} não criado: {exc}")
+                    continue
+                construidos += 1
+                log.info(f"[DB] Índice {indice.nome} criado ({(time.perf_counter() - inicio) * 1000:.0f}ms)")
+        finally:
+            await conn.execute("SELECT pg_advisory_unlock($1)", _LOCK)
+    return construidos
+
+
+async def relatorio() -> list[dict]:
+    """Uso (pg_stat_user_indexes) dos índices das tabelas do conjunto gerenciado."""
+    tabelas = sorted({i.tabela for i in INDICES} | {"lembretes", "aniversarios"})
+    async with get_pool().acquire() as conn:
+        rows = await conn.fetch("""
+            SELECT s.relname AS tabela, s.indexrelname AS indice, s.idx_scan, s.idx_tup_read,
+                   pg_relation_size(s.indexrelid) AS bytes, i.indisvalid AS valido
+            FROM pg_stat_user_indexes s JOIN pg_index i ON i.indexrelid = s.indexrelid
+            WHERE s.relname = ANY($1::text[])
+            ORDER BY s.relname, s.indexrelname
+        """, tabelas)
+    return [dict(r) for r in rows]
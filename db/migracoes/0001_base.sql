@@ -0,0 +1,92 @@
+-- Tabelas base (config, XP, avisos, tickets, meta)
+
+-- Configurações gerais por servidor
+CREATE TABLE IF NOT EXISTS guild_config (
+    guild_id        BIGINT PRIMARY KEY,
+    -- Geral
+    log_channel     BIGINT,
+    -- Tickets
+    ticket_category BIGINT,
+    ticket_log      BIGINT,
+    ticket_banner   TEXT,
+    staff_roles     BIGINT[],
+    -- Boas-vindas
+    welcome_canal   BIGINT,
+    welcome_msg     TEXT,
+    welcome_banner  TEXT,
+    welcome_dm      BOOLEAN DEFAULT FALSE,
+    welcome_cor     INT DEFAULT 5899754,
+    welcome_titulo  TEXT,
+    welcome_rodape  TEXT,
+    -- XP
+    xp_canal        BIGINT,
+    xp_max_level    INT DEFAULT 100,
+    xp_ativo        BOOLEAN DEFAULT TRUE,
+    xp_embed_cor    INT DEFAULT 5899754,
+    xp_embed_banner TEXT,
+    xp_embed_titulo TEXT,
+    xp_embed_rodape TEXT,
+    xp_cargo_nivel  JSONB DEFAULT '{}',
+    -- Timestamps
+    updated_at      TIMESTAMPTZ DEFAULT NOW()
+);
+
+-- XP por membro por servidor
+CREATE TABLE IF NOT EXISTS xp_data (
+    guild_id    BIGINT,
+    user_id     BIGINT,
+    xp          INT DEFAULT 0,
+    level       INT DEFAULT 0,
+    updated_at  TIMESTAMPTZ DEFAULT NOW(),
+    PRIMARY KEY (guild_id, user_id)
+);
+
+-- Avisos de moderação
+CREATE TABLE IF NOT EXISTS warns (
+    id          SERIAL PRIMARY KEY,
+    guild_id    BIGINT NOT NULL,
+    user_id     BIGINT NOT NULL,
+    motivo      TEXT NOT NULL,
+    mod_id      BIGINT NOT NULL,
+    created_at  TIMESTAMPTZ DEFAULT NOW()
+);
+CREATE INDEX IF NOT EXISTS warns_guild_user ON warns(guild_id, user_id);
+
+-- Tickets abertos
+CREATE TABLE IF NOT EXISTS tickets (
+    channel_id  BIGINT PRIMARY KEY,
+    guild_id    BIGINT NOT NULL,
+    user_id     BIGINT NOT NULL,
+    categoria   TEXT,
+    atendente   BIGINT,
+    created_at  TIMESTAMPTZ DEFAULT NOW()
+);
+CREATE INDEX IF NOT EXISTS tickets_guild_user ON tickets(guild_id, user_id);
+ALTER TABLE tickets ADD COLUMN IF NOT EXISTS atendido_em TIMESTAMPTZ;
+
+-- Tickets fechados (histórico + transcript em texto gzip)
+CREATE TABLE IF NOT EXISTS tickets_arquivo (
+    id                SERIAL PRIMARY KEY,
+    guild_id          BIGINT NOT NULL,
+    channel_id        BIGINT NOT NULL,
+    canal_nome        TEXT,
+    user_id           BIGINT NOT NULL,
+    categoria         TEXT,
+    atendente         BIGINT,
+    fechado_por       BIGINT,
+    aberto_em         TIMESTAMPTZ,
+    atendido_em       TIMESTAMPTZ,
+    fechado_em        TIMESTAMPTZ DEFAULT NOW(),
+    transcript_sha256 TEXT,
+    transcript        BYTEA
+);
+CREATE INDEX IF NOT EXISTS tickets_arquivo_guild      ON tickets_arquivo(guild_id, fechado_em DESC);
+CREATE INDEX IF NOT EXISTS tickets_arquivo_guild_user ON tickets_arquivo(guild_id, user_id, fechado_em DESC);
+CREATE INDEX IF NOT EXISTS tickets_arquivo_guild_cat  ON tickets_arquivo(guild_id, categoria, fechado_em DESC);
+
+-- Estado interno do bot (ex.: hash da árvore de comandos sincronizada)
+CREATE TABLE IF NOT EXISTS bot_meta (
+    chave         TEXT PRIMARY KEY,
+    valor         TEXT NOT NULL,
+    atualizado_em TIMESTAMPTZ DEFAULT NOW()
+);
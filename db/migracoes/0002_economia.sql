@@ -0,0 +1,27 @@
+-- Economia: saldos, loja e compras
+
+CREATE TABLE IF NOT EXISTS economia (
+    guild_id    BIGINT,
+    user_id     BIGINT,
+    saldo       BIGINT DEFAULT 0,
+    daily_last  TIMESTAMPTZ,
+    PRIMARY KEY (guild_id, user_id)
+);
+CREATE TABLE IF NOT EXISTS loja (
+    id          SERIAL PRIMARY KEY,
+    guild_id    BIGINT NOT NULL,
+    nome        TEXT NOT NULL,
+    descricao   TEXT,
+    preco       BIGINT NOT NULL,
+    role_id     BIGINT,
+    estoque     INT DEFAULT -1,
+    created_at  TIMESTAMPTZ DEFAULT NOW()
+);
+CREATE TABLE IF NOT EXISTS compras (
+    id          SERIAL PRIMARY KEY,
+    guild_id    BIGINT NOT NULL,
+    user_id     BIGINT NOT NULL,
+    item_id     INT NOT NULL,
+    preco_pago  BIGINT NOT NULL,
+    created_at  TIMESTAMPTZ DEFAULT NOW()
+);
@@ -0,0 +1,21 @@
+-- Sorteios
+
+CREATE TABLE IF NOT EXISTS giveaways (
+    id              SERIAL PRIMARY KEY,
+    guild_id        BIGINT NOT NULL,
+    channel_id      BIGINT NOT NULL,
+    message_id      BIGINT,
+    host_id         BIGINT NOT NULL,
+    premio          TEXT NOT NULL,
+    descricao       TEXT,
+    imagem          TEXT,
+    thumbnail       TEXT,
+    cor             INT DEFAULT 2728702,
+    vencedores      INT DEFAULT 1,
+    encerra_em      TIMESTAMPTZ NOT NULL,
+    encerrado       BOOLEAN DEFAULT FALSE,
+    roles_permitidos BIGINT[],
+    roles_bloqueados BIGINT[],
+    bonus_entries    JSONB DEFAULT '{}',
+    created_at      TIMESTAMPTZ DEFAULT NOW()
+);
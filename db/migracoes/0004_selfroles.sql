@@ -0,0 +1,13 @@
+-- Painéis de cargos automáticos
+
+CREATE TABLE IF NOT EXISTS selfroles_panels (
+    message_id  BIGINT PRIMARY KEY,
+    channel_id  BIGINT NOT NULL,
+    guild_id    BIGINT NOT NULL,
+    titulo      TEXT,
+    descricao   TEXT,
+    cor         INT DEFAULT 5899754,
+    roles       JSONB DEFAULT '[]',
+    created_at  TIMESTAMPTZ DEFAULT NOW()
+);
+ALTER TABLE selfroles_panels ADD COLUMN IF NOT EXISTS modo TEXT DEFAULT 'botoes';
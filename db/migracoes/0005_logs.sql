@@ -0,0 +1,15 @@
+-- Eventos de log
+
+CREATE TABLE IF NOT EXISTS log_eventos (
+    id          BIGSERIAL PRIMARY KEY,
+    guild_id    BIGINT NOT NULL,
+    tipo        TEXT NOT NULL,
+    user_id     BIGINT,
+    channel_id  BIGINT,
+    conteudo    TEXT,
+    created_at  TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+CREATE INDEX IF NOT EXISTS log_eventos_guild_data   ON log_eventos(guild_id, created_at DESC);
+CREATE INDEX IF NOT EXISTS log_eventos_guild_user   ON log_eventos(guild_id, user_id, created_at DESC);
+CREATE INDEX IF NOT EXISTS log_eventos_guild_canal  ON log_eventos(guild_id, channel_id, created_at DESC);
+CREATE INDEX IF NOT EXISTS log_eventos_guild_tipo   ON log_eventos(guild_id, tipo, created_at DESC);
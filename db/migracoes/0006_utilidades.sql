@@ -0,0 +1,35 @@
+-- Aniversários, lembretes e colunas extras de guild_config
+
+CREATE TABLE IF NOT EXISTS aniversarios (
+    user_id   BIGINT PRIMARY KEY,
+    dia       INT NOT NULL,
+    mes       INT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS aniversarios_data ON aniversarios(mes, dia);
+-- Um envio de parabéns por servidor por data local
+CREATE TABLE IF NOT EXISTS aniversarios_enviados (
+    guild_id  BIGINT NOT NULL,
+    data      DATE   NOT NULL,
+    PRIMARY KEY (guild_id, data)
+);
+CREATE TABLE IF NOT EXISTS lembretes (
+    id          SERIAL PRIMARY KEY,
+    user_id     BIGINT NOT NULL,
+    guild_id    BIGINT,
+    channel_id  BIGINT,
+    mensagem    TEXT NOT NULL,
+    dispara_em  TIMESTAMPTZ NOT NULL,
+    disparado   BOOLEAN DEFAULT FALSE
+);
+-- disparado=FALSE → pendente; status guarda o resultado da última entrega
+ALTER TABLE lembretes ADD COLUMN IF NOT EXISTS status         TEXT;
+ALTER TABLE lembretes ADD COLUMN IF NOT EXISTS tentativas     INT DEFAULT 0;
+ALTER TABLE lembretes ADD COLUMN IF NOT EXISTS intervalo_secs INT;
+ALTER TABLE lembretes ADD COLUMN IF NOT EXISTS ultimo_erro    TEXT;
+CREATE INDEX IF NOT EXISTS lembretes_pendentes ON lembretes(dispara_em) WHERE disparado=FALSE;
+CREATE INDEX IF NOT EXISTS lembretes_usuario   ON lembretes(user_id)    WHERE disparado=FALSE;
+-- Coluna para canal de membro counter e aniversário
+ALTER TABLE guild_config ADD COLUMN IF NOT EXISTS counter_channel BIGINT;
+ALTER TABLE guild_config ADD COLUMN IF NOT EXISTS aniv_channel    BIGINT;
+ALTER TABLE guild_config ADD COLUMN IF NOT EXISTS aniv_tz         TEXT;
+ALTER TABLE guild_config ADD COLUMN IF NOT EXISTS logs_channel    BIGINT;
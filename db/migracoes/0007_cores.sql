@@ -0,0 +1,8 @@
+-- Configuração de cores por servidor
+
+CREATE TABLE IF NOT EXISTS cores_config (
+    guild_id BIGINT NOT NULL,
+    key      TEXT   NOT NULL,
+    value    TEXT   NOT NULL,
+    PRIMARY KEY (guild_id, key)
+);
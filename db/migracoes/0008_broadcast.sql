@@ -0,0 +1,26 @@
+-- Jobs de broadcast do /admin
+
+CREATE TABLE IF NOT EXISTS broadcast_jobs (
+    id           SERIAL PRIMARY KEY,
+    mensagem     TEXT NOT NULL,
+    status       TEXT NOT NULL DEFAULT 'rodando',
+    total        INT  NOT NULL,
+    enviados     INT  NOT NULL DEFAULT 0,
+    falhas       INT  NOT NULL DEFAULT 0,
+    criado_em    TIMESTAMPTZ DEFAULT NOW(),
+    concluido_em TIMESTAMPTZ
+);
+CREATE TABLE IF NOT EXISTS broadcast_entregas (
+    job_id     INT    NOT NULL,
+    guild_id   BIGINT NOT NULL,
+    channel_id BIGINT,
+    ok         BOOLEAN NOT NULL,
+    PRIMARY KEY (job_id, guild_id)
+);
+-- Clusters que já terminaram a sua parte de cada job
+CREATE TABLE IF NOT EXISTS broadcast_clusters (
+    job_id     INT NOT NULL,
+    cluster_id INT NOT NULL,
+    PRIMARY KEY (job_id, cluster_id)
+);
+ALTER TABLE broadcast_jobs ADD COLUMN IF NOT EXISTS clusters INT NOT NULL DEFAULT 1;
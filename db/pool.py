@@ -0,0 +1,234 @@
+"""
+db/pool.py
+Pool asyncpg instrumentado e com limite adaptativo.
+
+O asyncpg não muda o max_size depois de criado, então o pool real nasce no
+teto (DB_POOL_TETO) e um limitador próprio controla quantas conexões podem
+estar em uso: começa em DB_POOL_MAX e cresce em direção ao teto quando a
+espera por conexão fica alta por várias janelas seguidas; volta a encolher
+com o pool ocioso. Conexões extras ociosas são fechadas pelo próprio asyncpg
+(max_inactive_connection_lifetime).
+
+Também conta quantas vezes cada interação adquire o pool (contextvar) e
+avisa quando passa de DB_AQUISICOES_ALERTA.
+"""
+
+import asyncio
+import contextvars
+import logging
+import os
+import time
+from dataclasses import dataclass
+
+import asyncpg
+
+from utils import metrics
+
+log = logging.getLogger("multibot.db")
+
+_JANELA_SECS   = 10     # período do controlador
+_JANELAS_SUBIR = 3      # janelas seguidas com espera alta para crescer
+_JANELAS_DESCER = 6     # janelas seguidas ociosas para encolher
+_PASSO         = 2
+
+espera_hist = metrics.registry.registrar(metrics.Histogram(
+    "multibot_db_espera_segundos", "Espera para adquirir uma conexão do pool",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)))
+timeouts = metrics.registry.registrar(metrics.Counter(
+    "multibot_db_acquire_timeouts_total", "Aquisições do pool que estouraram o timeout"))
+aquisicoes_hist = metrics.registry.registrar(metrics.Histogram(
+    "multibot_db_aquisicoes_por_interacao", "Aquisições do pool por slash command", ("comando",),
+    buckets=(1, 2, 3, 4, 6, 8, 12, 20)))
+
+
+def _env_int(nome: str, padrao: int) -> int:
+    try:
+        return int(os.environ.get(nome, padrao))
+    except ValueError:
+        return padrao
+
+
+@dataclass
+class ConfigPool:
+    minimo:    int   = 2
+    maximo:    int   = 10     # limite inicial de conexões em uso
+    teto:      int   = 20     # até onde o controlador pode crescer
+    timeout:   float = 10.0   # espera máxima por conexão (s)
+    alvo_ms:   float = 50.0   # espera p95 acima disso conta como janela "quente"
+    alerta:    int   = 4      # aquisições por interação antes de avisar
+
+    @classmethod
+    def do_ambiente(cls) -> "ConfigPool":
+        maximo = max(1, _env_int("DB_POOL_MAX", 10))
+        teto   = max(maximo, _env_int("DB_POOL_TETO", maximo * 2))
+        minimo = _env_int("DB_POOL_MIN", 2)
+        if not 0 <= minimo <= teto:
+            log.warning(f"[DB] DB_POOL_MIN={minimo} fora de 0–{teto} (teto); usando {min(max(minimo, 0), teto)}.")
+            minimo = min(max(minimo, 0), teto)
+        return cls(
+            minimo=minimo,
+            maximo=maximo,
+            teto=teto,
+            timeout=float(os.environ.get("DB_ACQUIRE_TIMEOUT", "10")),
+            alvo_ms=float(os.environ.get("DB_ESPERA_ALVO_MS", "50")),
+            alerta=_env_int("DB_AQUISICOES_ALERTA", 4),
+        )
+
+
+# ── Contagem por interação ────────────────────────────────────────────────────
+
+@dataclass
+class _Contagem:
+    comando: str
+    task: asyncio.Task | None   # só conta nesta task: as criadas pelo comando herdam o contexto
+    n: int = 0
+
+
+_contagem: contextvars.ContextVar[_Contagem | None] = contextvars.ContextVar("db_aquisicoes", default=None)
+
+
+def iniciar_contagem(comando: str):
+    """Chamado no início de cada interação (mesma task do comando)."""
+    _contagem.set(_Contagem(comando, asyncio.current_task()))
+
+
+def encerrar_contagem():
+    atual = _contagem.get()
+    if atual is not None:
+        aquisicoes_hist.observe(atual.n, atual.comando)
+        _contagem.set(None)
+
+
+# ── Pool ──────────────────────────────────────────────────────────────────────
+
+class _Aquisicao:
+    def __init__(self, pool: "PoolInstrumentado", timeout: float | None):
+        self._pool    = pool
+        self._timeout = timeout
+        self._conn    = None
+
+    async def __aenter__(self):
+        self._conn = await self._pool._adquirir(self._timeout)
+        return self._conn
+
+    async def __aexit__(self, *exc):
+        conn, self._conn = self._conn, None
+        await self._pool.release(conn)
+
+
+class PoolInstrumentado:
+    """Envolve o asyncpg.Pool; o resto da API é repassado ao pool real."""
+
+    def __init__(self, pool: asyncpg.Pool, config: ConfigPool):
+        self._pool   = pool
+        self.config  = config
+        self.limite  = config.maximo
+        self.em_uso  = 0
+        self.pico    = 0          # maior em_uso na janela atual
+        self._cond   = asyncio.Condition()
+        self._esperas: list[float] = []
+        self._quentes = 0
+        self._ociosas = 0
+        self._task: asyncio.Task | None = None
+
+    def __getattr__(self, nome):
+        return getattr(self._pool, nome)
+
+    def iniciar(self):
+        self._task = asyncio.create_task(self._controlar())
+
+    async def close(self):
+        if self._task:
+            self._task.cancel()
+        await self._pool.close()
+
+    # ── Aquisição ──────────────────────────────────────────────────────────
+
+    def acquire(self, *, timeout: float | None = None) -> _Aquisicao:
+        return _Aquisicao(self, timeout)
+
+    async def _adquirir(self, timeout: float | None):
+        timeout = timeout if timeout is not None else self.config.timeout
+        inicio  = time.perf_counter()
+        try:
+            conn = await asyncio.wait_for(self._reservar(), timeout=timeout)
+        except asyncio.TimeoutError:
+            timeouts.inc()
+            log.warning(f"[DB] Timeout ao adquirir conexão ({timeout:g}s; "
+                        f"{self.em_uso}/{self.limite} em uso)")
+            raise
+
+        espera = time.perf_counter() - inicio
+        espera_hist.observe(espera)
+        self._esperas.append(espera)
+        self.pico = max(self.pico, self.em_uso)
+
+        contagem = _contagem.get()
+        if contagem is not None and contagem.task is asyncio.current_task():
+            contagem.n += 1
+            if contagem.n == self.config.alerta + 1:
+                log.warning(f"[DB] /{contagem.comando} adquiriu o pool mais de "
+                            f"{self.config.alerta} vezes numa única interação.")
+        return conn
+
+    async def _reservar(self):
+        async with self._cond:
+            await self._cond.wait_for(lambda: self.em_uso < self.limite)
+            self.em_uso += 1
+        try:
+            return await self._pool.acquire()
+        except BaseException:
+            await self._devolver_vaga()
+            raise
+
+    async def release(self, conn):
+        try:
+            await self._pool.release(conn)
+        finally:
+            await self._devolver_vaga()
+
+    async def _devolver_vaga(self):
+        async with self._cond:
+            self.em_uso -= 1
+            self._cond.notify()
+
+    # Atalhos do asyncpg.Pool, passando pela aquisição instrumentada
+    async def execute(self, query: str, *args, timeout: float | None = None) -> str:
+        async with self.acquire() as conn:
+            return await conn.execute(query, *args, timeout=timeout)
+
+    async def fetch(self, query: str, *args, timeout: float | None = None) -> list:
+        async with self.acquire() as conn:
+            return await conn.fetch(query, *args, timeout=timeout)
+
+    async def fetchrow(self, query: str, *args, timeout: float | None = None):
+        async with self.acquire() as conn:
+            return await conn.fetchrow(query, *args, timeout=timeout)
+
+    async def fetchval(self, query: str, *args, column: int = 0, timeout: float | None = None):
+        async with self.acquire() as conn:
+            return await conn.fetchval(query, *args, column=column, timeout=timeout)
+
+    # ── Controlador adaptativo ─────────────────────────────────────────────
+
+    async def _controlar(self):
+        while True:
+            await asyncio.sleep(_JANELA_SECS)
+            esperas, self._esperas = self._esperas, []
+            pico, self.pico = self.pico, self.em_uso
+            p95 = sorted(esperas)[int(len(esperas) * 0.95)] * 1000 if esperas else 0.0
+
+            self._quentes = self._quentes + 1 if p95 > self.config.alvo_ms else 0
+            self._ociosas = self._ociosas + 1 if pico <= self.limite // 2 and p95 < 1 else 0
+
+            if self._quentes >= _JANELAS_SUBIR and self.limite < self.config.teto:
+                await self._ajustar(min(self.config.teto, self.limite + _PASSO), f"espera p95 {p95:.0f}ms")
+            elif self._ociosas >= _JANELAS_DESCER and self.limite > self.config.maximo:
+                await self._ajustar(max(self.config.maximo, self.limite - 1), "pool ocioso")
+
+    async def _ajustar(self, novo: int, motivo: str):
+        log.info(f"[DB] Limite do pool {self.limite} → {novo} ({motivo})")
+        self._quentes = self._ociosas = 0
+        async with self._cond:
+            self.limite = novo
+            self._cond.notify_all()
@@ -0,0 +1,299 @@
+"""
+db/repositorio.py
+Repositórios tipados com unidade de trabalho por interação.
+
+`unidade()` adquire uma única conexão do pool e a publica num contextvar:
+qualquer `unidade()` aberta depois, na mesma task, reaproveita essa conexão
+em vez de voltar ao pool. Os repositórios (uow.economia, uow.loja,
+uow.giveaways, uow.selfroles) rodam todas as queries do comando nela.
+
+Com transacao=True o bloco é atômico (numa unidade aninhada vira SAVEPOINT);
+`uow.desfazer()` descarta o que foi feito sem precisar levantar exceção.
+Tasks filhas herdam o contextvar, mas não a conexão: asyncpg não aceita
+duas operações simultâneas na mesma conexão, então elas adquirem a sua.
+"""
+
+import asyncio
+import contextvars
+import json
+from contextlib import asynccontextmanager
+from datetime import datetime
+
+import asyncpg
+
+from db.database import get_pool
+
+
+def _jsonb(valor):
+    return json.loads(valor) if isinstance(valor, str) else valor
+
+
+class _Repo:
+    def __init__(self, conn: asyncpg.Connection):
+        self.conn = conn
+
+
+# ── Economia ──────────────────────────────────────────────────────────────────
+
+class EconomiaRepo(_Repo):
+    async def saldo(self, guild_id: int, user_id: int) -> int:
+        valor = await self.conn.fetchval(
+            "SELECT saldo FROM economia WHERE guild_id=$1 AND user_id=$2", guild_id, user_id
+        )
+        return valor or 0
+
+    async def creditar(self, guild_id: int, user_id: int, valor: int) -> int:
+        """Soma `valor` ao saldo (criando a conta) e retorna o novo saldo."""
+        return await self.conn.fetchval("""
+            INSERT INTO economia (guild_id, user_id, saldo)
+            VALUES ($1,$2,$3)
+            ON CONFLICT (guild_id, user_id) DO UPDATE SET saldo = economia.saldo + $3
+            RETURNING saldo
+        """, guild_id, user_id, valor)
+
+    async def debitar(self, guild_id: int, user_id: int, valor: int) -> int | None:
+        """Desconta `valor` se houver saldo; None (nada muda) se não houver."""
+        return await self.conn.fetchval("""
+            UPDATE economia SET saldo = saldo - $3
+            WHERE guild_id=$1 AND user_id=$2 AND saldo >= $3
+            RETURNING saldo
+        """, guild_id, user_id, valor)
+
+    async def remover(self, guild_id: int, user_id: int, valor: int) -> int:
+        """Desconta até zerar (uso administrativo); retorna o novo saldo."""
+        return await self.conn.fetchval("""
+            INSERT INTO economia (guild_id, user_id, saldo)
+            VALUES ($1,$2,0)
+            ON CONFLICT (guild_id, user_id) DO UPDATE SET saldo = GREATEST(0, economia.saldo - $3)
+            RETURNING saldo
+        """, guild_id, user_id, valor)
+
+    async def coletar_daily(self, guild_id: int, user_id: int, valor: int, horas: int) -> int | None:
+        """Credita o daily e marca a coleta numa só query; None se ainda não passou o intervalo."""
+        return await self.conn.fetchval("""
+            INSERT INTO economia (guild_id, user_id, saldo, daily_last)
+            VALUES ($1,$2,$3,NOW())
+            ON CONFLICT (guild_id, user_id) DO UPDATE
+                SET saldo = economia.saldo + $3, daily_last = NOW()
+                WHERE economia.daily_last IS NULL
+                   OR economia.daily_last <= NOW() - make_interval(hours => $4)
+            RETURNING saldo
+        """, guild_id, user_id, valor, horas)
+
+    async def daily_last(self, guild_id: int, user_id: int) -> datetime | None:
+        return await self.conn.fetchval(
+            "SELECT daily_last FROM economia WHERE guild_id=$1 AND user_id=$2", guild_id, user_id
+        )
+
+    async def ranking(self, guild_id: int, limit: int = 10) -> list[dict]:
+        rows = await self.conn.fetch("""
+            SELECT user_id, saldo FROM economia
+            WHERE guild_id=$1 ORDER BY saldo DESC LIMIT $2
+        """, guild_id, limit)
+        return [dict(r) for r in rows]
+
+
+# ── Loja ──────────────────────────────────────────────────────────────────────
+
+class LojaRepo(_Repo):
+    async def listar(self, guild_id: int) -> list[dict]:
+        rows = await self.conn.fetch(
+            "SELECT * FROM loja WHERE guild_id=$1 ORDER BY preco ASC", guild_id
+        )
+        return [dict(r) for r in rows]
+
+    async def item(self, guild_id: int, item_id: int) -> dict | None:
+        row = await self.conn.fetchrow(
+            "SELECT * FROM loja WHERE id=$1 AND guild_id=$2", item_id, guild_id
+        )
+        return dict(row) if row else None
+
+    async def reservar(self, guild_id: int, item_id: int) -> dict | None:
+        """Baixa uma unidade do estoque (-1 = ilimitado) e retorna o item; None se não existe ou esgotou."""
+        row = await self.conn.fetchrow("""
+            UPDATE loja SET estoque = CASE WHEN estoque > 0 THEN estoque - 1 ELSE estoque END
+            WHERE id=$1 AND guild_id=$2 AND estoque <> 0
+            RETURNING *
+        """, item_id, guild_id)
+        return dict(row) if row else None
+
+    async def adicionar(self, guild_id: int, nome: str, descricao: str | None, preco: int,
+                        role_id: int | None, estoque: int) -> int:
+        return await self.conn.fetchval("""
+            INSERT INTO loja (guild_id, nome, descricao, preco, role_id, estoque)
+            VALUES ($1,$2,$3,$4,$5,$6) RETURNING id
+        """, guild_id, nome, descricao, preco, role_id, estoque)
+
+    async def remover(self, guild_id: int, item_id: int) -> bool:
+        result = await self.conn.execute(
+            "DELETE FROM loja WHERE id=$1 AND guild_id=$2", item_id, guild_id
+        )
+        return result != "DELETE 0"
+
+    async def registrar_compra(self, guild_id: int, user_id: int, item_id: int, preco: int):
+        await self.conn.execute(
+            "INSERT INTO compras (guild_id, user_id, item_id, preco_pago) VALUES ($1,$2,$3,$4)",
+            guild_id, user_id, item_id, preco,
+        )
+
+
+# ── Giveaways ─────────────────────────────────────────────────────────────────
+
+def _giveaway(row) -> dict | None:
+    if row is None:
+        return None
+    gw = dict(row)
+    gw["bonus_entries"] = _jsonb(gw.get("bonus_entries"))
+    return gw
+
+
+class GiveawaysRepo(_Repo):
+    async def ativo_por_mensagem(self, message_id: int) -> dict | None:
+        return _giveaway(await self.conn.fetchrow(
+            "SELECT * FROM giveaways WHERE message_id=$1 AND encerrado=FALSE", message_id
+        ))
+
+    async def ativos(self, guild_id: int) -> list[dict]:
+        rows = await self.conn.fetch(
+            "SELECT * FROM giveaways WHERE guild_id=$1 AND encerrado=FALSE ORDER BY encerra_em",
+            guild_id,
+        )
+        return [_giveaway(r) for r in rows]
+
+    async def pendentes(self, depois_de: datetime) -> list[dict]:
+        rows = await self.conn.fetch(
+            "SELECT * FROM giveaways WHERE encerrado=FALSE AND encerra_em > $1", depois_de
+        )
+        return [_giveaway(r) for r in rows]
+
+    async def encerrado(self, giveaway_id: int, guild_id: int) -> dict | None:
+        return _giveaway(await self.conn.fetchrow(
+            "SELECT * FROM giveaways WHERE id=$1 AND guild_id=$2 AND encerrado=TRUE",
+            giveaway_id, guild_id,
+        ))
+
+    async def criar(self, dados: dict) -> int:
+        return await self.conn.fetchval("""
+            INSERT INTO giveaways
+              (guild_id, channel_id, host_id, premio, descricao, imagem, thumbnail,
+               cor, vencedores, encerra_em, roles_permitidos, roles_bloqueados, bonus_entries)
+            VALUES ($1,$2,$3,$4,$5,$6,$7,$8,$9,$10,$11,$12,$13)
+            RETURNING id
+        """,
+            dados["guild_id"], dados["channel_id"], dados["host_id"], dados["premio"],
+            dados["descricao"], dados["imagem"], dados["thumbnail"],
+            dados["cor"], dados["vencedores"], dados["encerra_em"],
+            dados["roles_permitidos"] or None,
+            dados["roles_bloqueados"] or None,
+            json.dumps({str(k): v for k, v in (dados["bonus_entries"] or {}).items()}),
+        )
+
+    async def definir_mensagem(self, giveaway_id: int, message_id: int):
+        await self.conn.execute("UPDATE giveaways SET message_id=$1 WHERE id=$2", message_id, giveaway_id)
+
+    async def encerrar(self, giveaway_id: int, guild_id: int | None = None) -> dict | None:
+        """Marca como encerrado e retorna a linha; None se não existe ou já estava encerrado."""
+        return _giveaway(await self.conn.fetchrow("""
+            UPDATE giveaways SET encerrado=TRUE
+            WHERE id=$1 AND encerrado=FALSE AND ($2::bigint IS NULL OR guild_id=$2)
+            RETURNING *
+        """, giveaway_id, guild_id))
+
+
+# ── Self-roles ────────────────────────────────────────────────────────────────
+
+class SelfRolesRepo(_Repo):
+    async def paineis(self) -> list[dict]:
+        rows = await self.conn.fetch("SELECT * FROM selfroles_panels")
+        return [dict(r) for r in rows]
+
+    async def salvar(self, panel: dict):
+        await self.conn.execute("""
+            INSERT INTO selfroles_panels (message_id, channel_id, guild_id, titulo, descricao, cor, roles, modo)
+            VALUES ($1,$2,$3,$4,$5,$6,$7,$8)
+            ON CONFLICT (message_id) DO UPDATE SET
+                titulo=$4, descricao=$5, cor=$6, roles=$7, modo=$8
+        """,
+            panel["message_id"], panel["channel_id"], panel["guild_id"],
+            panel["titulo"], panel["descricao"], panel["cor"],
+            json.dumps(panel["roles"]), panel["modo"],
+        )
+
+    async def acrescentar_cargo(self, message_id: int, entrada: dict) -> list[dict] | None:
+        """Acrescenta um cargo ao array JSONB. None se o painel estiver cheio ou já tiver o cargo."""
+        return _jsonb(await self.conn.fetchval("""
+            UPDATE selfroles_panels SET roles = roles || $2::jsonb
+            WHERE message_id=$1
+              AND jsonb_array_length(roles) < 20
+              AND NOT roles @> $3::jsonb
+            RETURNING roles
+        """, message_id, json.dumps([entrada]), json.dumps([{"role_id": entrada["role_id"]}])))
+
+    async def remover_cargo(self, message_id: int, role_id: int) -> list[dict] | None:
+        """Remove um cargo do array JSONB. None se o cargo não estiver no painel."""
+        return _jsonb(await self.conn.fetchval("""
+            UPDATE selfroles_panels SET roles = COALESCE(
+                (SELECT jsonb_agg(e) FROM jsonb_array_elements(roles) e
+                 WHERE (e->>'role_id')::bigint <> $2),
+                '[]'::jsonb)
+            WHERE message_id=$1 AND roles @> $3::jsonb
+            RETURNING roles
+        """, message_id, role_id, json.dumps([{"role_id": role_id}])))
+
+
+# ── Unidade de trabalho ───────────────────────────────────────────────────────
+
+class Unidade:
+    """Uma conexão e os repositórios ligados a ela."""
+
+    def __init__(self, conn: asyncpg.Connection, dona: asyncio.Task | None):
+        self.conn      = conn
+        self.dona      = dona
+        self.economia  = EconomiaRepo(conn)
+        self.loja      = LojaRepo(conn)
+        self.giveaways = GiveawaysRepo(conn)
+        self.selfroles = SelfRolesRepo(conn)
+        self._desfazer = False
+
+    def desfazer(self):
+        """Faz a transação desta unidade terminar em ROLLBACK."""
+        self._desfazer = True
+
+
+_atual: contextvars.ContextVar[Unidade | None] = contextvars.ContextVar("db_unidade", default=None)
+
+
+@asynccontextmanager
+async def _conexao():
+    atual = _atual.get()
+    task  = asyncio.current_task()
+    if atual is not None and atual.dona is task:
+        yield atual.conn
+        return
+    async with get_pool().acquire() as conn:
+        token = _atual.set(Unidade(conn, task))
+        try:
+            yield conn
+        finally:
+            _atual.reset(token)
+
+
+@asynccontextmanager
+async def unidade(*, transacao: bool = False):
+    """Abre (ou reaproveita, na mesma task) a unidade de trabalho da interação."""
+    async with _conexao() as conn:
+        uow = Unidade(conn, asyncio.current_task())
+        if not transacao:
+            yield uow
+            return
+        tx = conn.transaction()
+        await tx.start()
+        try:
+            yield uow
+        except BaseException:
+            await tx.rollback()
+            raise
+        if uow._desfazer:
+            await tx.rollback()
+        else:
+            await tx.commit()
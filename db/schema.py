@@ -0,0 +1,101 @@
+"""
+db/schema.py
+Migrações versionadas do schema (arquivos db/migracoes/NNNN_nome.sql).
+
+Cada arquivo roda uma única vez e fica registrado em schema_migrations.
+Com o schema em dia, a inicialização só faz leituras (to_regclass + SELECT),
+nenhum DDL. As pendentes são aplicadas numa transação sob advisory lock,
+então vários processos subindo juntos (cluster) não aplicam em dobro.
+"""
+
+import hashlib
+import logging
+import os
+import re
+import time
+import zlib
+from dataclasses import dataclass
+
+import asyncpg
+
+log = logging.getLogger("multibot.db")
+
+_DIR      = os.path.join(os.path.dirname(os.path.abspath(__file__)), "migracoes")
+_ARQUIVO  = re.compile(r"^(\d{4})_([\w-]+)\.sql$")
+_LOCK     = zlib.crc32(b"multibot:migracoes")
+
+
+@dataclass(frozen=True)
+class Migracao:
+    versao:   int
+    nome:     str
+    sql:      str
+    checksum: str
+
+
+def carregar_migracoes() -> list[Migracao]:
+    """Lê os arquivos de migração em ordem de versão."""
+    migracoes: dict[int, Migracao] = {}
+    for arquivo in os.listdir(_DIR):
+        m = _ARQUIVO.match(arquivo)
+        if not m:
+            continue
+        versao = int(m.group(1))
+        if versao in migracoes:
+            raise RuntimeError(f"Migração {versao:04d} duplicada: {arquivo}")
+        with open(os.path.join(_DIR, arquivo), encoding="utf-8") as f:
+            sql = f.read()
+        migracoes[versao] = Migracao(versao, m.group(2), sql, hashlib.sha256(sql.encode()).hexdigest())
+    return [migracoes[v] for v in sorted(migracoes)]
+
+
+async def _aplicadas(conn: asyncpg.Connection) -> dict[int, str]:
+    if await conn.fetchval("SELECT to_regclass('schema_migrations')") is None:
+        return {}
+    rows = await conn.fetch("SELECT versao, checksum FROM schema_migrations")
+    return {r["versao"]: r["checksum"] for r in rows}
+
+
+def _conferir(migracoes: list[Migracao], aplicadas: dict[int, str]):
+    for m in migracoes:
+        if m.versao in aplicadas and aplicadas[m.versao] != m.checksum:
+            log.warning(f"[DB] Migração {m.versao:04d}_{m.nome} foi alterada depois de aplicada.")
+
+
+async def aplicar_migracoes(pool: asyncpg.Pool) -> int:
+    """Aplica as migrações pendentes; retorna quantas foram aplicadas."""
+    migracoes = carregar_migracoes()
+    async with pool.acquire() as conn:
+        aplicadas = await _aplicadas(conn)
+        if all(m.versao in aplicadas for m in migracoes):
+            _conferir(migracoes, aplicadas)
+            log.info(f"[DB] Schema em dia (versão {migracoes[-1].versao if migracoes else 0}).")
+            return 0
+
+        feitas = 0
+        async with conn.transaction():
+            # Lock da transação: funciona também atrás de pooler em modo transação
+            await conn.execute("SELECT pg_advisory_xact_lock($1)", _LOCK)
+            await conn.execute("""
+                CREATE TABLE IF NOT EXISTS schema_migrations (
+                    versao      INT PRIMARY KEY,
+                    nome        TEXT NOT NULL,
+                    checksum    TEXT NOT NULL,
+                    aplicada_em TIMESTAMPTZ DEFAULT NOW()
+                )
+            """)
+            aplicadas = await _aplicadas(conn)   # outro processo pode ter aplicado enquanto esperávamos
+            for m in migracoes:
+                if m.versao in aplicadas:
+                    continue
+                inicio = time.perf_counter()
+                await conn.execute(m.sql)
+                await conn.execute(
+                    "INSERT INTO schema_migrations (versao, nome, checksum) VALUES ($1, $2, $3)",
+                    m.versao, m.nome, m.checksum,
+                )
+                feitas += 1
+                log.info(f"[DB] Migração {m.versao:04d}_{m.nome} aplicada "
+                         f"({(time.perf_counter() - inicio) * 1000:.0f}ms)")
+        _conferir(migracoes, aplicadas)
+    return feitas
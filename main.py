@@ -5,22 +5,34 @@ Comandos: agrupados por /mod, /xp, /musica, /ticket, /config, /embed
 """
 
 import asyncio
+import hashlib
 import itertools
+import json
 import logging
 import os
 import sys
+import time
+from collections import Counter
+from dataclasses import dataclass
 
 import discord
 from discord import app_commands
 from discord.ext import commands, tasks
 
-from db.database import init_pool
+from db import indices
+from db import pool as db_pool
+from db.database import get_bot_meta, init_pool, set_bot_meta
 from utils.constants import Colors, E
+from utils import metrics
+from utils.cluster import Cluster
+from utils.http import HttpClient
+from utils.watchdog import LoopWatchdog
 
 # ── Logging ───────────────────────────────────────────────────────────────────
+_CLUSTER_TAG = f"C{os.environ['CLUSTER_ID']} " if os.environ.get("CLUSTER_ID") else ""
 logging.basicConfig(
     level=logging.INFO,
-    format="[%(asctime)s] %(levelname)s — %(message)s",
+    format=f"[%(asctime)s] {_CLUSTER_TAG}%(levelname)s — %(message)s",
     datefmt="%Y-%m-%d %H:%M:%S",
     handlers=[logging.StreamHandler(sys.stdout)],
 )
@@ -38,6 +50,18 @@ intents.guilds          = True
 intents.message_content = True
 intents.moderation      = True
 
+# ── Sharding ──────────────────────────────────────────────────────────────────
+# SHARDED=1 usa AutoShardedBot. SHARD_COUNT fixa o total de shards (senão o
+# Discord recomenda) e SHARD_IDS="0,1" restringe quais shards este processo roda.
+SHARDED     = os.environ.get("SHARDED", "0") == "1"
+SHARD_COUNT = int(os.environ["SHARD_COUNT"]) if os.environ.get("SHARD_COUNT") else None
+SHARD_IDS   = [int(s) for s in os.environ.get("SHARD_IDS", "").split(",") if s.strip()] or None
+
+_BotBase = commands.AutoShardedBot if SHARDED else commands.Bot
+
+# --force-sync (ou FORCE_SYNC=1) sincroniza os slash commands mesmo sem mudanças
+FORCE_SYNC = "--force-sync" in sys.argv or os.environ.get("FORCE_SYNC") == "1"
+
 # ── Cogs ──────────────────────────────────────────────────────────────────────
 COGS = [
     "cogs.xp",
@@ -52,8 +76,13 @@ COGS = [
     "cogs.giveaway",
     "cogs.utilidades2",
     "cogs.cores",
+    "cogs.admin",
 ]
 
+# Cogs carregados em paralelo; cada um só espera as dependências declaradas aqui.
+# O schema inteiro vem das migrações aplicadas no init_pool, que sempre roda antes.
+COG_DEPS: dict[str, tuple[str, ...]] = {}
+
 # ── Status rotativos ──────────────────────────────────────────────────────────
 _STATUS = itertools.cycle([
     "☕️ | bebendo um cafezinho",
@@ -66,15 +95,66 @@ _STATUS = itertools.cycle([
 ])
 
 
-class MultiBot(commands.Bot):
+class MultiBotTree(app_commands.CommandTree):
+    """CommandTree que marca o início de cada interação para as métricas."""
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        interaction.extras["inicio"] = time.perf_counter()
+        if interaction.command:
+            db_pool.iniciar_contagem(interaction.command.qualified_name)
+        return True
+
+    async def on_error(self, interaction: discord.Interaction, error: app_commands.AppCommandError):
+        cmd = interaction.command.qualified_name if interaction.command else "desconhecido"
+        metrics.comandos.inc(cmd, "erro")
+        db_pool.encerrar_contagem()
+        inicio = interaction.extras.get("inicio")
+        if inicio is not None:
+            metrics.comando_duracao.observe(time.perf_counter() - inicio, cmd)
+        # Como o on_error padrão: comando com handler próprio (on_error do comando/grupo
+        # ou cog_app_command_error do cog) já tratou o erro
+        command = interaction.command
+        if command is not None and getattr(command, "_has_any_error_handlers", lambda: False)():
+            return
+        await self.client.on_app_command_error(interaction, error)
+
+
+@dataclass
+class ShardSaude:
+    conexoes:    int   = 0
+    desconexoes: int   = 0
+    retomadas:   int   = 0
+    ultimo:      float = 0.0   # time.time() do último evento de conexão
+
+
+class MultiBot(_BotBase):
     def __init__(self):
+        opcoes = {}
+        if SHARDED:
+            opcoes["shard_count"] = SHARD_COUNT
+            opcoes["shard_ids"]   = SHARD_IDS
         super().__init__(
             command_prefix="!",
             intents=intents,
             help_command=None,
+            tree_cls=MultiBotTree,
+            **opcoes,
+        )
+        self.shard_saude: dict[int, ShardSaude] = {}
+        # IPC e liderança entre processos do cluster.py (inativo em processo único)
+        self.cluster = Cluster()
+        # Cliente HTTP compartilhado (APIs externas); bot.http é o do discord.py
+        self.http_client = HttpClient()
+        self._metrics_runner = None
+        self._indices_task: asyncio.Task | None = None
+        self.watchdog = LoopWatchdog(
+            limiar=int(os.environ.get("WATCHDOG_LIMIAR_MS", "500")) / 1000,
         )
 
     async def setup_hook(self):
+        self.watchdog.iniciar()
+        await self.http_client.start()
+
         # Inicializa banco de dados
         try:
             await init_pool()
@@ -82,25 +162,174 @@ class MultiBot(commands.Bot):
         except Exception as exc:
             log.critical(f"[DB] Falha ao conectar: {exc}")
             sys.exit(1)
+        await self.cluster.iniciar(os.environ.get("DATABASE_URL"))
+        # Índices das queries quentes: build concorrente em segundo plano
+        self._indices_task = asyncio.create_task(self._garantir_indices())
 
-        # Carrega cogs
-        for cog in COGS:
+        # Métricas: endpoint Prometheus (opcional, METRICS_PORT); o lag vem do watchdog
+        metrics.registrar_bot(self)
+        porta = os.environ.get("METRICS_PORT")
+        if porta:
+            try:
+                self._metrics_runner = await metrics.iniciar_servidor(
+                    os.environ.get("METRICS_HOST", "127.0.0.1"), int(porta)
+                )
+            except (OSError, ValueError) as exc:
+                log.error(f"[METRICS] Endpoint não iniciado: {exc}")
+
+        await self._carregar_cogs()
+        await self._sincronizar_comandos()
+
+    async def _garantir_indices(self):
+        try:
+            criados = await indices.garantir_indices()
+            if criados:
+                log.info(f"[DB] {criados} índice(s) criado(s).")
+        except Exception as exc:
+            log.error(f"[DB] Falha ao verificar índices: {exc}")
+
+    async def _carregar_cogs(self):
+        """Carrega os COGS em paralelo respeitando COG_DEPS; loga o tempo de cada um."""
+        tarefas: dict[str, asyncio.Task] = {}
+        tempos:  dict[str, float] = {}
+
+        async def _carregar(cog: str) -> bool:
+            deps = [tarefas[d] for d in COG_DEPS.get(cog, ()) if d in tarefas]
+            if deps:
+                await asyncio.wait(deps)
+                falhas = [d for d in COG_DEPS[cog] if d in tarefas and not tarefas[d].result()]
+                if falhas:
+                    log.warning(f"[COG] {cog}: dependência(s) com falha {falhas}; carregando mesmo assim.")
+            inicio = time.perf_counter()
             try:
                 await self.load_extension(cog)
-                log.info(f"[COG] ✓ {cog}")
             except Exception as exc:
                 log.error(f"[COG] ✗ {cog}: {exc}", exc_info=True)
+                return False
+            tempos[cog] = time.perf_counter() - inicio
+            log.info(f"[COG] ✓ {cog} ({tempos[cog] * 1000:.0f}ms)")
+            return True
+
+        inicio = time.perf_counter()
+        for cog in COGS:
+            tarefas[cog] = asyncio.create_task(_carregar(cog))
+        await asyncio.gather(*tarefas.values())
+        log.info(
+            f"[COG] {len(tempos)}/{len(COGS)} carregado(s) em {(time.perf_counter() - inicio) * 1000:.0f}ms "
+            f"(soma individual {sum(tempos.values()) * 1000:.0f}ms)"
+        )
+
+    def _hash_arvore(self) -> str:
+        """sha256 do payload que tree.sync() enviaria ao Discord."""
+        payload = [cmd.to_dict(self.tree) for cmd in self.tree.get_commands()]
+        payload.sort(key=lambda c: (c.get("type", 1), c["name"]))
+        bruto = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.sha256(bruto.encode()).hexdigest()
 
-        # Sincroniza slash commands
+    async def _sincronizar_comandos(self):
+        # Só um processo do cluster sincroniza; a árvore é a mesma em todos
+        if self.cluster.ativo and self.cluster.id != 0:
+            return
+        chave = f"tree_hash:{self.application_id}"
+        atual = self._hash_arvore()
         try:
+            if not FORCE_SYNC and await get_bot_meta(chave) == atual:
+                log.info(f"[SYNC] Comandos inalterados ({atual[:12]}); sync ignorado.")
+                return
             synced = await self.tree.sync()
-            log.info(f"[SYNC] {len(synced)} comando(s) sincronizado(s).")
+            await set_bot_meta(chave, atual)
+            log.info(f"[SYNC] {len(synced)} comando(s) sincronizado(s) ({atual[:12]}).")
         except Exception as exc:
             log.error(f"[SYNC] Falha: {exc}")
 
+    async def close(self):
+        self.watchdog.parar()
+        await self.cluster.parar()
+        if self._metrics_runner:
+            await self._metrics_runner.cleanup()
+        await self.http_client.close()
+        await super().close()
+
+    async def _run_event(self, coro, event_name: str, *args, **kwargs):
+        inicio = time.perf_counter()
+        try:
+            await super()._run_event(coro, event_name, *args, **kwargs)
+        finally:
+            metrics.listener_duracao.observe(time.perf_counter() - inicio, event_name)
+
+    def dispatch(self, event_name: str, /, *args, **kwargs):
+        # Contado aqui, sem listener: um listener faria o discord.py criar uma task por evento
+        if event_name == "socket_event_type":
+            metrics.gateway_eventos.inc(args[0])
+            metrics.gateway_taxa.marcar()
+        super().dispatch(event_name, *args, **kwargs)
+
+    # ── Shards ─────────────────────────────────────────────────────────────
+
+    def owns_guild(self, guild_id: int) -> bool:
+        """True se o servidor pertence a um shard deste processo (fórmula do Discord)."""
+        ids = getattr(self, "shard_ids", None)
+        if ids is None and self.shard_id is not None:
+            ids = [self.shard_id]
+        if not self.shard_count or ids is None:
+            return True
+        return (guild_id >> 22) % self.shard_count in ids
+
+    def shards_resumo(self) -> list[tuple[int, float, int]]:
+        """(shard_id, latência em segundos, servidores) de cada shard deste processo."""
+        por_shard = Counter(g.shard_id for g in self.guilds)
+        if SHARDED:
+            latencias = self.latencies
+        else:
+            latencias = [(self.shard_id or 0, self.latency)]
+        return [(sid, lat, por_shard.get(sid, 0)) for sid, lat in latencias]
+
+    def _registrar_shard(self, shard_id: int | None, tipo: str):
+        saude = self.shard_saude.setdefault(shard_id or 0, ShardSaude())
+        if tipo == "conexao":
+            saude.conexoes += 1
+        elif tipo == "desconexao":
+            saude.desconexoes += 1
+        else:
+            saude.retomadas += 1
+        saude.ultimo = time.time()
+        metrics.shard_eventos.inc(str(shard_id or 0), tipo)
+
+    async def on_shard_connect(self, shard_id: int):
+        self._registrar_shard(shard_id, "conexao")
+
+    async def on_shard_disconnect(self, shard_id: int):
+        self._registrar_shard(shard_id, "desconexao")
+        log.warning(f"[SHARD] Shard {shard_id} desconectado.")
+
+    async def on_shard_resumed(self, shard_id: int):
+        self._registrar_shard(shard_id, "retomada")
+
+    # Sem sharding o discord.py só emite os eventos sem o prefixo shard_
+    async def on_connect(self):
+        if not SHARDED:
+            self._registrar_shard(self.shard_id, "conexao")
+
+    async def on_disconnect(self):
+        if not SHARDED:
+            self._registrar_shard(self.shard_id, "desconexao")
+
+    async def on_resumed(self):
+        if not SHARDED:
+            self._registrar_shard(self.shard_id, "retomada")
+
+    async def on_app_command_completion(self, inter: discord.Interaction, command):
+        metrics.comandos.inc(command.qualified_name, "ok")
+        db_pool.encerrar_contagem()
+        inicio = inter.extras.get("inicio")
+        if inicio is not None:
+            metrics.comando_duracao.observe(time.perf_counter() - inicio, command.qualified_name)
+
     async def on_ready(self):
         log.info(f"[BOT] Online como {self.user} (ID: {self.user.id})")
         log.info(f"[BOT] Conectado a {len(self.guilds)} servidor(es).")
+        if SHARDED:
+            log.info(f"[SHARD] Shards {sorted(self.shards)} de {self.shard_count}.")
         if not rotate_status.is_running():
             rotate_status.start()
 
@@ -113,7 +342,11 @@ class MultiBot(commands.Bot):
             msg = f"{E.LOADING} Aguarde `{error.retry_after:.1f}s` antes de usar novamente."
         else:
             cmd = inter.command.name if inter.command else "desconhecido"
-            log.warning(f"[ERRO] Comando '{cmd}': {error}")
+            if isinstance(error, app_commands.CheckFailure):
+                log.warning(f"[ERRO] Comando '{cmd}': {error}")
+            else:
+                # Inesperado: mantém o traceback que o tree.on_error padrão registraria
+                log.error(f"[ERRO] Comando '{cmd}': {error}", exc_info=error)
             msg = f"{E.ARROW_RED} Ocorreu um erro ao executar este comando."
         try:
             if inter.response.is_done():
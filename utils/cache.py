@@ -0,0 +1,86 @@
+"""utils/cache.py — Cache TTL em memória com limite LRU e coalescência de requisições.
+
+Chamadas concorrentes para a mesma chave compartilham uma única busca
+(single-flight); só resultados bem-sucedidos entram no cache.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable
+
+_CANCELADA = object()   # a busca líder foi cancelada; aguardadores tentam de novo
+
+
+class TTLCache:
+    def __init__(self, ttl: float, maxsize: int = 1024, nome: str | None = None):
+        self.ttl     = ttl
+        self.maxsize = maxsize
+        self._dados:  OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._em_voo: dict[Hashable, asyncio.Future] = {}
+        self.hits        = 0
+        self.misses      = 0
+        self.coalescidas = 0
+        if nome:
+            from utils import metrics
+            metrics.registrar_cache(nome, self)
+
+    def __len__(self) -> int:
+        return len(self._dados)
+
+    @property
+    def taxa_acerto(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def get(self, chave: Hashable) -> tuple[bool, Any]:
+        item = self._dados.get(chave)
+        if item is None:
+            return False, None
+        expira, valor = item
+        if expira < time.monotonic():
+            del self._dados[chave]
+            return False, None
+        self._dados.move_to_end(chave)
+        return True, valor
+
+    def set(self, chave: Hashable, valor: Any):
+        self._dados[chave] = (time.monotonic() + self.ttl, valor)
+        self._dados.move_to_end(chave)
+        while len(self._dados) > self.maxsize:
+            self._dados.popitem(last=False)
+
+    async def obter(self, chave: Hashable, buscar: Callable[[], Awaitable[Any]]) -> Any:
+        """Retorna o valor em cache ou executa `buscar` (uma vez por chave, mesmo com concorrência)."""
+        achou, valor = self.get(chave)
+        if achou:
+            self.hits += 1
+            return valor
+
+        fut = self._em_voo.get(chave)
+        if fut is not None:
+            self.coalescidas += 1
+            valor = await asyncio.shield(fut)
+            if valor is _CANCELADA:
+                return await self.obter(chave, buscar)
+            return valor
+
+        self.misses += 1
+        fut = asyncio.get_running_loop().create_future()
+        self._em_voo[chave] = fut
+        try:
+            valor = await buscar()
+        except asyncio.CancelledError:
+            # Só quem foi cancelado propaga o cancelamento; os demais refazem a busca.
+            fut.set_result(_CANCELADA)
+            raise
+        except Exception as exc:
+            fut.set_exception(exc)
+            fut.exception()   # evita "exception was never retrieved" sem aguardadores
+            raise
+        else:
+            self.set(chave, valor)
+            fut.set_result(valor)
+            return valor
+        finally:
+            self._em_voo.pop(chave, None)
@@ -0,0 +1,223 @@
+"""utils/cluster.py — Coordenação entre processos do cluster via PostgreSQL.
+
+Cada worker lançado pelo cluster.py (CLUSTER_ID/CLUSTER_COUNT no ambiente)
+mantém uma conexão dedicada ao Postgres usada para:
+  • IPC: mensagens JSON por LISTEN/NOTIFY no canal `multibot_cluster`;
+    `pedir()` envia a todos e junta as respostas de cada cluster.
+  • Liderança: jobs únicos (ex.: lembretes) só rodam no processo que detém
+    o advisory lock do job; se ele cair, a sessão fecha, o lock é liberado
+    e outro worker assume na próxima rodada de eleição.
+
+Sem CLUSTER_ID (processo único) tudo roda localmente: `pedir()` chama o
+handler direto e todo singleton é iniciado na hora.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import uuid
+import zlib
+from typing import Any, Awaitable, Callable
+
+import asyncpg
+
+log = logging.getLogger("multibot.cluster")
+
+CANAL          = "multibot_cluster"
+_ELEICAO_SECS  = 10
+_PAYLOAD_MAX   = 7900   # limite do NOTIFY é 8000 bytes
+
+Handler = Callable[[dict], Awaitable[Any]]
+
+
+def _chave_lock(nome: str) -> int:
+    """Chave estável (int64) do advisory lock de um job."""
+    return zlib.crc32(f"multibot:{nome}".encode())
+
+
+class Cluster:
+    def __init__(self):
+        cid = os.environ.get("CLUSTER_ID")
+        self.ativo = cid is not None   # rodando sob o cluster.py
+        self.id    = int(cid) if cid else 0
+        self.total = int(os.environ.get("CLUSTER_COUNT", "1"))
+        self._dsn: str | None = None
+        self._conn: asyncpg.Connection | None = None
+        self._lock_conn = asyncio.Lock()   # uma query por vez na conexão dedicada
+        self._handlers: dict[str, Handler] = {}
+        self._respostas: dict[str, tuple[list[dict], asyncio.Event]] = {}
+        # nome → (iniciar, parar); _lider guarda os que este processo detém
+        self._singletons: dict[str, tuple[Callable[[], None], Callable[[], None]]] = {}
+        self._lider: set[str] = set()
+        self._acordar = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._tarefas: set[asyncio.Task] = set()
+
+    # ── Ciclo de vida ──────────────────────────────────────────────────────
+
+    async def iniciar(self, dsn: str | None):
+        if not self.ativo:
+            return
+        self._dsn = dsn
+        await self._conectar()
+        self._task = asyncio.create_task(self._eleicao())
+        log.info(f"[CLUSTER] Worker {self.id}/{self.total} conectado ao canal de IPC.")
+
+    async def parar(self):
+        if self._task:
+            self._task.cancel()
+        for nome in list(self._lider):
+            self._perder(nome)
+        if self._conn and not self._conn.is_closed():
+            await self._conn.close()
+
+    async def _conectar(self):
+        self._conn = await asyncpg.connect(self._dsn, statement_cache_size=0)
+        await self._conn.add_listener(CANAL, self._ao_notificar)
+        self._conn.add_termination_listener(self._ao_cair)
+
+    def _ao_cair(self, _conn):
+        # Sessão encerrada = locks liberados; para os jobs antes que outro assuma
+        log.warning("[CLUSTER] Conexão de coordenação perdida.")
+        for nome in list(self._lider):
+            self._perder(nome)
+        self._acordar.set()
+
+    async def _executar(self, query: str, *args):
+        async with self._lock_conn:
+            return await self._conn.fetchval(query, *args)
+
+    # ── Liderança ──────────────────────────────────────────────────────────
+
+    def singleton(self, nome: str, iniciar: Callable[[], None], parar: Callable[[], None]):
+        """Registra um job que deve rodar em um único processo do cluster."""
+        self._singletons[nome] = (iniciar, parar)
+        if not self.ativo:
+            self._lider.add(nome)
+            iniciar()
+        else:
+            self._acordar.set()
+
+    def liberar(self, nome: str):
+        """Para o job e devolve o lock (ex.: no cog_unload)."""
+        detido = nome in self._lider
+        if detido:
+            self._perder(nome)
+        self._singletons.pop(nome, None)
+        if detido and self.ativo and self._conn and not self._conn.is_closed():
+            self._criar_tarefa(self._executar("SELECT pg_advisory_unlock($1)", _chave_lock(nome)))
+
+    def lider(self, nome: str) -> bool:
+        return nome in self._lider
+
+    def _perder(self, nome: str):
+        self._lider.discard(nome)
+        job = self._singletons.get(nome)
+        if job:
+            job[1]()
+            log.info(f"[CLUSTER] Liderança de '{nome}' liberada.")
+
+    async def _eleicao(self):
+        while True:
+            try:
+                if self._conn is None or self._conn.is_closed():
+                    await self._conectar()
+                for nome, (iniciar, _) in list(self._singletons.items()):
+                    if nome in self._lider:
+                        continue
+                    if await self._executar("SELECT pg_try_advisory_lock($1)", _chave_lock(nome)):
+                        self._lider.add(nome)
+                        iniciar()
+                        log.info(f"[CLUSTER] Worker {self.id} assumiu '{nome}'.")
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                log.error(f"[CLUSTER] Falha na eleição: {exc}")
+            self._acordar.clear()
+            try:
+                await asyncio.wait_for(self._acordar.wait(), timeout=_ELEICAO_SECS)
+            except asyncio.TimeoutError:
+                pass
+
+    # ── IPC ────────────────────────────────────────────────────────────────
+
+    def registrar(self, tipo: str, handler: Handler):
+        """Handler recebe os dados e retorna a resposta (JSON) ou None."""
+        self._handlers[tipo] = handler
+
+    def _codificar(self, tipo: str, dados: dict | None, pedido: str | None) -> str:
+        # ensure_ascii=False: emoji em nomes de servidor ocupam seus bytes UTF-8, não \uXXXX\uXXXX
+        return json.dumps({"t": tipo, "id": pedido, "de": self.id, "d": dados or {}},
+                          separators=(",", ":"), ensure_ascii=False, default=str)
+
+    def cabe(self, resposta: dict) -> bool:
+        """Se a resposta a um pedido cabe num NOTIFY (bytes UTF-8, com o envelope)."""
+        return len(self._codificar("_resposta", resposta, "0" * 32).encode()) <= _PAYLOAD_MAX
+
+    async def publicar(self, tipo: str, dados: dict | None = None, pedido: str | None = None):
+        """Envia uma mensagem a todos os clusters (inclusive este)."""
+        if not self.ativo:
+            handler = self._handlers.get(tipo)
+            if handler:
+                self._criar_tarefa(handler(dados or {}))
+            return
+        payload = self._codificar(tipo, dados, pedido)
+        if len(payload.encode()) > _PAYLOAD_MAX:
+            raise ValueError(f"Mensagem de IPC '{tipo}' excede {_PAYLOAD_MAX} bytes.")
+        await self._executar("SELECT pg_notify($1, $2)", CANAL, payload)
+
+    async def pedir(self, tipo: str, dados: dict | None = None, timeout: float = 5.0) -> list[dict]:
+        """Envia um pedido e junta as respostas de cada cluster (as que chegarem no prazo)."""
+        if not self.ativo:
+            handler = self._handlers.get(tipo)
+            resposta = await handler(dados or {}) if handler else None
+            return [{"cluster": self.id, **resposta}] if resposta is not None else []
+
+        pedido = uuid.uuid4().hex
+        coletadas: list[dict] = []
+        pronto = asyncio.Event()
+        self._respostas[pedido] = (coletadas, pronto)
+        try:
+            await self.publicar(tipo, dados, pedido=pedido)
+            try:
+                await asyncio.wait_for(pronto.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                log.warning(f"[CLUSTER] Pedido '{tipo}': {len(coletadas)}/{self.total} resposta(s) no prazo.")
+        finally:
+            self._respostas.pop(pedido, None)
+        return sorted(coletadas, key=lambda r: r["cluster"])
+
+    def _ao_notificar(self, _conn, _pid, _canal, payload: str):
+        try:
+            msg = json.loads(payload)
+        except ValueError:
+            return
+        if msg["t"] == "_resposta":
+            espera = self._respostas.get(msg["id"])
+            if espera:
+                coletadas, pronto = espera
+                coletadas.append({"cluster": msg["de"], **msg["d"]})
+                if len(coletadas) >= self.total:
+                    pronto.set()
+            return
+        handler = self._handlers.get(msg["t"])
+        if handler:
+            self._criar_tarefa(self._responder(handler, msg))
+
+    async def _responder(self, handler: Handler, msg: dict):
+        try:
+            resposta = await handler(msg["d"])
+        except Exception as exc:
+            log.error(f"[CLUSTER] Handler '{msg['t']}' falhou: {exc}", exc_info=True)
+            return
+        if msg.get("id") and resposta is not None:
+            try:
+                await self.publicar("_resposta", resposta, pedido=msg["id"])
+            except Exception as exc:
+                log.error(f"[CLUSTER] Resposta a '{msg['t']}' não enviada: {exc}")
+
+    def _criar_tarefa(self, coro):
+        task = asyncio.create_task(coro)
+        self._tarefas.add(task)
+        task.add_done_callback(self._tarefas.discard)
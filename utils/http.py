@@ -0,0 +1,113 @@
+"""utils/http.py — Cliente HTTP compartilhado do bot (aiohttp).
+
+Uma única ClientSession para todo o bot: pool de conexões com keep-alive,
+limite de conexões por host, cache de DNS e métricas de latência por host.
+Criado no setup_hook do MultiBot (bot.http_client) e fechado no close().
+"""
+
+import logging
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from urllib.parse import urlsplit
+
+import aiohttp
+
+log = logging.getLogger("multibot.http")
+
+
+@dataclass
+class HostStats:
+    requisicoes: int   = 0
+    erros:       int   = 0
+    total_ms:    float = 0.0
+    max_ms:      float = 0.0
+    recentes:    deque = field(default_factory=lambda: deque(maxlen=200))
+
+    def registrar(self, ms: float, erro: bool):
+        self.requisicoes += 1
+        self.total_ms    += ms
+        self.max_ms       = max(self.max_ms, ms)
+        self.recentes.append(ms)
+        if erro:
+            self.erros += 1
+
+    @property
+    def media_ms(self) -> float:
+        return self.total_ms / self.requisicoes if self.requisicoes else 0.0
+
+    @property
+    def p95_ms(self) -> float:
+        if not self.recentes:
+            return 0.0
+        ordenados = sorted(self.recentes)
+        return ordenados[min(len(ordenados) - 1, int(len(ordenados) * 0.95))]
+
+
+class HttpClient:
+    """Sessão aiohttp única com pool de conexões e métricas por host."""
+
+    def __init__(self, limit: int = 100, limit_per_host: int = 10,
+                 dns_ttl: int = 300, keepalive: float = 30.0, timeout: float = 10.0):
+        self._limit          = limit
+        self._limit_per_host = limit_per_host
+        self._dns_ttl        = dns_ttl
+        self._keepalive      = keepalive
+        self._timeout        = aiohttp.ClientTimeout(total=timeout)
+        self._session: aiohttp.ClientSession | None = None
+        self.metricas: dict[str, HostStats] = {}
+
+    async def start(self):
+        if self._session and not self._session.closed:
+            return
+        connector = aiohttp.TCPConnector(
+            limit=self._limit,
+            limit_per_host=self._limit_per_host,
+            ttl_dns_cache=self._dns_ttl,
+            keepalive_timeout=self._keepalive,
+        )
+        self._session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=self._timeout,
+            headers={"User-Agent": "MultiBot (discord.py)"},
+        )
+        log.info(f"[HTTP] Sessão criada (limite {self._limit}, {self._limit_per_host}/host)")
+
+    async def close(self):
+        if self._session and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            raise RuntimeError("HttpClient não iniciado. Chame start() primeiro.")
+        return self._session
+
+    @asynccontextmanager
+    async def request(self, method: str, url: str, **kwargs):
+        """Como session.request, registrando a latência (até os headers) por host."""
+        host   = urlsplit(url).hostname or "?"
+        stats  = self.metricas.setdefault(host, HostStats())
+        inicio = time.perf_counter()
+        registrado = False   # erros no corpo de quem chamou não contam de novo
+        try:
+            async with self.session.request(method, url, **kwargs) as resp:
+                registrado = True
+                stats.registrar((time.perf_counter() - inicio) * 1000, resp.status >= 500)
+                yield resp
+        except (aiohttp.ClientError, TimeoutError):
+            if not registrado:
+                stats.registrar((time.perf_counter() - inicio) * 1000, True)
+            raise
+
+    def get(self, url: str, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def resumo(self) -> list[tuple[str, HostStats]]:
+        """Hosts ordenados por número de requisições."""
+        return sorted(self.metricas.items(), key=lambda kv: kv[1].requisicoes, reverse=True)
@@ -0,0 +1,254 @@
+"""utils/metrics.py — Métricas de runtime do bot (formato Prometheus).
+
+Contadores, histogramas e gauges em memória, sem dependências externas.
+Tudo é barato de atualizar no hot path; a leitura (render/resumo) só acontece
+quando o endpoint HTTP ou o /admin metricas pedem.
+"""
+
+import bisect
+import logging
+import time
+from collections import deque
+from typing import Callable, Iterable
+
+from aiohttp import web
+
+log = logging.getLogger("multibot.metrics")
+
+_BUCKETS_PADRAO = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escapar(valor) -> str:
+    return str(valor).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _fmt_labels(nomes: tuple[str, ...], valores: tuple) -> str:
+    if not nomes:
+        return ""
+    return "{" + ",".join(f'{n}="{_escapar(v)}"' for n, v in zip(nomes, valores)) + "}"
+
+
+class Counter:
+    def __init__(self, nome: str, ajuda: str, labels: tuple[str, ...] = ()):
+        self.nome, self.ajuda, self.labels = nome, ajuda, labels
+        self.valores: dict[tuple, float] = {}
+
+    def inc(self, *labels, valor: float = 1.0):
+        self.valores[labels] = self.valores.get(labels, 0.0) + valor
+
+    def total(self) -> float:
+        return sum(self.valores.values())
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.nome} {self.ajuda}"
+        yield f"# TYPE {self.nome} counter"
+        for labels, v in self.valores.items():
+            yield f"{self.nome}{_fmt_labels(self.labels, labels)} {v}"
+
+
+class Gauge:
+    """Valor instantâneo; com `funcao`, é lido só no momento da coleta."""
+
+    def __init__(self, nome: str, ajuda: str, labels: tuple[str, ...] = (),
+                 funcao: Callable[[], dict[tuple, float]] | None = None):
+        self.nome, self.ajuda, self.labels = nome, ajuda, labels
+        self.funcao = funcao
+        self.valores: dict[tuple, float] = {}
+
+    def set(self, valor: float, *labels):
+        self.valores[labels] = valor
+
+    def coletar(self) -> dict[tuple, float]:
+        if self.funcao:
+            try:
+                return self.funcao()
+            except Exception:
+                return {}
+        return self.valores
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.nome} {self.ajuda}"
+        yield f"# TYPE {self.nome} gauge"
+        for labels, v in self.coletar().items():
+            yield f"{self.nome}{_fmt_labels(self.labels, labels)} {v}"
+
+
+class _Serie:
+    __slots__ = ("contagens", "soma", "n")
+
+    def __init__(self, n_buckets: int):
+        self.contagens = [0] * (n_buckets + 1)   # último = +Inf
+        self.soma = 0.0
+        self.n = 0
+
+
+class Histogram:
+    def __init__(self, nome: str, ajuda: str, labels: tuple[str, ...] = (),
+                 buckets: tuple[float, ...] = _BUCKETS_PADRAO):
+        self.nome, self.ajuda, self.labels = nome, ajuda, labels
+        self.buckets = buckets
+        self.series: dict[tuple, _Serie] = {}
+
+    def observe(self, valor: float, *labels):
+        serie = self.series.get(labels)
+        if serie is None:
+            serie = self.series[labels] = _Serie(len(self.buckets))
+        serie.contagens[bisect.bisect_left(self.buckets, valor)] += 1
+        serie.soma += valor
+        serie.n += 1
+
+    def quantil(self, labels: tuple, q: float) -> float:
+        """Quantil aproximado por interpolação linear dentro do bucket."""
+        serie = self.series.get(labels)
+        if not serie or not serie.n:
+            return 0.0
+        alvo, acumulado, inferior = q * serie.n, 0, 0.0
+        for i, c in enumerate(serie.contagens):
+            superior = self.buckets[i] if i < len(self.buckets) else self.buckets[-1]
+            if acumulado + c >= alvo and c:
+                return inferior + (superior - inferior) * ((alvo - acumulado) / c)
+            acumulado += c
+            inferior = superior
+        return self.buckets[-1]
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.nome} {self.ajuda}"
+        yield f"# TYPE {self.nome} histogram"
+        for labels, serie in self.series.items():
+            acumulado = 0
+            for limite, c in zip((*self.buckets, "+Inf"), serie.contagens):
+                acumulado += c
+                yield (f"{self.nome}_bucket"
+                       f"{_fmt_labels((*self.labels, 'le'), (*labels, limite))} {acumulado}")
+            base = _fmt_labels(self.labels, labels)
+            yield f"{self.nome}_sum{base} {serie.soma}"
+            yield f"{self.nome}_count{base} {serie.n}"
+
+
+class TaxaJanela:
+    """Eventos por segundo nos últimos N segundos (baldes de 1s)."""
+
+    def __init__(self, segundos: int = 60):
+        self.segundos = segundos
+        self._baldes: deque[list] = deque()   # [segundo, contagem]
+
+    def marcar(self):
+        agora = int(time.monotonic())
+        if self._baldes and self._baldes[-1][0] == agora:
+            self._baldes[-1][1] += 1
+        else:
+            self._baldes.append([agora, 1])
+            while self._baldes and self._baldes[0][0] <= agora - self.segundos:
+                self._baldes.popleft()
+
+    def taxa(self) -> float:
+        agora = int(time.monotonic())
+        total = sum(c for s, c in self._baldes if s > agora - self.segundos)
+        return total / self.segundos
+
+
+class Registry:
+    def __init__(self):
+        self.metricas: list = []
+
+    def registrar(self, metrica):
+        self.metricas.append(metrica)
+        return metrica
+
+    def render(self) -> str:
+        linhas = []
+        for m in self.metricas:
+            linhas.extend(m.render())
+        return "\n".join(linhas) + "\n"
+
+
+registry = Registry()
+
+# ── Métricas do bot ───────────────────────────────────────────────────────────
+
+comandos = registry.registrar(Counter(
+    "multibot_comandos_total", "Slash commands executados", ("comando", "status")))
+comando_duracao = registry.registrar(Histogram(
+    "multibot_comando_segundos", "Duração dos slash commands", ("comando",)))
+listener_duracao = registry.registrar(Histogram(
+    "multibot_listener_segundos", "Duração dos listeners de eventos", ("evento",)))
+gateway_eventos = registry.registrar(Counter(
+    "multibot_gateway_eventos_total", "Eventos recebidos do gateway", ("tipo",)))
+loop_lag = registry.registrar(Gauge(
+    "multibot_loop_lag_segundos", "Atraso do event loop na última amostra"))
+loop_lag_max = registry.registrar(Gauge(
+    "multibot_loop_lag_max_segundos", "Maior atraso do event loop desde o início"))
+
+shard_eventos = registry.registrar(Counter(
+    "multibot_shard_eventos_total", "Conexões, desconexões e retomadas por shard", ("shard", "tipo")))
+
+gateway_taxa = TaxaJanela(60)
+
+_caches: dict[str, object] = {}
+
+
+def registrar_cache(nome: str, cache):
+    """Expõe hits/misses de um cache (qualquer objeto com .hits e .misses)."""
+    _caches[nome] = cache
+
+
+def _coletar_caches(campo: str) -> dict[tuple, float]:
+    return {(nome,): getattr(c, campo, 0) for nome, c in _caches.items()}
+
+
+def _taxa_acerto() -> dict[tuple, float]:
+    resultado = {}
+    for nome, c in _caches.items():
+        total = c.hits + c.misses
+        resultado[(nome,)] = c.hits / total if total else 0.0
+    return resultado
+
+
+registry.registrar(Gauge("multibot_cache_hits", "Acertos do cache", ("cache",),
+                         funcao=lambda: _coletar_caches("hits")))
+registry.registrar(Gauge("multibot_cache_misses", "Faltas do cache", ("cache",),
+                         funcao=lambda: _coletar_caches("misses")))
+cache_acerto = registry.registrar(Gauge("multibot_cache_taxa_acerto", "Taxa de acerto do cache", ("cache",),
+                                        funcao=_taxa_acerto))
+
+
+def registrar_bot(bot):
+    """Gauges que leem o estado do bot/pool/HTTP no momento da coleta."""
+    from db.database import get_pool
+
+    def _pool() -> dict[tuple, float]:
+        pool = get_pool()
+        return {("tamanho",): pool.get_size(), ("em_uso",): pool.em_uso,
+                ("limite",): pool.limite, ("max",): pool.get_max_size()}
+
+    def _http() -> dict[tuple, float]:
+        return {(host,): st.requisicoes for host, st in bot.http_client.metricas.items()}
+
+    registry.registrar(Gauge("multibot_db_pool_conexoes", "Conexões do pool asyncpg", ("estado",), funcao=_pool))
+    registry.registrar(Gauge("multibot_http_requisicoes", "Requisições HTTP externas por host", ("host",),
+                             funcao=_http))
+    registry.registrar(Gauge("multibot_gateway_latencia_segundos", "Latência do heartbeat do gateway",
+                             funcao=lambda: {(): bot.latency}))
+    registry.registrar(Gauge("multibot_servidores", "Servidores conectados",
+                             funcao=lambda: {(): len(bot.guilds)}))
+    registry.registrar(Gauge("multibot_shard_latencia_segundos", "Latência do heartbeat por shard", ("shard",),
+                             funcao=lambda: {(str(sid),): lat for sid, lat, _ in bot.shards_resumo()}))
+    registry.registrar(Gauge("multibot_shard_servidores", "Servidores por shard", ("shard",),
+                             funcao=lambda: {(str(sid),): n for sid, _, n in bot.shards_resumo()}))
+    registry.registrar(Gauge("multibot_gateway_eventos_por_segundo", "Eventos do gateway/s (último minuto)",
+                             funcao=lambda: {(): gateway_taxa.taxa()}))
+
+
+# ── Endpoint HTTP ─────────────────────────────────────────────────────────────
+
+async def iniciar_servidor(host: str, porta: int) -> web.AppRunner:
+    async def _metrics(_request: web.Request) -> web.Response:
+        return web.Response(text=registry.render(), content_type="text/plain", charset="utf-8")
+
+    app = web.Application()
+    app.router.add_get("/metrics", _metrics)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, porta).start()
+    log.info(f"[METRICS] Endpoint em http://{host}:{porta}/metrics")
+    return runner
@@ -0,0 +1,113 @@
+"""utils/watchdog.py — Watchdog do event loop.
+
+Uma task no loop atualiza um heartbeat e mede o atraso de agendamento; uma
+thread daemon vigia o heartbeat e, quando ele para por mais que o limiar,
+captura a pilha da thread do loop (sys._current_frames) e aponta qual
+cog/handler estava executando. Com ASYNCIO_DEBUG=1 também liga o modo debug
+do asyncio, que registra callbacks mais lentos que slow_callback_duration.
+"""
+
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from dataclasses import dataclass
+
+from utils import metrics
+
+log = logging.getLogger("multibot.watchdog")
+
+_RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+travamentos = metrics.registry.registrar(metrics.Counter(
+    "multibot_loop_travamentos_total", "Travamentos do event loop acima do limiar", ("origem",)))
+
+
+@dataclass
+class Travamento:
+    inicio:   float      # time.monotonic() aproximado do início do travamento
+    duracao:  float      # atualizada quando o loop volta a responder
+    origem:   str
+    pilha:    list[str]
+
+
+def _origem(pilha: traceback.StackSummary) -> str:
+    """Frame mais interno que pertence ao bot (cogs/, utils/, db/, main.py)."""
+    for frame in reversed(pilha):
+        caminho = os.path.abspath(frame.filename)
+        if caminho.startswith(_RAIZ) and os.sep + "watchdog.py" not in caminho:
+            rel = os.path.relpath(caminho, _RAIZ)
+            return f"{rel}:{frame.lineno} ({frame.name})"
+    return "externo"
+
+
+class LoopWatchdog:
+    def __init__(self, limiar: float = 0.5, intervalo: float = 0.1, slow_callback: float = 0.25):
+        self.limiar        = limiar
+        self.intervalo     = intervalo
+        self.slow_callback = slow_callback
+        self.historico: deque[Travamento] = deque(maxlen=20)
+        self._batida      = time.monotonic()
+        self._thread_loop = 0
+        self._task: asyncio.Task | None = None
+        self._parar       = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def iniciar(self):
+        loop = asyncio.get_running_loop()
+        loop.slow_callback_duration = self.slow_callback
+        if os.environ.get("ASYNCIO_DEBUG") == "1":
+            loop.set_debug(True)
+            log.info("[WATCHDOG] Modo debug do asyncio ativado.")
+        self._thread_loop = threading.get_ident()
+        self._batida = time.monotonic()
+        self._task = asyncio.create_task(self._heartbeat())
+        self._thread = threading.Thread(target=self._vigiar, name="loop-watchdog", daemon=True)
+        self._thread.start()
+        log.info(f"[WATCHDOG] Ativo (limiar {self.limiar * 1000:.0f}ms)")
+
+    def parar(self):
+        self._parar.set()
+        if self._task:
+            self._task.cancel()
+
+    async def _heartbeat(self):
+        loop = asyncio.get_running_loop()
+        maximo = 0.0
+        while True:
+            inicio = loop.time()
+            await asyncio.sleep(self.intervalo)
+            lag = max(0.0, loop.time() - inicio - self.intervalo)
+            self._batida = time.monotonic()
+            maximo = max(maximo, lag)
+            metrics.loop_lag.set(lag)
+            metrics.loop_lag_max.set(maximo)
+
+    def _vigiar(self):
+        amostrado = False
+        while not self._parar.wait(self.intervalo):
+            parado = time.monotonic() - self._batida
+            if parado < self.limiar:
+                if amostrado:
+                    self.historico[-1].duracao = time.monotonic() - self.historico[-1].inicio
+                amostrado = False
+                continue
+            if amostrado:
+                continue   # uma amostra por travamento
+            amostrado = True
+            frame = sys._current_frames().get(self._thread_loop)
+            if frame is None:
+                continue
+            pilha  = traceback.extract_stack(frame)
+            origem = _origem(pilha)
+            linhas = [l.rstrip() for l in traceback.format_list(pilha[-8:])]
+            self.historico.append(Travamento(time.monotonic() - parado, parado, origem, linhas))
+            travamentos.inc(origem)
+            log.warning(
+                f"[WATCHDOG] Event loop parado há {parado * 1000:.0f}ms — executando {origem}\n"
+                + "\n".join(linhas)
+            )